@@ -0,0 +1,25 @@
+"""Add poll results version
+
+Revision ID: 2a7c5e9d4b18
+Revises: 9d3b6f2e8c41
+Create Date: 2025-06-14 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2a7c5e9d4b18'
+down_revision: Union[str, None] = '9d3b6f2e8c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('poll', sa.Column('results_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('poll', 'results_version')
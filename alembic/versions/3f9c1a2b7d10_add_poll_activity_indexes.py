@@ -0,0 +1,32 @@
+"""Add indexes for page-scoped poll vote, reaction and comment lookups
+
+Revision ID: 3f9c1a2b7d10
+Revises: insert_initial_data
+Create Date: 2025-06-02 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1a2b7d10'
+down_revision: Union[str, None] = 'insert_initial_data'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_pollvote_poll_id'), 'pollvote', ['poll_id'], unique=False)
+    op.create_index('ix_pollvote_user_id_poll_id', 'pollvote', ['user_id', 'poll_id'], unique=False)
+    op.create_index(op.f('ix_pollreaction_poll_id'), 'pollreaction', ['poll_id'], unique=False)
+    op.create_index('ix_pollreaction_user_id_poll_id', 'pollreaction', ['user_id', 'poll_id'], unique=False)
+    op.create_index(op.f('ix_pollcomment_poll_id'), 'pollcomment', ['poll_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pollcomment_poll_id'), table_name='pollcomment')
+    op.drop_index('ix_pollreaction_user_id_poll_id', table_name='pollreaction')
+    op.drop_index(op.f('ix_pollreaction_poll_id'), table_name='pollreaction')
+    op.drop_index('ix_pollvote_user_id_poll_id', table_name='pollvote')
+    op.drop_index(op.f('ix_pollvote_poll_id'), table_name='pollvote')
@@ -0,0 +1,32 @@
+"""Add composite indexes for keyset (cursor) pagination of the listings
+
+Revision ID: 5e1f3a7c9b24
+Revises: c4d7e9a2b615
+Create Date: 2025-06-09 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1f3a7c9b24'
+down_revision: Union[str, None] = 'c4d7e9a2b615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_poll_created_at_id', 'poll', ['created_at', 'id'], unique=False)
+    op.create_index('ix_debate_created_at_id', 'debate', ['created_at', 'id'], unique=False)
+    op.create_index('ix_project_created_at_id', 'project', ['created_at', 'id'], unique=False)
+    op.create_index('ix_issue_created_at_id', 'issue', ['created_at', 'id'], unique=False)
+    op.create_index('ix_organization_name_id', 'organization', ['name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_organization_name_id', table_name='organization')
+    op.drop_index('ix_issue_created_at_id', table_name='issue')
+    op.drop_index('ix_project_created_at_id', table_name='project')
+    op.drop_index('ix_debate_created_at_id', table_name='debate')
+    op.drop_index('ix_poll_created_at_id', table_name='poll')
@@ -0,0 +1,56 @@
+"""Add ranked and scale ballots with their running tallies
+
+Revision ID: 7c4e2b9a5d36
+Revises: 2a7c5e9d4b18
+Create Date: 2025-06-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2b9a5d36'
+down_revision: Union[str, None] = '2a7c5e9d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('poll', sa.Column('scale_min', sa.Integer(), nullable=True))
+    op.add_column('poll', sa.Column('scale_max', sa.Integer(), nullable=True))
+    op.add_column('polloption', sa.Column('score', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('pollvote', sa.Column('rank', sa.Integer(), nullable=True))
+    op.add_column('pollvote', sa.Column('value', sa.Integer(), nullable=True))
+    op.create_table(
+        'polloptiontally',
+        sa.Column('option_id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('ballots', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['option_id'], ['polloption.id'], ),
+        sa.ForeignKeyConstraint(['poll_id'], ['poll.id'], ),
+        sa.PrimaryKeyConstraint('option_id', 'bucket')
+    )
+    op.create_index(op.f('ix_polloptiontally_poll_id'), 'polloptiontally', ['poll_id'], unique=False)
+    op.create_table(
+        'pollrankingballot',
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('ranking', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('ballots', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['poll_id'], ['poll.id'], ),
+        sa.PrimaryKeyConstraint('poll_id', 'ranking')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pollrankingballot')
+    op.drop_index(op.f('ix_polloptiontally_poll_id'), table_name='polloptiontally')
+    op.drop_table('polloptiontally')
+    op.drop_column('pollvote', 'value')
+    op.drop_column('pollvote', 'rank')
+    op.drop_column('polloption', 'score')
+    op.drop_column('poll', 'scale_max')
+    op.drop_column('poll', 'scale_min')
@@ -0,0 +1,43 @@
+"""Add denormalized poll counters
+
+Revision ID: 8b2e4d6f1a93
+Revises: 3f9c1a2b7d10
+Create Date: 2025-06-04 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a93'
+down_revision: Union[str, None] = '3f9c1a2b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ('likes_count', 'dislikes_count', 'comments_count', 'total_votes')
+
+
+def upgrade() -> None:
+    for name in COUNTERS:
+        op.add_column('poll', sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing rows; later drift is fixed by
+    # python -m api.commands.reconcile_poll_counters
+    op.execute("""
+        UPDATE poll SET
+            likes_count = (SELECT count(*) FROM pollreaction WHERE pollreaction.poll_id = poll.id AND pollreaction.reaction = 'LIKE'),
+            dislikes_count = (SELECT count(*) FROM pollreaction WHERE pollreaction.poll_id = poll.id AND pollreaction.reaction = 'DISLIKE'),
+            comments_count = (SELECT count(*) FROM pollcomment WHERE pollcomment.poll_id = poll.id),
+            total_votes = (SELECT count(*) FROM pollvote WHERE pollvote.poll_id = poll.id)
+    """)
+    op.execute("""
+        UPDATE polloption SET
+            votes = (SELECT count(*) FROM pollvote WHERE pollvote.option_id = polloption.id)
+    """)
+
+
+def downgrade() -> None:
+    for name in reversed(COUNTERS):
+        op.drop_column('poll', name)
@@ -0,0 +1,26 @@
+"""Add indexes used by the two-phase poll listings
+
+Revision ID: 9d3b6f2e8c41
+Revises: 5e1f3a7c9b24
+Create Date: 2025-06-12 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6f2e8c41'
+down_revision: Union[str, None] = '5e1f3a7c9b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_polloption_poll_id'), 'polloption', ['poll_id'], unique=False)
+    op.create_index(op.f('ix_pollcommunitylink_community_id'), 'pollcommunitylink', ['community_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pollcommunitylink_community_id'), table_name='pollcommunitylink')
+    op.drop_index(op.f('ix_polloption_poll_id'), table_name='polloption')
@@ -0,0 +1,27 @@
+"""Add composite index for keyset (cursor) pagination of poll comments
+
+Revision ID: a3f8c1e6d294
+Revises: e8a1d4c7f952
+Create Date: 2025-06-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f8c1e6d294'
+down_revision: Union[str, None] = 'e8a1d4c7f952'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_pollcomment_poll_id_created_at_id', 'pollcomment', ['poll_id', 'created_at', 'id'], unique=False)
+    # Its leading column serves the lookups by poll on its own
+    op.drop_index('ix_pollcomment_poll_id', table_name='pollcomment')
+
+
+def downgrade() -> None:
+    op.create_index('ix_pollcomment_poll_id', 'pollcomment', ['poll_id'], unique=False)
+    op.drop_index('ix_pollcomment_poll_id_created_at_id', table_name='pollcomment')
@@ -0,0 +1,139 @@
+"""Backfill ranked and scale ballots of polls voted before their tallies
+
+Revision ID: b6d1f4a8c273
+Revises: a3f8c1e6d294
+Create Date: 2025-06-20 10:00:00.000000
+
+"""
+from collections import Counter
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f4a8c273'
+down_revision: Union[str, None] = 'a3f8c1e6d294'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Values of SCALE polls created without scale_min / scale_max (SCALE_DEFAULT_RANGE)
+SCALE_DEFAULT_MIN = 1
+SCALE_DEFAULT_MAX = 5
+
+BALLOT_POLLS = "SELECT id FROM poll WHERE type IN ('RANKING', 'SCALE')"
+
+# Value-less SCALE votes set aside by upgrade
+LEGACY_SCALE_VOTES = "pollvote_legacy_scale"
+
+
+def upgrade() -> None:
+    # SCALE polls created before the scale columns get the default range
+    op.execute(f"UPDATE poll SET scale_min = {SCALE_DEFAULT_MIN} WHERE type = 'SCALE' AND scale_min IS NULL")
+    op.execute(f"UPDATE poll SET scale_max = {SCALE_DEFAULT_MAX} WHERE type = 'SCALE' AND scale_max IS NULL")
+
+    # Former RANKING votes were inserted one row per option in the order of
+    # preference: the rank is the row's position among the voter's rows
+    op.execute("""
+        UPDATE pollvote SET rank = (
+            SELECT count(*) FROM pollvote AS earlier
+            WHERE earlier.poll_id = pollvote.poll_id
+              AND earlier.user_id = pollvote.user_id
+              AND earlier.id <= pollvote.id
+        )
+        WHERE rank IS NULL AND poll_id IN (SELECT id FROM poll WHERE type = 'RANKING')
+    """)
+    # Former SCALE votes only picked options, without a value: there is no
+    # rating to aggregate, so they are moved to LEGACY_SCALE_VOTES (restored
+    # by downgrade) and the vote counters recomputed
+    op.execute(f"""
+        CREATE TABLE {LEGACY_SCALE_VOTES} AS
+        SELECT id, poll_id, option_id, user_id FROM pollvote
+        WHERE value IS NULL AND poll_id IN (SELECT id FROM poll WHERE type = 'SCALE')
+    """)
+    op.execute(f"DELETE FROM pollvote WHERE id IN (SELECT id FROM {LEGACY_SCALE_VOTES})")
+    op.execute("""
+        UPDATE polloption SET
+            votes = (SELECT count(*) FROM pollvote WHERE pollvote.option_id = polloption.id)
+        WHERE poll_id IN (""" + BALLOT_POLLS + """)
+    """)
+    op.execute("""
+        UPDATE poll SET
+            total_votes = (SELECT count(*) FROM pollvote WHERE pollvote.poll_id = poll.id),
+            results_version = results_version + 1
+        WHERE type IN ('RANKING', 'SCALE')
+    """)
+
+    # Running tallies recomputed from the votes: Borda points (the first of
+    # n options gets n - 1) or sum of values, ballots per position or value
+    op.execute("""
+        UPDATE polloption SET score = coalesce((
+            SELECT sum(CASE WHEN poll.type = 'RANKING'
+                            THEN (SELECT count(*) FROM polloption AS sibling
+                                  WHERE sibling.poll_id = polloption.poll_id) - pollvote.rank
+                            ELSE pollvote.value END)
+            FROM pollvote JOIN poll ON poll.id = pollvote.poll_id
+            WHERE pollvote.option_id = polloption.id
+        ), 0)
+        WHERE poll_id IN (""" + BALLOT_POLLS + """)
+    """)
+    op.execute("DELETE FROM polloptiontally WHERE poll_id IN (" + BALLOT_POLLS + ")")
+    op.execute("""
+        INSERT INTO polloptiontally (option_id, bucket, poll_id, ballots)
+        SELECT pollvote.option_id, coalesce(pollvote.rank, pollvote.value), pollvote.poll_id, count(*)
+        FROM pollvote
+        WHERE pollvote.poll_id IN (""" + BALLOT_POLLS + """)
+        GROUP BY pollvote.option_id, coalesce(pollvote.rank, pollvote.value), pollvote.poll_id
+    """)
+
+    # Ballots per ranking (ranking_key: option IDs, first choice first)
+    conn = op.get_bind()
+    conn.execute(sa.text("DELETE FROM pollrankingballot WHERE poll_id IN (SELECT id FROM poll WHERE type = 'RANKING')"))
+    votes = conn.execute(sa.text("""
+        SELECT pollvote.poll_id, pollvote.user_id, pollvote.option_id
+        FROM pollvote JOIN poll ON poll.id = pollvote.poll_id
+        WHERE poll.type = 'RANKING'
+        ORDER BY pollvote.poll_id, pollvote.user_id, pollvote.rank
+    """))
+    rankings = Counter(
+        (poll_id, ",".join(str(option_id) for _, _, option_id in rows))
+        for (poll_id, _), rows in groupby(votes, key=lambda row: (row[0], row[1]))
+    )
+    if rankings:
+        conn.execute(
+            sa.text("INSERT INTO pollrankingballot (poll_id, ranking, ballots) VALUES (:poll_id, :ranking, :ballots)"),
+            [{"poll_id": poll_id, "ranking": ranking, "ballots": ballots} for (poll_id, ranking), ballots in rankings.items()]
+        )
+    # Per-community rollup of the set-aside SCALE votes:
+    # python -m api.commands.rebuild_poll_community_tallies
+
+
+def downgrade() -> None:
+    # The backfilled ranks, ranges and tallies are valid data for the
+    # previous revision. The value-less SCALE votes are put back, except for
+    # voters who cast a new ballot on the poll since (it replaced theirs)
+    op.execute(f"""
+        INSERT INTO pollvote (poll_id, option_id, user_id)
+        SELECT legacy.poll_id, legacy.option_id, legacy.user_id
+        FROM {LEGACY_SCALE_VOTES} AS legacy
+        WHERE NOT EXISTS (
+            SELECT 1 FROM pollvote
+            WHERE pollvote.poll_id = legacy.poll_id AND pollvote.user_id = legacy.user_id
+        )
+        ORDER BY legacy.id
+    """)
+    op.execute(f"DROP TABLE {LEGACY_SCALE_VOTES}")
+    op.execute("""
+        UPDATE polloption SET
+            votes = (SELECT count(*) FROM pollvote WHERE pollvote.option_id = polloption.id)
+        WHERE poll_id IN (SELECT id FROM poll WHERE type = 'SCALE')
+    """)
+    op.execute("""
+        UPDATE poll SET
+            total_votes = (SELECT count(*) FROM pollvote WHERE pollvote.poll_id = poll.id),
+            results_version = results_version + 1
+        WHERE type = 'SCALE'
+    """)
+    # Per-community rollup of the restored SCALE votes:
+    # python -m api.commands.rebuild_poll_community_tallies
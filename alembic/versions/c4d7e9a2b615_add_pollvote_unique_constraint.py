@@ -0,0 +1,41 @@
+"""Add unique (poll_id, user_id, option_id) constraint to pollvote
+
+Revision ID: c4d7e9a2b615
+Revises: 8b2e4d6f1a93
+Create Date: 2025-06-06 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e9a2b615'
+down_revision: Union[str, None] = '8b2e4d6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicate votes left by the old read-modify-write vote path,
+    # keeping the oldest row, then recompute the tallies they inflated
+    op.execute("""
+        DELETE FROM pollvote WHERE id NOT IN (
+            SELECT min(id) FROM pollvote GROUP BY poll_id, user_id, option_id
+        )
+    """)
+    op.execute("""
+        UPDATE polloption SET
+            votes = (SELECT count(*) FROM pollvote WHERE pollvote.option_id = polloption.id)
+    """)
+    op.execute("""
+        UPDATE poll SET
+            total_votes = (SELECT count(*) FROM pollvote WHERE pollvote.poll_id = poll.id)
+    """)
+    op.create_unique_constraint(
+        'uq_pollvote_poll_id_user_id_option_id', 'pollvote', ['poll_id', 'user_id', 'option_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_pollvote_poll_id_user_id_option_id', 'pollvote', type_='unique')
@@ -0,0 +1,41 @@
+"""Add unique (poll_id, user_id) constraint to pollreaction
+
+Revision ID: d2a7c9e4f158
+Revises: b6d1f4a8c273
+Create Date: 2025-06-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c9e4f158'
+down_revision: Union[str, None] = 'b6d1f4a8c273'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicate reactions left by the old read-modify-write reaction
+    # path, keeping the newest row, then recompute the counters they inflated
+    op.execute("""
+        DELETE FROM pollreaction WHERE id NOT IN (
+            SELECT max(id) FROM pollreaction GROUP BY poll_id, user_id
+        )
+    """)
+    op.execute("""
+        UPDATE poll SET
+            likes_count = (SELECT count(*) FROM pollreaction
+                           WHERE pollreaction.poll_id = poll.id AND pollreaction.reaction = 'LIKE'),
+            dislikes_count = (SELECT count(*) FROM pollreaction
+                              WHERE pollreaction.poll_id = poll.id AND pollreaction.reaction = 'DISLIKE'),
+            results_version = results_version + 1
+    """)
+    op.create_unique_constraint(
+        'uq_pollreaction_poll_id_user_id', 'pollreaction', ['poll_id', 'user_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_pollreaction_poll_id_user_id', 'pollreaction', type_='unique')
@@ -0,0 +1,36 @@
+"""Add per-community rollup of poll votes
+
+Revision ID: e8a1d4c7f952
+Revises: 7c4e2b9a5d36
+Create Date: 2025-06-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a1d4c7f952'
+down_revision: Union[str, None] = '7c4e2b9a5d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pollcommunitytally',
+        sa.Column('poll_id', sa.Integer(), nullable=False),
+        sa.Column('community_id', sa.Integer(), nullable=False),
+        sa.Column('option_id', sa.Integer(), nullable=False),
+        sa.Column('votes', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['community_id'], ['community.id'], ),
+        sa.ForeignKeyConstraint(['option_id'], ['polloption.id'], ),
+        sa.ForeignKeyConstraint(['poll_id'], ['poll.id'], ),
+        sa.PrimaryKeyConstraint('poll_id', 'community_id', 'option_id')
+    )
+    # Existing votes: python -m api.commands.rebuild_poll_community_tallies
+
+
+def downgrade() -> None:
+    op.drop_table('pollcommunitytally')
@@ -1,15 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.middleware.db_monitor import DBConnectionMonitorMiddleware
+from api.middleware.metrics import MetricsMiddleware, instrument_engine, metrics_endpoint
 
 from api.public import api as public_api
 from api.config import Settings
+from api.database import engine, async_engine, replicas, async_replicas
+from api.utils.view_counter import view_counter, flush_views_periodically
+from api.public.poll.crud import poll_updates, poll_broadcaster
+
+async def check_replicas(interval: int):
+    """Periodically pings the read replicas, taking failed ones out of rotation"""
+    while True:
+        await to_thread.run_sync(replicas.check_health)
+        await async_replicas.check_health_async()
+        await asyncio.sleep(interval)
 
 def create_app(settings: Settings):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Sync endpoints run in the AnyIO threadpool; size it to the DB pool
+        to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+        health_check = None
+        if replicas.engines:
+            health_check = asyncio.create_task(check_replicas(settings.DB_REPLICA_HEALTH_CHECK_INTERVAL))
+        view_flusher = asyncio.create_task(flush_views_periodically(engine, settings.VIEW_COUNT_FLUSH_INTERVAL))
+        # Live poll results: coalesced pushes, shared between workers by the broadcaster
+        await poll_broadcaster.start()
+        live_updates = asyncio.create_task(poll_updates.run(settings.LIVE_UPDATES_INTERVAL))
+        yield
+        if health_check:
+            health_check.cancel()
+        view_flusher.cancel()
+        live_updates.cancel()
+        await poll_broadcaster.stop()
+        # Write the views buffered since the last periodic flush
+        await to_thread.run_sync(view_counter.flush, engine)
+        await async_engine.dispose()
+
     app = FastAPI(
         title=settings.PROJECT_NAME,
         description=settings.DESCRIPTION,
         version=settings.VERSION,
+        lifespan=lifespan,
     )
     app.add_middleware(
         CORSMiddleware,
@@ -18,10 +53,17 @@ def create_app(settings: Settings):
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    # Add middleware to monitor database connections
-    app.add_middleware(DBConnectionMonitorMiddleware)
+    # Request metrics and database pool instrumentation, exposed at /metrics
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine, "primary")
+    instrument_engine(async_engine, "primary_async")
+    for index, replica in enumerate(replicas.engines):
+        instrument_engine(replica, f"replica_{index}")
+    for index, replica in enumerate(async_replicas.engines):
+        instrument_engine(replica, f"replica_{index}_async")
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
     # Routers
     app.include_router(public_api, prefix="/api/v1")
 
-    return app
\ No newline at end of file
+    return app
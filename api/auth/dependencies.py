@@ -1,14 +1,21 @@
 import os
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
-from api.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.database import get_session, get_async_session
 from api.public.user.models import User, Session as UserSession
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives import hashes
 from jose import jwt, jwe
 import json
+import time
+import hashlib
+from functools import lru_cache
 from datetime import datetime
+from api.config import settings
+from api.utils.cache import TTLCache
 
 AUTHJS_SECRET = os.getenv("AUTHJS_SECRET")
 AUTHJS_SALT = os.getenv("AUTHJS_SALT")
@@ -16,6 +23,13 @@ AUTHJS_SALT = os.getenv("AUTHJS_SALT")
 # Configure HTTPBearer to extract the token from the Authorization header
 security = HTTPBearer()
 
+# Decrypted token payloads, keyed by the SHA-256 digest of the token
+token_cache = TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL)
+
+# Resolved user rows, keyed by email
+user_cache = TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+
+@lru_cache(maxsize=8)
 def get_derived_encryption_key(secret: str, salt: str) -> bytes:
     """
     Derives a 64-byte encryption key using HKDF for A256CBC-HS512.
@@ -38,27 +52,91 @@ def get_derived_encryption_key(secret: str, salt: str) -> bytes:
     key = hkdf.derive(secret.encode('utf-8'))
     return key
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_session)
-):
-    token = credentials.credentials
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No token provided")
+def get_token_digest(token: str) -> str:
+    """
+    Returns the key under which a token's payload is cached.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
-    try:
-        # Derive the encryption key
-        derived_key = get_derived_encryption_key(AUTHJS_SECRET, AUTHJS_SALT)
+def decode_session_token(token: str) -> dict:
+    """
+    Decrypts an Auth.js session token and returns its payload.
+    Verified payloads are cached until the token expires or the cache TTL ends.
+    
+    Args:
+        token (str): The encrypted JWE session token.
+    
+    Returns:
+        dict: The decrypted token payload.
+    """
+    token_digest = get_token_digest(token)
+    token_data = token_cache.get(token_digest)
+    if token_data is not None:
+        return token_data
 
-        # Decrypt the JWE with the derived key
-        decrypted_token = jwe.decrypt(token, derived_key)
-        
-        token_data = json.loads(decrypted_token.decode('utf-8'))
+    # Derive the encryption key (computed once per process)
+    derived_key = get_derived_encryption_key(AUTHJS_SECRET, AUTHJS_SALT)
+
+    # Decrypt the JWE with the derived key
+    decrypted_token = jwe.decrypt(token, derived_key)
+    token_data = json.loads(decrypted_token.decode('utf-8'))
+
+    # Never keep a payload cached beyond the token's own expiration
+    ttl = settings.AUTH_TOKEN_CACHE_TTL
+    if isinstance(token_data.get("exp"), (int, float)):
+        ttl = min(ttl, token_data["exp"] - time.time())
+    token_cache.set(token_digest, token_data, ttl)
+
+    return token_data
+
+def get_cached_user(email: str) -> User | None:
+    """
+    Returns a detached copy of the cached user row for an email, if any.
+    """
+    user_data = user_cache.get(email)
+    if user_data is None:
+        return None
+    return User(**user_data)
+
+def cache_user(user: User) -> None:
+    """
+    Stores a snapshot of a user row in the user cache.
+    """
+    user_cache.set(user.email, user.model_dump())
+
+def invalidate_cached_user(email: str) -> None:
+    """
+    Removes a user from the user cache. Must be called whenever the user row changes.
+    """
+    user_cache.delete(email)
+
+def get_cached_user_for_token(token: str) -> User | None:
+    """
+    Resolves a token to a user using only the in-process caches.
+    Returns None when either the token payload or the user is not cached.
+    """
+    token_data = token_cache.get(get_token_digest(token))
+    if not token_data or not token_data.get("email"):
+        return None
+    return get_cached_user(token_data["email"])
+
+def authenticate_token(token: str, db: Session) -> User:
+    """
+    Decrypts a session token and loads (or creates) its user.
+    Blocking: runs JWE decryption and database queries, so async callers
+    must offload it to the threadpool.
+    """
+    try:
+        token_data = decode_session_token(token)
         
         email = token_data.get("email")
         if not email:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: email not found")
         
+        user = get_cached_user(email)
+        if user:
+            return user
+        
         user = db.exec(select(User).where(User.email == email)).first()
         
         if not user:
@@ -82,11 +160,28 @@ async def get_current_user(
             db.refresh(new_user)
             user = new_user
             
+        cache_user(user)
         return user
     except (jwe.JWEError, jwt.JWTError, json.JSONDecodeError) as e:
         print("Error al procesar el token:", str(e))
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_session)
+):
+    token = credentials.credentials
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No token provided")
+
+    # Fast path: a fully cached token never touches the database or the threadpool
+    user = get_cached_user_for_token(token)
+    if user:
+        return user
+
+    # Decryption and queries are blocking, keep them off the event loop
+    return await run_in_threadpool(authenticate_token, token, db)
+
 async def get_current_user_optional(
     authorization: str | None = Header(default=None),
     db: Session = Depends(get_session)
@@ -104,3 +199,28 @@ async def get_current_user_optional(
         return await get_current_user(credentials=credentials, db=db)
     except (IndexError, HTTPException, AttributeError):
         return None
+
+async def get_current_user_optional_async(
+    authorization: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_session)
+) -> User | None:
+    """
+    Variant of get_current_user_optional for endpoints running on an AsyncSession.
+    """
+    if not authorization:
+        return None
+    
+    try:
+        token = authorization.split(" ")[1] if authorization.startswith("Bearer ") else authorization
+        
+        user = get_cached_user_for_token(token)
+        if user:
+            return user
+        
+        # Decrypt in the threadpool, then resolve the user on the async connection
+        token_data = await run_in_threadpool(decode_session_token, token)
+        if not token_data.get("email"):
+            return None
+        return await db.run_sync(lambda session: authenticate_token(token, session))
+    except (IndexError, HTTPException, AttributeError, jwe.JWEError, jwt.JWTError, json.JSONDecodeError):
+        return None
@@ -0,0 +1 @@
+# Empty init file to make the directory a proper Python package
@@ -0,0 +1,25 @@
+"""
+Rebuilds the per-community rollup of poll votes (PollCommunityTally) from
+the votes and the voters' current communities.
+
+Usage:
+    python -m api.commands.rebuild_poll_community_tallies [--batch-size 100]
+"""
+import json
+import argparse
+from sqlmodel import Session
+from api.database import engine
+from api.public.poll.crud import rebuild_community_tallies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100, help="Polls per batch (one transaction each)")
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        report = rebuild_community_tallies(db, batch_size=args.batch_size)
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Recomputes the denormalized poll counters (likes, dislikes, comments, total
+votes), option vote totals and the tallies of RANKING and SCALE polls
+(option scores, ballots per position or value, ballots per ranking), and
+reports drift.
+
+Usage:
+    python -m api.commands.reconcile_poll_counters [--batch-size 500] [--dry-run]
+
+Exits with status 1 when drift was found, so it can be used as a check.
+"""
+import sys
+import json
+import argparse
+from sqlmodel import Session
+from api.database import engine
+from api.public.poll.crud import reconcile_poll_counters
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Polls per batch (one transaction each)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report drift, do not fix it")
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        report = reconcile_poll_counters(db, batch_size=args.batch_size, fix=not args.dry_run)
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["drifted_polls"] or report["drifted_options"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,160 @@
+import hashlib
+import logging
+import itertools
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from api.config import settings
+from api.utils.cache import TTLCache
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_timeout=settings.DB_POOL_TIMEOUT,
-    pool_recycle=settings.DB_POOL_RECYCLE,
-    pool_pre_ping=True,
-    # echo=settings.ENV == "development"
-)
+logger = logging.getLogger("database")
+
+# Async drivers used for each sync DATABASE_URL scheme
+ASYNC_DRIVERS = {
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+# HTTP methods that never write and may be served by a replica
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Returns the async equivalent of a sync database URL.
+    """
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if database_url.startswith(sync_prefix):
+            return async_prefix + database_url[len(sync_prefix):]
+    return database_url
+
+def build_engine(database_url: str):
+    return create_engine(
+        database_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        # echo=settings.ENV == "development"
+    )
+
+def build_async_engine(database_url: str):
+    return create_async_engine(
+        get_async_database_url(database_url),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+def dialect_insert(db: Session, model):
+    """
+    Returns an INSERT for `model` built with the dialect of the session's
+    database, so on_conflict_do_nothing / on_conflict_do_update are available
+    on both PostgreSQL and SQLite.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+class ReplicaSet:
+    """
+    Round-robin rotation over read-replica engines.
+    A replica that fails a health check (or drops a connection) leaves the
+    rotation until a later health check succeeds.
+    """
+
+    def __init__(self, urls: list[str], engines: list):
+        self.urls = urls
+        self.engines = engines
+        self.healthy = [True] * len(engines)
+        self._counter = itertools.count()
+
+        for index, engine in enumerate(engines):
+            sync_engine = getattr(engine, "sync_engine", engine)
+            event.listen(sync_engine, "handle_error", self._error_listener(index))
+
+    def _error_listener(self, index: int):
+        def on_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark(index, False)
+        return on_error
+
+    def choose(self):
+        """
+        Returns the next healthy replica engine, or None if there is none.
+        """
+        candidates = [engine for engine, ok in zip(self.engines, self.healthy) if ok]
+        if not candidates:
+            return None
+        return candidates[next(self._counter) % len(candidates)]
+
+    def mark(self, index: int, ok: bool) -> None:
+        if self.healthy[index] != ok:
+            logger.warning(f"Replica {index} {'back in' if ok else 'removed from'} rotation")
+        self.healthy[index] = ok
+
+    def check_health(self) -> None:
+        """Pings every sync replica and updates the rotation"""
+        for index, engine in enumerate(self.engines):
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self.mark(index, True)
+            except Exception:
+                self.mark(index, False)
+
+    async def check_health_async(self) -> None:
+        """Pings every async replica and updates the rotation"""
+        for index, engine in enumerate(self.engines):
+            try:
+                async with engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+                self.mark(index, True)
+            except Exception:
+                self.mark(index, False)
+
+engine = build_engine(settings.DATABASE_URL)
+
+async_engine = build_async_engine(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+
+async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replicas = ReplicaSet(replica_urls, [build_engine(url) for url in replica_urls])
+async_replicas = ReplicaSet(replica_urls, [build_async_engine(url) for url in replica_urls])
+
+# Clients that wrote recently; their reads stay on the primary
+recent_writers = TTLCache(maxsize=100000, ttl=settings.DB_REPLICA_STICKY_SECONDS)
+
+def _client_key(request: Request) -> str | None:
+    credentials = request.headers.get("authorization")
+    if credentials:
+        return hashlib.sha256(credentials.encode("utf-8")).hexdigest()
+    return request.client.host if request.client else None
+
+def mark_recent_write(request: Request) -> None:
+    """
+    Pins the client's following reads to the primary for DB_REPLICA_STICKY_SECONDS.
+    """
+    key = _client_key(request)
+    if key:
+        recent_writers.set(key, True)
+
+def can_use_replica(request: Request) -> bool:
+    """
+    True when the request is read-only and its client has not written recently.
+    """
+    if request.method not in READ_ONLY_METHODS:
+        return False
+    key = _client_key(request)
+    return not (key and recent_writers.get(key))
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -20,4 +165,45 @@ def get_session():
             yield session
         except Exception:
             session.rollback()
-            raise
\ No newline at end of file
+            raise
+
+def get_routing_session(request: Request):
+    """
+    Yields a Session bound to a read replica for read-only requests, or to the
+    primary for writes and for clients that wrote within the sticky window.
+    """
+    if request.method not in READ_ONLY_METHODS:
+        mark_recent_write(request)
+    bind = (can_use_replica(request) and replicas.choose()) or engine
+    with Session(bind) as session:
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+
+async def get_async_session():
+    """
+    Yields an AsyncSession that does not hold a threadpool thread while waiting on the database.
+    Sync query code can run on it through `await session.run_sync(fn, ...)`.
+    """
+    async with async_session_maker() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+async def get_async_routing_session(request: Request):
+    """
+    Async counterpart of get_routing_session.
+    """
+    if request.method not in READ_ONLY_METHODS:
+        mark_recent_write(request)
+    bind = (can_use_replica(request) and async_replicas.choose()) or async_engine
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
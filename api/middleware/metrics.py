@@ -0,0 +1,179 @@
+import time
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from api.utils.metrics import registry
+from api.utils.query_counter import QueryCounter, count_queries, warn_if_over_budget
+
+logger = logging.getLogger("metrics")
+
+SLOW_REQUEST_SECONDS = 0.5
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"]
+)
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+REQUEST_ERRORS = registry.counter(
+    "http_request_errors_total", "HTTP requests that failed with a 5xx or an unhandled exception", ["method", "route"]
+)
+REQUEST_STATEMENTS = registry.histogram(
+    "http_request_sql_statements", "SQL statements executed per HTTP request", ["method", "route"],
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+)
+POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+POOL_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["pool"]
+)
+POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", ["pool"]
+)
+POOL_OVERFLOW = registry.gauge(
+    "db_pool_overflow", "Overflow connections currently open beyond DB_POOL_SIZE", ["pool"]
+)
+POOL_SIZE = registry.gauge(
+    "db_pool_size", "Configured pool size", ["pool"]
+)
+
+_instrumented_engines: dict[int, tuple[Engine, str]] = {}
+
+def _update_pool_gauges(pool, name: str) -> None:
+    checkedout = getattr(pool, "checkedout", None)
+    if checkedout is None:
+        return
+    POOL_CHECKED_OUT.set(checkedout(), pool=name)
+    POOL_OVERFLOW.set(max(0, pool.overflow()), pool=name)
+    POOL_SIZE.set(pool.size(), pool=name)
+
+def _time_checkouts(pool, name: str) -> None:
+    """
+    Wraps pool.connect so the time spent waiting for a connection is observed.
+
+    Pool events cannot measure this wait: "checkout" fires once a connection
+    has been handed out, "connect" (and the dialect's "do_connect") only when
+    a new DBAPI connection is opened, and "checkin" when one is returned, so
+    no event marks the moment a caller starts waiting. Pairing a checkin with
+    the next checkout measures how long a connection sat idle, not how long
+    the caller waited, and a checkout that times out fires no event at all.
+    """
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(pool=name)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, pool=name)
+
+    pool.connect = timed_connect
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Exports checkout wait time and checked-out/overflow gauges for an engine's pool.
+
+    Args:
+        engine: Sync or async SQLAlchemy engine
+        name: Value of the `pool` label
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines[id(engine)] = (engine, name)
+
+    @event.listens_for(engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _update_pool_gauges(engine.pool, name)
+
+    @event.listens_for(engine.pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        _update_pool_gauges(engine.pool, name)
+
+    @event.listens_for(engine, "engine_disposed")
+    def on_disposed(engine_):
+        # dispose() replaces the pool; wrap the new one as well
+        _time_checkouts(engine.pool, name)
+
+    _time_checkouts(engine.pool, name)
+    _update_pool_gauges(engine.pool, name)
+
+def route_template(scope: Scope) -> str:
+    """
+    Path template of the matched route, including the include_router prefixes.
+
+    scope["route"] holds the route as declared on its own router ("/{poll_id}/vote");
+    FastAPI keeps the route resolved under the app, whose path_format carries
+    every prefix ("/api/v1/polls/{poll_id}/vote"), on its own scope entry.
+    """
+    effective_route = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(effective_route, "path_format", None)
+    if path is None:
+        route = scope.get("route")
+        path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return path or "unmatched"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status, errors and SQL statement
+    counts per route. Routes are labelled by their full path template.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with count_queries() as counter:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception:
+                status_code = 500
+                raise
+            finally:
+                self.record(scope, status_code, time.perf_counter() - start, counter)
+
+    def record(self, scope: Scope, status_code: int, process_time: float, counter: QueryCounter) -> None:
+        route_path = route_template(scope)
+        method = scope["method"]
+
+        REQUEST_LATENCY.observe(process_time, method=method, route=route_path)
+        REQUESTS.inc(method=method, route=route_path, status=status_code)
+        REQUEST_STATEMENTS.observe(counter.statements, method=method, route=route_path)
+        if status_code >= 500:
+            REQUEST_ERRORS.inc(method=method, route=route_path)
+
+        warn_if_over_budget(counter, f"{method} {route_path}")
+
+        if process_time > SLOW_REQUEST_SECONDS:
+            logger.info(
+                f"Slow request: {method} {route_path} took {process_time:.3f}s "
+                f"with {counter.statements} SQL statements"
+            )
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Exposes all metrics in the Prometheus text format"""
+    for engine, name in _instrumented_engines.values():
+        _update_pool_gauges(engine.pool, name)
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
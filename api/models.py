@@ -158,7 +158,7 @@ from api.public.community.models import Community
 from api.public.organization.models import Organization
 
 # Then import models that depend on the basics
-from api.public.poll.models import Poll, PollOption, PollVote, PollReaction, PollComment, PollCustomResponse
+from api.public.poll.models import Poll, PollOption, PollVote, PollReaction, PollComment, PollCustomResponse, PollOptionTally, PollRankingBallot, PollCommunityTally
 from api.public.debate.models import Debate, PointOfView, Opinion, OpinionVote, DebateChangeLog
 from api.public.project.models import Project, ProjectStep, ProjectResource, ProjectCommitment, ProjectDonation
 from api.public.report.models import Report
@@ -1,12 +1,52 @@
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
+from sqlalchemy import exists
 from typing import Optional
+from api.config import settings
 from api.public.community.models import Community
 from api.public.user.models import UserCommunityLink
 from api.public.user.models import User
 from api.public.community.models import CommunityRequest
+from api.utils.cache import TTLCache
 from datetime import datetime
 
+# (link table, item ID) pairs each user was found to belong to a community
+# of. Only positive checks are kept, so a membership created by another
+# worker is never refused; join_community / leave_community drop the user's
+# entry, other workers see a departure once it expires
+user_memberships = TTLCache(maxsize=settings.MEMBERSHIP_CACHE_SIZE, ttl=settings.MEMBERSHIP_CACHE_TTL)
+
+def is_member_of_item_communities(db: Session, user_id: int, item_column, item_id: int) -> bool:
+    """
+    Whether a user belongs to at least one of the communities of a poll,
+    debate, project or issue, checked with a single EXISTS query joining the
+    item's community links to the user's memberships.
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+        item_column: Item column of the item's community link table,
+            e.g. PollCommunityLink.poll_id
+        item_id: ID of the item
+
+    Returns:
+        True if the user is a member of one of the item's communities
+    """
+    link = item_column.class_
+    key = (link.__tablename__, item_id)
+    checked = user_memberships.get(user_id, frozenset())
+    if key in checked:
+        return True
+
+    is_member = db.exec(select(exists().where(
+        item_column == item_id,
+        UserCommunityLink.community_id == link.community_id,
+        UserCommunityLink.user_id == user_id
+    ))).one()
+    if is_member:
+        user_memberships.set(user_id, checked | {key})
+    return is_member
+
 def get_community(community_id: int, db: Session, check_membership: bool = False, current_user: Optional[User] = None):
     """
     Get a community by its ID.
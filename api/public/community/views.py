@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from sqlmodel import Session, select
 from api.public.community.models import CommunityRead, CommunityLevel
-from api.public.community.crud import get_community
-from api.database import get_session
+from api.public.community.crud import get_community, user_memberships
+from api.public.poll.crud import move_member_community_tallies
+from api.database import get_routing_session
 from sqlalchemy import func, delete, or_
 from api.public.user.models import User, UserCommunityLink
 from api.auth.dependencies import get_current_user_optional, get_current_user
@@ -28,7 +29,7 @@ def search_community(
     subregion: Optional[str] = None,
     local: Optional[str] = None,
     locality: Optional[str] = None,
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Searches for a community by level and geographical criteria.
@@ -148,7 +149,7 @@ def search_community(
     return result
 
 @router.get("/{community_id}", response_model=CommunityRead)
-def read(community_id: int, db: Session = Depends(get_session)):
+def read(community_id: int, db: Session = Depends(get_routing_session)):
     return get_community(community_id, db)
 
 @router.get("/{community_id}/members", response_model=PaginatedResponse)
@@ -157,7 +158,7 @@ def get_community_members(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Items per page"),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get all members of a community.
@@ -279,7 +280,7 @@ def get_community_members(
 def join_community(
     community_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Allows a user to join a community.
@@ -312,7 +313,10 @@ def join_community(
     )
     
     db.add(new_membership)
+    # The user's votes now also count in this community
+    move_member_community_tallies(db, current_user.id, community_id, 1)
     db.commit()
+    user_memberships.delete(current_user.id)
     
     return {"message": "You have joined the community successfully"}
 
@@ -320,7 +324,7 @@ def join_community(
 def leave_community(
     community_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Allows a user to leave a community.
@@ -346,7 +350,9 @@ def leave_community(
             UserCommunityLink.community_id == community_id
         )
     )
+    move_member_community_tallies(db, current_user.id, community_id, -1)
     db.commit()
+    user_memberships.delete(current_user.id)
     
     return {"message": "You have left the community successfully"}
 
@@ -370,7 +376,7 @@ class CommunityRequestResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 @router.post("/requests/", response_model=CommunityRequestResponse)
-def create_community_request_endpoint(request: CommunityRequestCreate, db: Session = Depends(get_session)):
+def create_community_request_endpoint(request: CommunityRequestCreate, db: Session = Depends(get_routing_session)):
     """
     Endpoint to receive requests for new communities
     """
@@ -386,7 +392,7 @@ def get_community_requests_endpoint(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[str] = None, 
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Endpoint to get all community requests (with optional filter)
@@ -394,7 +400,7 @@ def get_community_requests_endpoint(
     return get_community_requests(db, skip, limit, status)
 
 @router.put("/requests/{request_id}/status")
-def update_request_status(request_id: int, status: str, db: Session = Depends(get_session)):
+def update_request_status(request_id: int, status: str, db: Session = Depends(get_routing_session)):
     """
     Endpoint to update the status of a request
     """
@@ -1,6 +1,12 @@
 from sqlmodel import Session, select
 from typing import Optional
+from api.config import settings
 from api.public.country.models import Country
+from api.utils.cache import TTLCache
+
+# Countries only change through migrations and seed scripts, so the index
+# is simply rebuilt once it expires
+country_code_index = TTLCache(maxsize=1, ttl=settings.COUNTRY_INDEX_CACHE_TTL)
 
 def get_all_countries(session: Session) -> list[Country]:
     statement = select(Country)
@@ -25,4 +31,24 @@ def get_country_by_code(session: Session, code: str) -> Optional[Country]:
     """
     statement = select(Country).where(Country.cca2 == code)
     result = session.exec(statement).first()
-    return result
\ No newline at end of file
+    return result
+
+def get_country_codes_by_community(session: Session) -> dict[int, str]:
+    """
+    Gets the CCA2 code of every country, indexed by the ID of its community.
+    The index is loaded with one query and kept in memory.
+
+    Args:
+        session: Database session
+
+    Returns:
+        Dictionary mapping community IDs to CCA2 codes
+    """
+    index = country_code_index.get("index")
+    if index is None:
+        index = dict(session.exec(
+            select(Country.community_id, Country.cca2)
+            .where(Country.community_id != None, Country.cca2 != None)
+        ).all())
+        country_code_index.set("index", index)
+    return index
@@ -5,7 +5,7 @@ from typing import Optional
 from pydantic import BaseModel
 import datetime
 
-from api.database import get_session
+from api.database import get_routing_session
 from api.public.country.models import Country
 from api.public.country.crud import get_all_countries, get_country_by_name, get_country_by_code
 from api.public.region.models import Region
@@ -13,11 +13,11 @@ from api.public.region.models import Region
 router = APIRouter()
 
 @router.get("/", response_model=list[Country])
-def read_countries(db: Session = Depends(get_session)):
+def read_countries(db: Session = Depends(get_routing_session)):
     return get_all_countries(db)
 
 @router.get("/{country_code}", response_model=Country)
-def read_country_by_code(country_code: str, db: Session = Depends(get_session)):
+def read_country_by_code(country_code: str, db: Session = Depends(get_routing_session)):
     """
     Retrieves a country using its CCA2 code (ISO 3166-1 alpha-2)
     """
@@ -29,7 +29,7 @@ def read_country_by_code(country_code: str, db: Session = Depends(get_session)):
 @router.get("/{country_code}/divisions", response_model=list[Region])
 def get_country_divisions(
     country_code: str,
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Retrieves all divisions (subnations) of a specific country using its country code (cca2)
@@ -66,7 +66,7 @@ class CommunityRequestResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 @router.post("/community-requests/", response_model=CommunityRequestResponse)
-def create_community_request(request: CommunityRequestCreate, db: Session = Depends(get_session)):
+def create_community_request(request: CommunityRequestCreate, db: Session = Depends(get_routing_session)):
     """
     Endpoint to receive requests for new communities
     """
@@ -82,7 +82,7 @@ def get_community_requests(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[str] = None, 
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Endpoint to get all community requests (with optional filtering)
@@ -90,7 +90,7 @@ def get_community_requests(
     return get_community_requests(db, skip, limit, status)
 
 @router.put("/community-requests/{request_id}/status")
-def update_request_status(request_id: int, status: str, db: Session = Depends(get_session)):
+def update_request_status(request_id: int, status: str, db: Session = Depends(get_routing_session)):
     """
     Endpoint to update the status of a request
     """
@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Optional
 from datetime import datetime
 from sqlmodel import Field, Relationship, SQLModel, Column
-from sqlalchemy import JSON, BigInteger
+from sqlalchemy import JSON, BigInteger, Index
 from api.public.tag.models import Tag
 from api.public.user.models import User
 from api.public.community.models import Community
@@ -46,6 +46,11 @@ class DebateBase(SQLModel):
 
 # Main Debate model, representing the debates table in the database
 class Debate(DebateBase, table=True):
+    # Keyset pagination of the listing (newest first)
+    __table_args__ = (
+        Index("ix_debate_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     creator_id: int = Field(foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Debate creation date", index=True)
@@ -225,10 +230,12 @@ class DebateUpdate(SQLModel):
 
 class PaginatedDebateResponse(SQLModel):
     items: list[DebateRead]
-    total: int
+    # None when the listing was requested with include_total=false
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class CommentBase(SQLModel):
     content: str = Field(max_length=1000, description="Content of the comment")
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
 from sqlmodel import Session, select, delete, func
 from typing import Optional
-from api.database import get_session
-from api.auth.dependencies import get_current_user, get_current_user_optional
+from api.database import get_routing_session, get_async_routing_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.auth.dependencies import get_current_user, get_current_user_optional, get_current_user_optional_async
 from api.public.user.models import UserRole
 from api.public.community.models import Community, CommunityLevel
-from api.public.community.crud import get_community_by_id
+from api.public.community.crud import get_community_by_id, is_member_of_item_communities
 from api.public.country.crud import get_country_by_code
 from api.public.region.crud import get_region_by_id
 from api.public.subregion.crud import get_subregion_by_id
 from api.public.locality.models import Locality
-from api.public.tag.crud import get_tag_by_name, create_tag
+from api.public.tag.crud import get_or_create_tags
+from api.utils.generic_models import DebateTagLink
 from api.public.debate.models import (
     Debate, DebateCreate, DebateRead, DebateUpdate, 
     PointOfView, Opinion, 
@@ -20,7 +22,9 @@ from api.public.debate.models import (
     PaginatedDebateResponse,
     CommentCreate, CommentRead
 )
-from api.utils.slug import create_slug
+from api.utils.slug import create_slug, add_with_unique_slug
+from api.utils.view_counter import view_counter
+from api.utils.pagination import keyset_paginate, page_with_cursor, list_total, list_totals, page_count
 from datetime import datetime
 from api.public.country.models import Country
 from sqlalchemy import text
@@ -36,29 +40,14 @@ router = APIRouter()
 def create_debate(
     debate_data: DebateCreate,
     current_user = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_routing_session)
 ):
     """Create a new debate"""
     
-    # Generate the base slug from the title
-    base_slug = create_slug(debate_data.title)
-    
-    # Check if the slug already exists and create a unique one
-    slug = base_slug
-    counter = 1
-    
-    # Check if the slug exists
-    while session.exec(select(Debate).where(Debate.slug == slug)).first() is not None:
-        # If it exists, create a new slug with a numeric suffix
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-    
-    # Create the debate with the unique slug
     new_debate = Debate(
         title=debate_data.title,
         description=debate_data.description,
         type=debate_data.type,
-        slug=slug,  # Use the unique slug generated
         language=debate_data.language,
         public=debate_data.public,
         images=debate_data.images,
@@ -66,15 +55,12 @@ def create_debate(
         creator_id=current_user.id
     )
     
-    session.add(new_debate)
-    session.flush()  # To get the ID
+    # Flushed with a unique slug, which also gets the ID
+    add_with_unique_slug(session, new_debate, create_slug(debate_data.title), max_length=100)
     
     # Add tags
-    for tag_name in debate_data.tags:
-        tag = get_tag_by_name(session, tag_name)
-        if not tag:
-            tag = create_tag(session, tag_name)
-        new_debate.tags.append(tag)
+    tag_ids = get_or_create_tags(session, debate_data.tags)
+    session.add_all(DebateTagLink(debate_id=new_debate.id, tag_id=tag_id) for tag_id in tag_ids.values())
     
     # Add communities according to debate type
     if debate_data.type == DebateType.GLOBAL:
@@ -176,13 +162,17 @@ def create_debate(
                     pov.communities.append(community)
     
     session.commit()
+    list_totals.invalidate("debate")
     session.refresh(new_debate)
     
     # Build response
     return get_debate_read(session, new_debate)
 
+# Sort key of the debate listing, used for keyset (cursor) pagination
+DEBATE_SORT_KEY = [Debate.created_at, Debate.id]
+
 @router.get("/", response_model=PaginatedDebateResponse)
-def get_debates(
+async def get_debates(
     type: Optional[DebateType] = None,
     community_id: Optional[int] = None, 
     country_code: Optional[str] = None,
@@ -193,10 +183,46 @@ def get_debates(
     search: Optional[str] = None,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Items per page"),
-    current_user = Depends(get_current_user_optional),
-    session: Session = Depends(get_session)
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(default=True, description="Count the matching debates (total and pages)"),
+    current_user = Depends(get_current_user_optional_async),
+    session: AsyncSession = Depends(get_async_routing_session)
 ):
     """Get debates with optional filters"""
+    return await session.run_sync(
+        list_debates,
+        type=type,
+        community_id=community_id,
+        country_code=country_code,
+        region_id=region_id,
+        subregion_id=subregion_id,
+        locality_id=locality_id,
+        tag=tag,
+        search=search,
+        page=page,
+        size=size,
+        cursor=cursor,
+        include_total=include_total,
+        current_user=current_user
+    )
+
+def list_debates(
+    session: Session,
+    type: Optional[DebateType] = None,
+    community_id: Optional[int] = None,
+    country_code: Optional[str] = None,
+    region_id: Optional[int] = None,
+    subregion_id: Optional[int] = None,
+    locality_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    page: int = 1,
+    size: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    current_user = None
+):
+    """Sync implementation of get_debates, run on the request's AsyncSession"""
     # Calculate offset for pagination
     offset = (page - 1) * size
     
@@ -258,16 +284,21 @@ def get_debates(
     
     # Count total for pagination
     total_query = select(func.count()).select_from(query.subquery())
-    total = session.exec(total_query).first() or 0
-    total_pages = (total + size - 1) // size  # Ceiling division
-    
-    # Order by creation date (most recent first)
-    query = query.order_by(Debate.created_at.desc())
+    filters = {
+        "type": type, "community_id": community_id, "country_code": country_code, "region_id": region_id,
+        "subregion_id": subregion_id, "locality_id": locality_id, "tag": tag, "search": search,
+    }
+    # Soft-deleted debates are always left out, so the listing is never the
+    # whole table and the planner's row estimate does not apply
+    total = list_total(session, "debate", filters, total_query, include_total)
     
-    # Apply pagination
-    query = query.offset(offset).limit(size)
+    # Order by creation date (most recent first) and apply pagination,
+    # by keyset when a cursor is given
+    query = keyset_paginate(query, DEBATE_SORT_KEY, cursor, size)
+    if not cursor:
+        query = query.offset(offset)
     
-    debates = session.exec(query).all()
+    debates, next_cursor = page_with_cursor(session.exec(query).all(), DEBATE_SORT_KEY, size)
     
     # Prepare response with pagination metadata
     return {
@@ -275,14 +306,15 @@ def get_debates(
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
 @router.get("/{debate_id_or_slug}", response_model=DebateRead)
 def get_debate(
     debate_id_or_slug: str,
     current_user = Depends(get_current_user_optional),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_routing_session)
 ):
     """Get a specific debate by ID or slug"""
     # Determine if it is ID or slug
@@ -294,9 +326,8 @@ def get_debate(
     if not debate or debate.deleted_at:
         raise HTTPException(status_code=404, detail="Debate not found")
     
-    # Increment view count
-    debate.views_count += 1
-    session.commit()
+    # Count the view; it is written in the background
+    view_counter.add(Debate, debate.id)
     
     # Get the debate with the read format
     debate_read = get_debate_read(session, debate, current_user)
@@ -403,7 +434,7 @@ def update_debate(
     debate_id: int,
     debate_update: DebateUpdate,
     current_user = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_routing_session)
 ):
     """Update an existing debate"""
     debate = session.get(Debate, debate_id)
@@ -419,13 +450,9 @@ def update_debate(
     
     # Handle tags if provided
     if "tags" in update_data:
-        tags = update_data.pop("tags")
-        debate.tags.clear()
-        for tag_name in tags:
-            tag = get_tag_by_name(session, tag_name)
-            if not tag:
-                tag = create_tag(session, tag_name)
-            debate.tags.append(tag)
+        tag_ids = get_or_create_tags(session, update_data.pop("tags"))
+        session.exec(delete(DebateTagLink).where(DebateTagLink.debate_id == debate.id))
+        session.add_all(DebateTagLink(debate_id=debate.id, tag_id=tag_id) for tag_id in tag_ids.values())
     
     # Handle communities if provided
     if "community_ids" in update_data:
@@ -444,6 +471,8 @@ def update_debate(
     debate.updated_at = datetime.utcnow()
     
     session.commit()
+    # Communities, tags and texts are listing filters
+    list_totals.invalidate("debate")
     session.refresh(debate)
     
     return get_debate_read(session, debate)
@@ -452,7 +481,7 @@ def update_debate(
 def delete_debate(
     debate_id: int,
     current_user = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_routing_session)
 ):
     """Delete (mark as deleted) a debate"""
     debate = session.get(Debate, debate_id)
@@ -466,6 +495,7 @@ def delete_debate(
     # Mark as deleted
     debate.deleted_at = datetime.utcnow()
     session.commit()
+    list_totals.invalidate("debate")
     
     return None
 
@@ -474,7 +504,7 @@ def create_debate_opinion(
     debate_id: int,
     opinion_data: OpinionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create an opinion for a specific debate.
@@ -578,7 +608,7 @@ def vote_opinion(
     opinion_id: int,
     vote_data: OpinionVoteCreate,
     current_user = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_routing_session)
 ):
     """Vote an opinion (positive or negative)"""
     opinion = session.get(Opinion, opinion_id)
@@ -612,7 +642,7 @@ def vote_opinion(
 def delete_opinion(
     opinion_id: int,
     current_user = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_routing_session)
 ):
     """Delete an opinion from a debate (only the owner or admin)"""
     
@@ -656,7 +686,7 @@ def create_opinion(
     pov_id: int,
     opinion_data: OpinionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create a new opinion in a point of view.
@@ -671,19 +701,7 @@ def create_opinion(
         )
 
     # Check that the user is a member of at least one of the debate communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    debate_communities = db.exec(
-        select(DebateCommunityLink.community_id)
-        .where(DebateCommunityLink.debate_id == debate_id)
-    ).all()
-    debate_community_ids = set(dc.community_id for dc in debate_communities)
-    
-    if not user_community_ids.intersection(debate_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, DebateCommunityLink.debate_id, debate_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to opine in this debate"
@@ -707,7 +725,7 @@ def vote_opinion(
     opinion_id: int,
     vote_value: int = Body(..., embed=True),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Vote an opinion (1 for positive, -1 for negative).
@@ -722,19 +740,7 @@ def vote_opinion(
         )
 
     # Check that the user is a member of at least one of the debate communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    debate_communities = db.exec(
-        select(DebateCommunityLink.community_id)
-        .where(DebateCommunityLink.debate_id == debate_id)
-    ).all()
-    debate_community_ids = set(dc.community_id for dc in debate_communities)
-    
-    if not user_community_ids.intersection(debate_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, DebateCommunityLink.debate_id, debate_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to vote in this debate"
@@ -748,7 +754,7 @@ def create_debate_comment(
     debate_id: int,
     comment_data: CommentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create a new comment in the debate.
@@ -763,19 +769,7 @@ def create_debate_comment(
         )
 
     # Check that the user is a member of at least one of the debate communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    debate_communities = db.exec(
-        select(DebateCommunityLink.community_id)
-        .where(DebateCommunityLink.debate_id == debate_id)
-    ).all()
-    debate_community_ids = set(dc.community_id for dc in debate_communities)
-    
-    if not user_community_ids.intersection(debate_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, DebateCommunityLink.debate_id, debate_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to comment in this debate"
@@ -1,5 +1,3 @@
-import random
-import string
 from sqlmodel import Session, select, func, distinct
 from api.public.issue.models import (
     Issue, IssueCreate, IssueUpdate, 
@@ -10,7 +8,7 @@ from api.public.issue.models import (
 )
 from api.public.user.models import User
 from api.public.organization.models import Organization
-from api.utils.slug import create_slug
+from api.utils.slug import create_slug, add_with_unique_slug
 from datetime import datetime
 from fastapi import HTTPException, status
 from api.public.community.crud import get_community_by_id
@@ -19,10 +17,13 @@ from api.public.region.crud import get_region_by_id
 from api.public.subregion.crud import get_subregion_by_id
 from api.public.locality.models import Locality
 from api.public.country.models import Country
-from math import ceil
 from api.utils.shared_models import CommunityMinimal
-from api.utils.generic_models import IssueCommunityLink
-from api.public.tag.crud import get_tag_by_name, create_tag
+from api.utils.generic_models import IssueCommunityLink, IssueTagLink
+from api.utils.pagination import keyset_paginate, page_with_cursor, list_total, list_totals, page_count
+from api.public.tag.crud import get_or_create_tags
+
+# Sort key of the issue listing, used for keyset (cursor) pagination
+ISSUE_SORT_KEY = [Issue.created_at, Issue.id]
 
 def get_all_issues(
     db: Session,
@@ -37,10 +38,17 @@ def get_all_issues(
     search = None,
     current_user_id = None,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
     """
-    Retrieves all issues with pagination and optional filters
+    Retrieves all issues with pagination and optional filters.
+    With a cursor (the next_cursor of the previous response) the page is
+    fetched by keyset instead of by offset, and `page` is ignored.
+    Without include_total the count is skipped and total/pages are None;
+    with estimate_total an unfiltered listing reports the planner estimate.
     """
     # Calculate offset for pagination
     offset = (page - 1) * size
@@ -83,8 +91,12 @@ def get_all_issues(
         if locality and locality.community:
             total_query = total_query.join(IssueCommunityLink).where(IssueCommunityLink.community_id == locality.community.id)
     
-    total = db.exec(total_query).first() or 0
-    total_pages = ceil(total / size)
+    filters = {
+        "status": status, "scope": scope, "community_id": community_id, "country_code": country_code,
+        "region_id": region_id, "subregion_id": subregion_id, "locality_id": locality_id,
+        "creator_id": creator_id, "search": search,
+    }
+    total = list_total(db, "issue", filters, total_query, include_total, estimate_total)
 
     # Main query to get the issues
     issues_query = select(Issue).where(Issue.id > 0)
@@ -125,32 +137,25 @@ def get_all_issues(
             issues_query = issues_query.join(IssueCommunityLink).where(IssueCommunityLink.community_id == locality.community.id)
     
     # Add sorting and pagination
-    issues_query = issues_query.order_by(Issue.created_at.desc()).offset(offset).limit(size)
+    issues_query = keyset_paginate(issues_query, ISSUE_SORT_KEY, cursor, size)
+    if not cursor:
+        issues_query = issues_query.offset(offset)
     
-    issues = db.exec(issues_query).all()
+    issues, next_cursor = page_with_cursor(db.exec(issues_query).all(), ISSUE_SORT_KEY, size)
     
     return {
         "items": [enrich_issue(db, issue, current_user_id) for issue in issues],
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
 def create_issue(db: Session, issue_data: IssueCreate, user_id: int) -> Issue:
     """
     Creates a new issue
     """
-    # Generate unique slug
-    slug = create_slug(issue_data.title)
-    
-    # Check if the slug already exists
-    existing = db.exec(select(Issue).where(Issue.slug == slug)).first()
-    if existing:
-        # Add random suffix if the slug already exists
-        random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
-        slug = f"{slug}-{random_suffix}"
-    
     # Create issue
     new_issue = Issue(
         title=issue_data.title,
@@ -158,7 +163,6 @@ def create_issue(db: Session, issue_data: IssueCreate, user_id: int) -> Issue:
         status=issue_data.status,
         priority=issue_data.priority,
         scope=issue_data.scope,
-        slug=slug,
         creator_id=user_id,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
@@ -167,15 +171,12 @@ def create_issue(db: Session, issue_data: IssueCreate, user_id: int) -> Issue:
         organization_id=issue_data.organization_id,
         is_anonymous=issue_data.is_anonymous
     )
-    db.add(new_issue)
-    db.flush()  # Get generated ID
+    # Flushed with a unique slug, which also gets the generated ID
+    add_with_unique_slug(db, new_issue, create_slug(issue_data.title), max_length=250)
     
     # Add tags to the issue
-    for tag_name in issue_data.tags:
-        tag = get_tag_by_name(db, tag_name)
-        if not tag:
-            tag = create_tag(db, tag_name)
-        new_issue.tags.append(tag)
+    tag_ids = get_or_create_tags(db, issue_data.tags)
+    db.add_all(IssueTagLink(issue_id=new_issue.id, tag_id=tag_id) for tag_id in tag_ids.values())
     
     # Add communities based on the issue's scope
     if issue_data.scope == IssueScope.INTERNATIONAL and issue_data.country_codes:
@@ -211,6 +212,7 @@ def create_issue(db: Session, issue_data: IssueCreate, user_id: int) -> Issue:
             new_issue.communities.append(community)
     
     db.commit()
+    list_totals.invalidate("issue")
     db.refresh(new_issue)
     
     return enrich_issue(db, new_issue, user_id)
@@ -276,6 +278,8 @@ def update_issue(db: Session, issue_id: int, issue_data: IssueUpdate, current_us
     
     db.add(issue)
     db.commit()
+    # Status, communities and texts are listing filters
+    list_totals.invalidate("issue")
     db.refresh(issue)
     
     return enrich_issue(db, issue, current_user_id)
@@ -293,6 +297,7 @@ def delete_issue(db: Session, issue_id: int) -> None:
     
     db.delete(issue)
     db.commit()
+    list_totals.invalidate("issue")
 
 def add_issue_comment(db: Session, issue_id: int, user_id: int, comment_data: IssueCommentCreate):
     """
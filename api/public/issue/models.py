@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Optional
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Relationship, Column
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 from api.public.user.models import User
 from api.public.organization.models import Organization, OrganizationRead
 from api.public.tag.models import Tag
@@ -35,6 +35,11 @@ class IssuePriority(str, Enum):
 
 # Main model for issue reports
 class Issue(SQLModel, table=True):
+    # Keyset pagination of the listing (newest first)
+    __table_args__ = (
+        Index("ix_issue_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=200, index=True)
     description: str = Field(max_length=5000)
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session, select
 from datetime import datetime
 from typing import Optional
-from api.database import get_session
-from api.auth.dependencies import get_current_user, get_current_user_optional
+from api.database import get_routing_session, get_async_routing_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.auth.dependencies import get_current_user, get_current_user_optional, get_current_user_optional_async
 from api.public.user.models import User, UserRole
 from api.public.issue.models import (
     Issue, IssueCreate, IssueRead, IssueUpdate, 
@@ -15,12 +16,14 @@ from api.public.issue.crud import (
     update_issue, delete_issue, add_issue_comment,
     add_issue_support, add_issue_update
 )
-from api.utils.generic_models import UserCommunityLink, IssueCommunityLink
+from api.utils.generic_models import IssueCommunityLink
+from api.public.community.crud import is_member_of_item_communities
+from api.utils.view_counter import view_counter
 
 router = APIRouter()
 
 @router.get("/")
-def read_issues(
+async def read_issues(
     status: Optional[IssueStatus] = None,
     scope: Optional[str] = None,
     community_id: Optional[int] = None,
@@ -32,8 +35,11 @@ def read_issues(
     search: Optional[str] = None,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Items per page"),
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(default=True, description="Count the matching issues (total and pages)"),
+    estimate_total: bool = Query(default=False, description="Use the database's row estimate for unfiltered listings"),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncSession = Depends(get_async_routing_session)
 ):
     """
     Get issues with optional filters and pagination.
@@ -48,6 +54,9 @@ def read_issues(
     - search: Search by text in title or description
     - page: Page number (default: 1)
     - size: Items per page (default: 10, max: 100)
+    - cursor: Opaque cursor from a previous response's next_cursor; faster than page on deep pages
+    - include_total: Set to false to skip counting; total and pages are then null
+    - estimate_total: Approximate total (PostgreSQL planner estimate) when no filter is applied
     """
     # Filtrar parámetros indefinidos o nulos
     if country_code == "undefined" or country_code == "null":
@@ -66,8 +75,8 @@ def read_issues(
         locality_id = None
     
     try:
-        return get_all_issues(
-            db, 
+        return await db.run_sync(
+            get_all_issues,
             status=status,
             scope=scope,
             community_id=community_id,
@@ -79,8 +88,13 @@ def read_issues(
             search=search,
             current_user_id=current_user.id if current_user else None,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            include_total=include_total,
+            estimate_total=estimate_total
         )
+    except HTTPException:
+        raise
     except Exception as e:
         # Registrar el error para depuración
         print(f"Error al obtener issues: {str(e)}")
@@ -94,7 +108,7 @@ def read_issues(
 def create_new_issue(
     issue_data: IssueCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create a new issue.
@@ -106,7 +120,7 @@ def create_new_issue(
 def get_issue(
     issue_id_or_slug: str,
     current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get a specific issue by ID or slug.
@@ -118,12 +132,8 @@ def get_issue(
         current_user_id=current_user.id if current_user else None
     )
     
-    # Increment view counter
-    db_issue = db.get(Issue, issue.id)
-    if db_issue:
-        db_issue.views_count += 1
-        db.add(db_issue)
-        db.commit()
+    # Count the view; it is written in the background
+    view_counter.add(Issue, issue.id)
     
     return issue
 
@@ -132,7 +142,7 @@ def update_issue_details(
     issue_id: int,
     issue_data: IssueUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Update an existing issue.
@@ -158,7 +168,7 @@ def update_issue_details(
 def delete_issue_endpoint(
     issue_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Delete an issue.
@@ -185,7 +195,7 @@ def add_comment(
     issue_id: int,
     comment_data: IssueCommentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Add a comment to an issue.
@@ -200,19 +210,7 @@ def add_comment(
         )
 
     # Verify that the user is a member of at least one of the issue's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    issue_communities = db.exec(
-        select(IssueCommunityLink.community_id)
-        .where(IssueCommunityLink.issue_id == issue_id)
-    ).all()
-    issue_community_ids = set(ic.community_id for ic in issue_communities)
-    
-    if not user_community_ids.intersection(issue_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, IssueCommunityLink.issue_id, issue_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to comment on this issue"
@@ -224,7 +222,7 @@ def add_comment(
 def toggle_support(
     issue_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Toggle support for an issue. If the user already supports the issue,
@@ -240,19 +238,7 @@ def toggle_support(
         )
 
     # Verify that the user is a member of at least one of the issue's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    issue_communities = db.exec(
-        select(IssueCommunityLink.community_id)
-        .where(IssueCommunityLink.issue_id == issue_id)
-    ).all()
-    issue_community_ids = set(ic.community_id for ic in issue_communities)
-    
-    if not user_community_ids.intersection(issue_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, IssueCommunityLink.issue_id, issue_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to support this issue"
@@ -265,7 +251,7 @@ def add_update(
     issue_id: int,
     update_data: IssueUpdateCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Add an update to an issue.
@@ -280,19 +266,7 @@ def add_update(
         )
 
     # Verify that the user is a member of at least one of the issue's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    issue_communities = db.exec(
-        select(IssueCommunityLink.community_id)
-        .where(IssueCommunityLink.issue_id == issue_id)
-    ).all()
-    issue_community_ids = set(ic.community_id for ic in issue_communities)
-    
-    if not user_community_ids.intersection(issue_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, IssueCommunityLink.issue_id, issue_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to update this issue"
@@ -1,7 +1,7 @@
 from sqlmodel import Session, select, func
 from fastapi import HTTPException, status
-from math import ceil
 from .models import Organization, OrganizationCreate, OrganizationRead
+from api.utils.pagination import keyset_paginate, page_with_cursor, list_total, list_totals, page_count
 
 def create_organization(db: Session, organization_data: OrganizationCreate) -> Organization:
     """
@@ -10,6 +10,7 @@ def create_organization(db: Session, organization_data: OrganizationCreate) -> O
     new_organization = Organization(**organization_data.dict())
     db.add(new_organization)
     db.commit()
+    list_totals.invalidate("organization")
     db.refresh(new_organization)
     return new_organization
 
@@ -25,6 +26,9 @@ def get_organization_by_id(db: Session, organization_id: int) -> Organization:
         )
     return organization
 
+# Sort key of the organization listing, used for keyset (cursor) pagination
+ORGANIZATION_SORT_KEY = [Organization.name, Organization.id]
+
 def get_all_organizations(
     db: Session,
     level = None,
@@ -34,10 +38,17 @@ def get_all_organizations(
     locality_id = None,
     search = None,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
     """
-    Gets all organizations with optional filters
+    Gets all organizations with optional filters, sorted by name.
+    With a cursor (the next_cursor of the previous response) the page is
+    fetched by keyset instead of by offset, and `page` is ignored.
+    Without include_total the count is skipped and total/pages are None;
+    with estimate_total an unfiltered listing reports the planner estimate.
     """
     # Calculate offset for pagination
     offset = (page - 1) * size
@@ -65,8 +76,11 @@ def get_all_organizations(
             Organization.name.contains(search) | Organization.description.contains(search)
         )
     
-    total = db.exec(total_query).first() or 0
-    total_pages = ceil(total / size)
+    filters = {
+        "level": level, "community_id": community_id, "region_id": region_id,
+        "subregion_id": subregion_id, "locality_id": locality_id, "search": search,
+    }
+    total = list_total(db, "organization", filters, total_query, include_total, estimate_total)
 
     # Main query to get the organizations
     organizations_query = select(Organization).where(Organization.id > 0)
@@ -92,16 +106,19 @@ def get_all_organizations(
         )
     
     # Add sorting and pagination
-    organizations_query = organizations_query.order_by(Organization.name).offset(offset).limit(size)
+    organizations_query = keyset_paginate(organizations_query, ORGANIZATION_SORT_KEY, cursor, size, descending=False)
+    if not cursor:
+        organizations_query = organizations_query.offset(offset)
     
-    organizations = db.exec(organizations_query).all()
+    organizations, next_cursor = page_with_cursor(db.exec(organizations_query).all(), ORGANIZATION_SORT_KEY, size)
     
     return {
         "items": organizations,
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
 def update_organization(db: Session, organization_id: int, organization_data: dict) -> Organization:
@@ -116,6 +133,8 @@ def update_organization(db: Session, organization_id: int, organization_data: di
     
     db.add(organization)
     db.commit()
+    # Level, communities, places and texts are listing filters
+    list_totals.invalidate("organization")
     db.refresh(organization)
     return organization
 
@@ -125,4 +144,5 @@ def delete_organization(db: Session, organization_id: int) -> None:
     """
     organization = get_organization_by_id(db, organization_id)
     db.delete(organization)
-    db.commit() 
\ No newline at end of file
+    db.commit()
+    list_totals.invalidate("organization")
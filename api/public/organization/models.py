@@ -2,6 +2,7 @@ from enum import Enum
 from typing import Optional
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index
 
 # Enums
 class OrganizationLevel(str, Enum):
@@ -12,6 +13,11 @@ class OrganizationLevel(str, Enum):
 
 # Model for organizations
 class Organization(SQLModel, table=True):
+    # Keyset pagination of the listing (by name)
+    __table_args__ = (
+        Index("ix_organization_name_id", "name", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(max_length=200, index=True)
     level: OrganizationLevel = Field(index=True)
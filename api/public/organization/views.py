@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session
 from typing import Optional
-from api.database import get_session
+from api.database import get_routing_session
 from api.auth.dependencies import get_current_user
 from api.public.user.models import User, UserRole
 from .models import Organization, OrganizationCreate, OrganizationRead
@@ -19,7 +19,10 @@ def read_organizations(
     search: Optional[str] = None,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_session)
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(default=True, description="Count the matching organizations (total and pages)"),
+    estimate_total: bool = Query(default=False, description="Use the database's row estimate for unfiltered listings"),
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get organizations with optional filters and pagination.
@@ -33,14 +36,17 @@ def read_organizations(
         locality_id=locality_id,
         search=search,
         page=page,
-        size=size
+        size=size,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total
     )
 
 @router.post("/", response_model=OrganizationRead, status_code=status.HTTP_201_CREATED)
 def create_new_organization(
     organization_data: OrganizationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create a new organization.
@@ -57,7 +63,7 @@ def create_new_organization(
 @router.get("/{organization_id}", response_model=OrganizationRead)
 def get_organization(
     organization_id: int,
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get a specific organization by ID.
@@ -69,7 +75,7 @@ def update_organization_details(
     organization_id: int,
     organization_data: OrganizationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Update an existing organization.
@@ -87,7 +93,7 @@ def update_organization_details(
 def delete_organization_endpoint(
     organization_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Delete an organization.
@@ -1,31 +1,125 @@
-import random
-import string
+from collections import Counter
+from itertools import groupby
 from sqlmodel import Session, select, func, distinct
-from api.public.poll.models import Poll, PollOption, PollCreate, PollVote, PollReaction, ReactionType, PollCustomResponse
-from api.public.community.models import Community
+from sqlalchemy import update, delete, insert, bindparam, case
+from sqlalchemy.exc import IntegrityError
+from api.database import dialect_insert, engine
+from api.public.poll.models import Poll, PollOption, PollCreate, PollVote, PollReaction, ReactionType, PollCustomResponse, PollOptionTally, PollRankingBallot, PollCommunityTally
+from api.public.poll.tally import RankedBallots, instant_runoff, ranking_key
+from api.public.community.models import Community, CommunityLevel
 from slugify import slugify
 from datetime import datetime
 from fastapi import HTTPException, status
 from api.public.poll.models import PollStatus, PollType
 from api.public.user.models import User
 from api.public.poll.models import PollComment
-from api.utils.generic_models import PollCommunityLink
+from api.utils.generic_models import PollCommunityLink, UserCommunityLink
 from api.public.country.models import Country
+from api.public.country.crud import get_country_codes_by_community
 from api.public.region.models import Region
-from math import ceil
-from api.public.tag.crud import get_tag_by_name, create_tag
+from api.public.tag.crud import get_or_create_tags
 from api.public.tag.models import Tag
 from api.utils.generic_models import PollTagLink
+from api.config import settings
+from api.utils.cache import TTLCache
+from api.utils.slug import add_with_unique_slug, allocate_slugs
+from api.utils.live_updates import Broker, build_broadcaster
+from api.utils.pagination import keyset_paginate, page_with_cursor, list_total, list_totals, page_count
+
+# Sort key of the poll listings, used for keyset (cursor) pagination
+POLL_SORT_KEY = [Poll.created_at, Poll.id]
+
+def page_poll_ids(
+    db: Session,
+    page_query,
+    cursor: str | None = None,
+    page: int = 1,
+    size: int = 10
+) -> tuple[list[int], str | None]:
+    """
+    First phase of the community-based poll listings: pages through
+    distinct poll IDs, so joins to link tables (or options) can never make
+    a page hold fewer polls than `size`.
+
+    Args:
+        db: Database session
+        page_query: DISTINCT select of (Poll.id, Poll.created_at) with the
+            listing's joins and filters, without ordering or limits
+        cursor: next_cursor of the previous page; replaces page
+        page: Page number, used without a cursor
+        size: Page size
+
+    Returns:
+        The poll IDs of the page in listing order, and the next cursor
+    """
+    page_query = keyset_paginate(page_query, POLL_SORT_KEY, cursor, size)
+    if not cursor:
+        page_query = page_query.offset((page - 1) * size)
+
+    rows, next_cursor = page_with_cursor(db.exec(page_query).all(), POLL_SORT_KEY, size)
+    return [row.id for row in rows], next_cursor
+
+def get_polls_by_ids(db: Session, poll_ids: list[int]) -> list[Poll]:
+    """
+    Second phase of the poll listings: loads a page of polls by ID, in
+    listing order (newest first).
+    """
+    if not poll_ids:
+        return []
+    return db.exec(
+        select(Poll)
+        .where(Poll.id.in_(poll_ids))
+        .order_by(*(column.desc() for column in POLL_SORT_KEY))
+    ).all()
+
+def get_poll_countries(db: Session, polls: list[Poll]) -> dict[int, list[str]]:
+    """
+    Gets the country codes of the INTERNATIONAL polls among `polls` with a
+    single query on the community links, resolved through the in-memory
+    community -> country code index.
+
+    Args:
+        db: Database session
+        polls: Polls of a page (other scopes are skipped)
+
+    Returns:
+        Dictionary mapping poll IDs to their CCA2 codes
+    """
+    poll_ids = {poll.id for poll in polls if poll.scope == "INTERNATIONAL"}
+    if not poll_ids:
+        return {}
+
+    country_codes = get_country_codes_by_community(db)
+    links = db.exec(
+        select(PollCommunityLink.poll_id, PollCommunityLink.community_id)
+        .where(PollCommunityLink.poll_id.in_(poll_ids))
+        .order_by(PollCommunityLink.poll_id, PollCommunityLink.community_id)
+    ).all()
+
+    countries_by_poll: dict[int, list[str]] = {}
+    for poll_id, community_id in links:
+        country_code = country_codes.get(community_id)
+        codes = countries_by_poll.setdefault(poll_id, [])
+        if country_code and country_code not in codes:
+            codes.append(country_code)
+    return countries_by_poll
 
 def get_all_polls(
     db: Session, 
     scope: str | None = None, 
     current_user_id: int | None = None,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
     """
-    Gets all polls with pagination
+    Gets all polls with pagination.
+    With a cursor (the next_cursor of the previous response) the page is
+    fetched by keyset instead of by offset, and `page` is ignored.
+    Without include_total the count is skipped and total/pages are None;
+    with estimate_total an unfiltered listing reports the planner estimate.
     """
     # Calculate offset for pagination
     offset = (page - 1) * size
@@ -34,8 +128,7 @@ def get_all_polls(
     total_query = select(func.count(Poll.id))
     if scope:
         total_query = total_query.where(Poll.scope == scope)
-    total = db.exec(total_query).first()
-    total_pages = ceil(total / size)
+    total = list_total(db, "poll", {"scope": scope}, total_query, include_total, estimate_total)
 
     # Main query to get only the polls first
     polls_query = select(Poll, User).join(User, Poll.creator_id == User.id)
@@ -44,9 +137,13 @@ def get_all_polls(
         polls_query = polls_query.where(Poll.scope == scope)
     
     # Add sorting and pagination
-    polls_query = polls_query.order_by(Poll.created_at.desc()).offset(offset).limit(size)
+    polls_query = keyset_paginate(polls_query, POLL_SORT_KEY, cursor, size)
+    if not cursor:
+        polls_query = polls_query.offset(offset)
     
-    polls_results = db.exec(polls_query).all()
+    polls_results, next_cursor = page_with_cursor(
+        db.exec(polls_query).all(), POLL_SORT_KEY, size, key=lambda row: row[0]
+    )
 
     # Get poll IDs for related queries
     poll_ids = [poll.id for poll, _ in polls_results]
@@ -77,45 +174,12 @@ def get_all_polls(
             tags_by_poll[poll_id] = []
         tags_by_poll[poll_id].append(tag_name)
 
-    # First get the reaction count by type for each poll
-    reactions_count = db.exec(
-        select(
-            PollReaction.poll_id,
-            PollReaction.reaction,
-            func.count(PollReaction.id).label('count')
-        ).group_by(
-            PollReaction.poll_id,
-            PollReaction.reaction
-        )
-    ).all()
-    
-    # Create a dictionary to store counts
-    reactions_dict = {}
-    for reaction in reactions_count:
-        if reaction.poll_id not in reactions_dict:
-            reactions_dict[reaction.poll_id] = {'LIKE': 0, 'DISLIKE': 0}
-        reactions_dict[reaction.poll_id][reaction.reaction] = reaction.count
-
-    # Get comment count by poll
-    comments_count = db.exec(
-        select(
-            PollComment.poll_id,
-            func.count(PollComment.id).label('comments_count')
-        ).group_by(
-            PollComment.poll_id
-        )
-    ).all()
-    
-    comments_dict = {
-        comment.poll_id: comment.comments_count 
-        for comment in comments_count
-    }
-
     # Get current user's votes if authenticated
     user_votes = {}
     if current_user_id:
         user_votes_query = select(PollVote).where(
-            PollVote.user_id == current_user_id
+            PollVote.user_id == current_user_id,
+            PollVote.poll_id.in_(poll_ids)
         )
         user_votes_result = db.exec(user_votes_query).all()
         for vote in user_votes_result:
@@ -127,7 +191,8 @@ def get_all_polls(
     user_reactions = {}
     if current_user_id:
         user_reactions_query = select(PollReaction).where(
-            PollReaction.user_id == current_user_id
+            PollReaction.user_id == current_user_id,
+            PollReaction.poll_id.in_(poll_ids)
         )
         user_reactions_result = db.exec(user_reactions_query).all()
         user_reactions = {
@@ -135,6 +200,9 @@ def get_all_polls(
             for reaction in user_reactions_result
         }
 
+    # Get the country codes of the international polls
+    countries_by_poll = get_poll_countries(db, [poll for poll, _ in polls_results])
+
     # Process results
     polls_dict = {}
     for poll, user in polls_results:
@@ -152,21 +220,13 @@ def get_all_polls(
         
         del poll_dict['creator_id']
         
-        poll_dict['reactions'] = reactions_dict.get(poll.id, {'LIKE': 0, 'DISLIKE': 0})
-        poll_dict['comments_count'] = comments_dict.get(poll.id, 0)
+        poll_dict['reactions'] = {'LIKE': poll.likes_count, 'DISLIKE': poll.dislikes_count}
         poll_dict['user_reaction'] = user_reactions.get(poll.id, None)
         poll_dict['user_voted_options'] = list(user_votes.get(poll.id, set())) if current_user_id else None
         
         # Add countries if scope is INTERNATIONAL
         if poll.scope == "INTERNATIONAL":
-            countries = db.exec(
-                select(Country.cca2)
-                .join(Community, Community.id == Country.community_id)
-                .join(PollCommunityLink)
-                .where(PollCommunityLink.poll_id == poll.id)
-                .distinct()
-            ).all()
-            poll_dict['countries'] = [country for country in countries if country]
+            poll_dict['countries'] = countries_by_poll.get(poll.id, [])
         
         # Add poll options
         poll_dict['options'] = []
@@ -187,38 +247,64 @@ def get_all_polls(
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
-def generate_unique_slug(db: Session, title: str) -> str:
-    # Generate base slug
-    base_slug = slugify(title)
-    slug = base_slug
-    
-    # Check if slug exists
-    while db.query(Poll).filter(Poll.slug == slug).first() is not None:
-        # If it exists, add a random suffix
-        random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
-        slug = f"{base_slug}-{random_suffix}"
-    
-    return slug
+# Values of SCALE polls created without scale_min / scale_max
+SCALE_DEFAULT_RANGE = (1, 5)
+# Most values a SCALE poll can have (one histogram bucket each)
+SCALE_MAX_VALUES = 101
+
+# Payload fields of PollCreate that are not Poll columns
+POLL_CREATE_RELATIONS = {'options', 'community_ids', 'country_codes', 'country_code', 'region_id', 'subregion_id', 'tags'}
+
+def apply_scale_defaults(poll_data: PollCreate) -> None:
+    """Fills in the missing scale_min / scale_max of a SCALE poll"""
+    if poll_data.type == PollType.SCALE:
+        if poll_data.scale_min is None:
+            poll_data.scale_min = SCALE_DEFAULT_RANGE[0]
+        if poll_data.scale_max is None:
+            poll_data.scale_max = SCALE_DEFAULT_RANGE[1]
+
+def scale_range(poll: Poll) -> tuple[int, int]:
+    """Lowest and highest value of a SCALE poll (SCALE_DEFAULT_RANGE where unset)"""
+    return (
+        SCALE_DEFAULT_RANGE[0] if poll.scale_min is None else poll.scale_min,
+        SCALE_DEFAULT_RANGE[1] if poll.scale_max is None else poll.scale_max,
+    )
+
+def check_poll_data(poll_data: PollCreate) -> list[str]:
+    """
+    Checks a poll payload beyond its schema (options, scale range)
+
+    Returns:
+        Error messages, empty when the poll can be created
+    """
+    errors = []
+    if len(poll_data.options) < 2:
+        errors.append("The poll must have at least 2 options")
+    if poll_data.type == PollType.SCALE:
+        scale_min = SCALE_DEFAULT_RANGE[0] if poll_data.scale_min is None else poll_data.scale_min
+        scale_max = SCALE_DEFAULT_RANGE[1] if poll_data.scale_max is None else poll_data.scale_max
+        if not 1 <= scale_max - scale_min < SCALE_MAX_VALUES:
+            errors.append(f"The scale must have between 2 and {SCALE_MAX_VALUES} values")
+    return errors
 
 def create_poll(db: Session, poll_data: PollCreate, user_id: int) -> Poll:
-    # Generate a unique slug
-    unique_slug = generate_unique_slug(db, poll_data.title)
-    
     # Get current time
     current_time = datetime.utcnow()
     
+    apply_scale_defaults(poll_data)
+
     # Create the poll
     db_poll = Poll(
-        **poll_data.dict(exclude={'options', 'community_ids', 'country_codes', 'country_code', 'region_id', 'subregion_id', 'tags'}),
+        **poll_data.dict(exclude=POLL_CREATE_RELATIONS),
         creator_id=user_id,
-        slug=unique_slug,
         created_at=current_time,
         updated_at=current_time
     )
-    db.add(db_poll)
+    add_with_unique_slug(db, db_poll, slugify(poll_data.title, max_length=100), max_length=100)
     db.commit()
     db.refresh(db_poll)
     
@@ -231,11 +317,8 @@ def create_poll(db: Session, poll_data: PollCreate, user_id: int) -> Poll:
         db.add(db_option)
     
     # Add tags
-    for tag_name in poll_data.tags:
-        tag = get_tag_by_name(db, tag_name)
-        if not tag:
-            tag = create_tag(db, tag_name)
-        db_poll.tags.append(tag)
+    tag_ids = get_or_create_tags(db, poll_data.tags)
+    db.add_all(PollTagLink(poll_id=db_poll.id, tag_id=tag_id) for tag_id in tag_ids.values())
     
     # Associate communities with the poll based on scope
     if poll_data.scope == "INTERNATIONAL" and poll_data.country_codes:
@@ -303,10 +386,388 @@ def create_poll(db: Session, poll_data: PollCreate, user_id: int) -> Poll:
         db_poll.communities.extend(communities)
     
     db.commit()
+    list_totals.invalidate("poll")
     db.refresh(db_poll)
     return db_poll
 
-def create_vote(db: Session, poll_id: int, option_ids: list[int], user_id: int, custom_response: str | None = None) -> Poll:
+def row_values(instance) -> dict:
+    """Column values of a new (unsaved) table model instance, defaults included, for a Core INSERT"""
+    return {
+        column.key: getattr(instance, column.key)
+        for column in instance.__table__.columns
+        if column.key != "id"
+    }
+
+def resolve_poll_communities(db: Session, polls: list[PollCreate]) -> list[tuple[list[int], list[str]]]:
+    """
+    Resolves the communities of several poll payloads like create_poll does
+    (countries, region, subregion or community IDs, depending on the scope),
+    with one query per kind of reference for the whole list.
+
+    Returns:
+        (community IDs, error messages) of each payload, in order
+    """
+    from api.public.subregion.models import Subregion
+
+    country_codes, region_ids, subregion_ids, community_ids = set(), set(), set(), set()
+    for poll_data in polls:
+        if poll_data.scope == "INTERNATIONAL" and poll_data.country_codes:
+            country_codes.update(poll_data.country_codes)
+        elif poll_data.scope == "NATIONAL" and poll_data.country_code:
+            country_codes.add(poll_data.country_code)
+        elif poll_data.scope == "REGIONAL" and poll_data.region_id:
+            region_ids.add(poll_data.region_id)
+        elif poll_data.scope == "SUBREGIONAL" and poll_data.subregion_id:
+            subregion_ids.add(poll_data.subregion_id)
+        elif poll_data.community_ids:
+            community_ids.update(poll_data.community_ids)
+
+    countries = dict(db.exec(
+        select(Country.cca2, Country.community_id).where(Country.cca2.in_(country_codes))
+    ).all()) if country_codes else {}
+    regions = dict(db.exec(
+        select(Region.id, Region.community_id).where(Region.id.in_(region_ids))
+    ).all()) if region_ids else {}
+    subregions = dict(db.exec(
+        select(Subregion.id, Subregion.community_id).where(Subregion.id.in_(subregion_ids))
+    ).all()) if subregion_ids else {}
+    referenced = community_ids | {
+        community_id
+        for community_id in (*countries.values(), *regions.values(), *subregions.values())
+        if community_id
+    }
+    existing = set(db.exec(select(Community.id).where(Community.id.in_(referenced))).all()) if referenced else set()
+
+    resolved = []
+    for poll_data in polls:
+        found, errors = [], []
+        if poll_data.scope == "INTERNATIONAL" and poll_data.country_codes:
+            found = [countries[code] for code in dict.fromkeys(poll_data.country_codes) if countries.get(code) in existing]
+            if not found:
+                errors.append("No communities found for the provided country codes")
+        elif poll_data.scope == "NATIONAL" and poll_data.country_code:
+            community_id = countries.get(poll_data.country_code)
+            if not community_id:
+                errors.append(f"No community found for country {poll_data.country_code}")
+            elif community_id in existing:
+                found = [community_id]
+        elif poll_data.scope == "REGIONAL" and poll_data.region_id:
+            community_id = regions.get(poll_data.region_id)
+            if not community_id:
+                errors.append(f"No community found for region with ID {poll_data.region_id}")
+            elif community_id in existing:
+                found = [community_id]
+        elif poll_data.scope == "SUBREGIONAL" and poll_data.subregion_id:
+            community_id = subregions.get(poll_data.subregion_id)
+            if not community_id:
+                errors.append(f"No community found for national subdivision with ID {poll_data.subregion_id}")
+            elif community_id in existing:
+                found = [community_id]
+        elif poll_data.community_ids:
+            found = [community_id for community_id in dict.fromkeys(poll_data.community_ids) if community_id in existing]
+        resolved.append((found, errors))
+    return resolved
+
+def create_polls_bulk(db: Session, polls: list[PollCreate], user_id: int, attempts: int = 3) -> dict:
+    """
+    Creates several polls in a single transaction.
+
+    Every payload is checked (check_poll_data and its scope's references);
+    invalid ones are reported and skipped. Communities, countries, regions
+    and subregions of the whole list are resolved with one query per kind,
+    tags with get_or_create_tags, slugs together (allocate_slugs), and polls, options,
+    community links and tag links are each inserted with one executemany.
+    If a concurrent insert takes one of the slugs, the transaction is rolled
+    back and the valid polls are inserted again with new slugs.
+
+    Args:
+        db: Database session
+        polls: Poll payloads
+        user_id: ID of the creator
+        attempts: Transactions tried before a unique violation is raised
+
+    Returns:
+        Dictionary with the number of polls created and invalid, and one
+        result per payload (index, status, id, slug and errors)
+    """
+    items = [
+        {"index": index, "status": "invalid", "id": None, "slug": None, "errors": check_poll_data(poll_data)}
+        for index, poll_data in enumerate(polls)
+    ]
+    resolved = resolve_poll_communities(db, polls)
+    for item, (_, errors) in zip(items, resolved):
+        item["errors"] += errors
+    valid = [item["index"] for item in items if not item["errors"]]
+    communities = [resolved[index][0] for index in valid]
+
+    for attempt in range(attempts):
+        try:
+            tag_ids = get_or_create_tags(db, (name for index in valid for name in polls[index].tags))
+            slugs = allocate_slugs(db, Poll, [slugify(polls[index].title, max_length=100) for index in valid])
+            current_time = datetime.utcnow()
+            poll_rows = []
+            for index, slug in zip(valid, slugs):
+                poll_data = polls[index]
+                apply_scale_defaults(poll_data)
+                poll_rows.append(row_values(Poll(
+                    **poll_data.dict(exclude=POLL_CREATE_RELATIONS),
+                    creator_id=user_id,
+                    slug=slug,
+                    created_at=current_time,
+                    updated_at=current_time
+                )))
+            # Slugs are unique, so the IDs are matched by slug: without a row
+            # order to keep, SQLite batches the RETURNING insert as well
+            table = Poll.__table__
+            inserted = dict(db.execute(
+                insert(table).returning(table.c.slug, table.c.id), poll_rows
+            ).all()) if poll_rows else {}
+            poll_ids = [inserted[slug] for slug in slugs]
+
+            option_rows, community_rows, tag_rows = [], [], []
+            for index, poll_id, community_ids in zip(valid, poll_ids, communities):
+                poll_data = polls[index]
+                option_rows += [row_values(PollOption(poll_id=poll_id, **option.dict())) for option in poll_data.options]
+                community_rows += [{"poll_id": poll_id, "community_id": community_id} for community_id in community_ids]
+                tag_rows += [{"poll_id": poll_id, "tag_id": tag_ids[name]} for name in dict.fromkeys(poll_data.tags)]
+            for model, rows in ((PollOption, option_rows), (PollCommunityLink, community_rows), (PollTagLink, tag_rows)):
+                if rows:
+                    db.execute(insert(model.__table__), rows)
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt == attempts - 1:
+                raise
+
+    if valid:
+        list_totals.invalidate("poll")
+    for index, poll_id, slug in zip(valid, poll_ids, slugs):
+        items[index].update(status="created", id=poll_id, slug=slug)
+    return {"created": len(valid), "invalid": len(items) - len(valid), "items": items}
+
+# Sort key of a poll's comments (newest first), used for keyset pagination
+POLL_COMMENT_SORT_KEY = [PollComment.created_at, PollComment.id]
+
+def list_poll_comments(
+    db: Session,
+    poll_id: int,
+    cursor: str | None = None,
+    size: int = 20,
+    current_user_id: int | None = None
+) -> dict:
+    """
+    One page of a poll's comments with their authors, newest first. Pages
+    are read through the (poll_id, created_at, id) index, so a page deep in
+    a long thread costs as much as the first one.
+
+    Args:
+        db: Database session
+        poll_id: ID of the poll
+        cursor: next_cursor of the previous page
+        size: Page size
+        current_user_id: ID of the authenticated user, if any
+
+    Returns:
+        Dictionary with the comments, the page size and the next cursor
+    """
+    query = (
+        select(PollComment, User)
+        .join(User)
+        .where(PollComment.poll_id == poll_id)
+    )
+    query = keyset_paginate(query, POLL_COMMENT_SORT_KEY, cursor, size)
+    rows, next_cursor = page_with_cursor(db.exec(query).all(), POLL_COMMENT_SORT_KEY, size, key=lambda row: row[0])
+    return {
+        "items": [
+            {
+                **comment.dict(),
+                "username": user.username,
+                "can_edit": current_user_id is not None and current_user_id == comment.user_id
+            }
+            for comment, user in rows
+        ],
+        "size": size,
+        "next_cursor": next_cursor
+    }
+
+POLL_COUNTERS = ("likes_count", "dislikes_count", "comments_count", "total_votes")
+
+# Poll counter holding the number of reactions of each type
+REACTION_COUNTERS = {
+    ReactionType.LIKE: "likes_count",
+    ReactionType.DISLIKE: "dislikes_count",
+}
+# Passes of create_or_update_reaction before giving up on a reaction that
+# keeps being changed by concurrent requests
+REACTION_ATTEMPTS = 3
+
+def update_poll_counters(db: Session, poll_id: int, **deltas: int) -> None:
+    """
+    Adds the given deltas to the denormalized counters of a poll.
+    The increment is done by the database (`SET x = x + delta`) inside the
+    caller's transaction, so concurrent writers never lose updates.
+
+    Args:
+        db: Database session
+        poll_id: ID of the poll
+        **deltas: Amount to add to each counter in POLL_COUNTERS, or to
+            results_version (see get_poll_results)
+
+    Usage:
+        update_poll_counters(db, poll.id, likes_count=1, dislikes_count=-1)
+    """
+    values = {}
+    for name, delta in deltas.items():
+        if name not in POLL_COUNTERS and name != "results_version":
+            raise ValueError(f"Unknown poll counter: {name}")
+        if delta:
+            values[name] = getattr(Poll, name) + delta
+    if values:
+        db.execute(update(Poll).where(Poll.id == poll_id).values(**values))
+
+# Results snapshots by (poll ID, results_version). Votes and reactions bump
+# the version, so outdated snapshots are never read again and just expire.
+results_snapshots = TTLCache(maxsize=settings.POLL_RESULTS_CACHE_SIZE, ttl=settings.POLL_RESULTS_CACHE_TTL)
+
+def get_poll_results(db: Session, poll: Poll) -> dict:
+    """
+    Gets the results snapshot of a poll: option tallies and percentages,
+    total votes and reaction counts, for the poll's results_version.
+    Snapshots are built once per version and kept in memory; callers must
+    copy the returned dictionaries before modifying them.
+
+    Args:
+        db: Database session
+        poll: Poll, as loaded by the caller (its version names the snapshot)
+
+    Returns:
+        Dictionary with poll_id, version, total_votes, options and reactions
+    """
+    key = (poll.id, poll.results_version)
+    snapshot = results_snapshots.get(key)
+    if snapshot is None:
+        options = db.exec(
+            select(PollOption)
+            .where(PollOption.poll_id == poll.id)
+            .order_by(PollOption.id)
+        ).all()
+        option_votes = sum(option.votes for option in options)
+        distributions = get_option_distributions(db, poll, options)
+        snapshot = {
+            "poll_id": poll.id,
+            "version": poll.results_version,
+            "total_votes": poll.total_votes,
+            "options": [
+                {
+                    **option.dict(),
+                    "percentage": round(option.votes * 100 / option_votes, 2) if option_votes else 0.0,
+                    **distributions.get(option.id, {}),
+                }
+                for option in options
+            ],
+            "reactions": {'LIKE': poll.likes_count, 'DISLIKE': poll.dislikes_count},
+        }
+        results_snapshots.set(key, snapshot)
+    return snapshot
+
+def get_option_distributions(db: Session, poll: Poll, options: list[PollOption]) -> dict[int, dict]:
+    """
+    Aggregates of RANKING and SCALE polls for the results, per option ID:
+    Borda points and ballots per position (RANKING), mean value and ballots
+    per value from scale_min to scale_max (SCALE). Read from the running
+    tallies in a single query; other poll types get no aggregates.
+    """
+    if poll.type not in (PollType.RANKING, PollType.SCALE):
+        return {}
+    buckets = {
+        (option_id, bucket): ballots
+        for option_id, bucket, ballots in db.exec(
+            select(PollOptionTally.option_id, PollOptionTally.bucket, PollOptionTally.ballots)
+            .where(PollOptionTally.poll_id == poll.id)
+        ).all()
+    }
+    if poll.type == PollType.RANKING:
+        positions = range(1, len(options) + 1)
+        return {
+            option.id: {
+                "borda": option.score,
+                "positions": [buckets.get((option.id, position), 0) for position in positions],
+            }
+            for option in options
+        }
+    scale_min, scale_max = scale_range(poll)
+    values = range(scale_min, scale_max + 1)
+    return {
+        option.id: {
+            "mean": round(option.score / option.votes, 2) if option.votes else None,
+            "histogram": [buckets.get((option.id, value), 0) for value in values],
+        }
+        for option in options
+    }
+
+def get_instant_runoff(db: Session, poll: Poll) -> dict:
+    """
+    Instant-runoff count of a RANKING poll, computed on demand from its
+    ballots grouped by ranking and kept in the results cache for the poll's
+    results_version.
+
+    Returns:
+        Dictionary with poll_id, version, winner, ballots and rounds (see
+        instant_runoff)
+    """
+    key = (poll.id, poll.results_version, "instant_runoff")
+    count = results_snapshots.get(key)
+    if count is None:
+        option_ids = db.exec(
+            select(PollOption.id).where(PollOption.poll_id == poll.id).order_by(PollOption.id)
+        ).all()
+        rows = db.exec(
+            select(PollRankingBallot.ranking, PollRankingBallot.ballots)
+            .where(PollRankingBallot.poll_id == poll.id, PollRankingBallot.ballots > 0)
+        ).all()
+        count = {
+            "poll_id": poll.id,
+            "version": poll.results_version,
+            **instant_runoff(RankedBallots.from_rows(option_ids, rows)),
+        }
+        results_snapshots.set(key, count)
+    return count
+
+def load_poll_results(poll_ids: list[int]) -> dict[int, dict]:
+    """
+    Results snapshots of several polls, read in a session of their own
+    (loader of the live results broker).
+    """
+    with Session(engine) as db:
+        polls = db.exec(select(Poll).where(Poll.id.in_(poll_ids))).all()
+        return {poll.id: get_poll_results(db, poll) for poll in polls}
+
+# Live results pushed to the subscribers of /polls/{id}/stream
+poll_updates = Broker(load_poll_results)
+poll_broadcaster = build_broadcaster(
+    settings.LIVE_UPDATES_BROADCASTER, poll_updates, settings.DATABASE_URL, channel="poll_results"
+)
+
+def create_vote(
+    db: Session,
+    poll_id: int,
+    option_ids: list[int],
+    user_id: int,
+    custom_response: str | None = None,
+    values: list[int] | None = None
+) -> Poll:
+    """
+    Replaces the user's votes on a poll with the given options.
+    An empty list removes the user's votes. Ballots of RANKING and SCALE
+    polls are handled by replace_ballot.
+
+    The change is applied with set-based statements: one DELETE of the votes
+    no longer selected, one INSERT ... ON CONFLICT DO NOTHING of the new ones
+    and one `votes = votes ± 1` UPDATE of the affected options. Counters only
+    move by the rows actually deleted or inserted, so concurrent and repeated
+    submissions keep the tallies exact.
+    """
     # Verify poll exists
     poll = db.get(Poll, poll_id)
     if not poll:
@@ -322,13 +783,25 @@ def create_vote(db: Session, poll_id: int, option_ids: list[int], user_id: int,
             detail="Cannot vote on a poll that is not published"
         )
     
-    # Verify options belong to the poll
-    valid_options = db.exec(
-        select(PollOption).where(
-            PollOption.poll_id == poll_id,
-            PollOption.id.in_(option_ids)
+    if poll.type in (PollType.RANKING, PollType.SCALE):
+        return replace_ballot(db, poll, option_ids, user_id, values)
+    if values is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Values are only accepted on SCALE polls"
         )
-    ).all()
+
+    option_ids = list(dict.fromkeys(option_ids))
+
+    # Verify options belong to the poll
+    valid_options = {}
+    if option_ids:
+        valid_options = dict(db.exec(
+            select(PollOption.id, PollOption.is_custom_option).where(
+                PollOption.poll_id == poll_id,
+                PollOption.id.in_(option_ids)
+            )
+        ).all())
     
     if len(valid_options) != len(option_ids):
         raise HTTPException(
@@ -344,46 +817,62 @@ def create_vote(db: Session, poll_id: int, option_ids: list[int], user_id: int,
                 detail="This poll only allows one option"
             )
     
-    # Find existing user votes in this poll
-    existing_votes = db.exec(
-        select(PollVote).where(
+    # If there's a custom response, verify the option allows custom responses
+    if custom_response and not (option_ids and valid_options[option_ids[0]]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This option does not allow custom responses"
+        )
+    
+    # Serialize the voter's submissions: without the lock, two concurrent
+    # requests choosing different options would each delete nothing the
+    # other has inserted and both votes would stay
+    db.exec(select(User.id).where(User.id == user_id).with_for_update()).one()
+
+    # Remove the votes on options that are no longer selected
+    removed = db.execute(
+        delete(PollVote)
+        .where(
             PollVote.poll_id == poll_id,
-            PollVote.user_id == user_id
+            PollVote.user_id == user_id,
+            PollVote.option_id.not_in(option_ids)
         )
-    ).all()
+        .returning(PollVote.option_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    
+    # Add the new votes; options already voted are skipped by the unique constraint
+    added = []
+    if option_ids:
+        added = db.execute(
+            dialect_insert(db, PollVote)
+            .values([
+                {"poll_id": poll_id, "user_id": user_id, "option_id": option_id}
+                for option_id in option_ids
+            ])
+            .on_conflict_do_nothing(index_elements=["poll_id", "user_id", "option_id"])
+            .returning(PollVote.option_id)
+        ).scalars().all()
     
-    # Remove previous votes
-    for vote in existing_votes:
-        # Decrement vote counter for previous option
-        old_option = db.get(PollOption, vote.option_id)
-        old_option.votes = max(0, old_option.votes - 1)  # Avoid negative numbers
-        db.delete(vote)
-    
-    # Create new votes
-    for option_id in option_ids:
-        vote = PollVote(
-            poll_id=poll_id,
-            option_id=option_id,
-            user_id=user_id
+    # Move the option and poll counters by the rows actually changed
+    if removed or added:
+        db.execute(
+            update(PollOption)
+            .where(PollOption.id.in_([*removed, *added]))
+            .values(votes=PollOption.votes + case((PollOption.id.in_(added), 1), else_=-1))
+            .execution_options(synchronize_session=False)
         )
-        db.add(vote)
-        
-        # Increment vote counter for new option
-        option = db.get(PollOption, option_id)
-        option.votes += 1
+        update_poll_counters(db, poll_id, total_votes=len(added) - len(removed), results_version=1)
+        update_community_tallies(db, poll_id, user_id, {
+            **{option_id: -1 for option_id in removed},
+            **{option_id: 1 for option_id in added},
+        })
+        poll_broadcaster.publish(db, poll_id)
     
-    # If there's a custom response, verify the option allows custom responses
     if custom_response:
-        option = db.get(PollOption, option_ids[0])
-        if not option or not option.is_custom_option:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This option does not allow custom responses"
-            )
-            
         # Create custom response
         custom = PollCustomResponse(
-            option_id=option.id,
+            option_id=option_ids[0],
             user_id=user_id,
             response_text=custom_response
         )
@@ -393,6 +882,272 @@ def create_vote(db: Session, poll_id: int, option_ids: list[int], user_id: int,
     db.refresh(poll)
     return poll
 
+def replace_ballot(db: Session, poll: Poll, option_ids: list[int], user_id: int, values: list[int] | None) -> Poll:
+    """
+    Replaces the user's ballot on a RANKING poll (option_ids in order of
+    preference) or a SCALE poll (one value per option) and moves the running
+    tallies by the difference between the previous ballot and the new one:
+    option votes and scores (Borda points or sum of values), ballots per
+    position or value, and RANKING ballots per ranking. An empty option_ids
+    removes the ballot.
+
+    The user's row is locked first, so concurrent submissions of one user
+    are applied one after another and always replace a whole ballot.
+    """
+    if poll.type == PollType.SCALE:
+        if values is None or len(values) != len(option_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="SCALE polls take one value per option"
+            )
+        if len(set(option_ids)) != len(option_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each option can only be rated once"
+            )
+        scale_min, scale_max = scale_range(poll)
+        if any(value < scale_min or value > scale_max for value in values):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Values must be between {scale_min} and {scale_max}"
+            )
+        ballot = dict(zip(option_ids, values))
+        column = PollVote.value
+    else:
+        if values is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Values are only accepted on SCALE polls"
+            )
+        ballot = {option_id: rank for rank, option_id in enumerate(dict.fromkeys(option_ids), start=1)}
+        column = PollVote.rank
+
+    poll_option_ids = set(db.exec(select(PollOption.id).where(PollOption.poll_id == poll.id)).all())
+    if not poll_option_ids.issuperset(ballot):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Some options are not valid for this poll"
+        )
+
+    db.exec(select(User.id).where(User.id == user_id).with_for_update()).one()
+    previous = dict(db.exec(
+        select(PollVote.option_id, column).where(PollVote.poll_id == poll.id, PollVote.user_id == user_id)
+    ).all())
+    if previous == ballot:
+        db.commit()
+        return poll
+
+    if previous:
+        db.execute(
+            delete(PollVote)
+            .where(PollVote.poll_id == poll.id, PollVote.user_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+    if ballot:
+        db.execute(insert(PollVote), [
+            {"poll_id": poll.id, "user_id": user_id, "option_id": option_id, column.key: bucket}
+            for option_id, bucket in ballot.items()
+        ])
+
+    # Differences between both ballots: per option, per (option, bucket) and per ranking
+    votes, scores, buckets = {}, {}, {}
+    for sign, entries in ((-1, previous), (1, ballot)):
+        for option_id, bucket in entries.items():
+            # Borda: the first of n options gets n - 1 points, the last 0
+            points = len(poll_option_ids) - bucket if poll.type == PollType.RANKING else bucket
+            votes[option_id] = votes.get(option_id, 0) + sign
+            scores[option_id] = scores.get(option_id, 0) + sign * points
+            buckets[(option_id, bucket)] = buckets.get((option_id, bucket), 0) + sign
+
+    changed = [option_id for option_id in votes if votes[option_id] or scores[option_id]]
+    if changed:
+        db.execute(
+            update(PollOption)
+            .where(PollOption.id.in_(changed))
+            .values(
+                votes=PollOption.votes + case(votes, value=PollOption.id, else_=0),
+                score=PollOption.score + case(scores, value=PollOption.id, else_=0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    upsert_tallies(db, PollOptionTally, ["option_id", "bucket"], [
+        {"option_id": option_id, "bucket": bucket, "poll_id": poll.id, "ballots": delta}
+        for (option_id, bucket), delta in buckets.items() if delta
+    ])
+    if poll.type == PollType.RANKING:
+        rankings = [(sorted(previous, key=previous.get), -1), (list(ballot), 1)]
+        upsert_tallies(db, PollRankingBallot, ["poll_id", "ranking"], [
+            {"poll_id": poll.id, "ranking": ranking_key(ranking), "ballots": delta}
+            for ranking, delta in rankings if ranking
+        ])
+
+    update_poll_counters(db, poll.id, total_votes=len(ballot) - len(previous), results_version=1)
+    update_community_tallies(db, poll.id, user_id, votes)
+    poll_broadcaster.publish(db, poll.id)
+    db.commit()
+    db.refresh(poll)
+    return poll
+
+def upsert_tallies(db: Session, model, keys: list[str], rows: list[dict], column: str = "ballots") -> None:
+    """Adds each row's `column` delta to the tally row with the same keys (created if missing)"""
+    if not rows:
+        return
+    statement = dialect_insert(db, model).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: getattr(model, column) + getattr(statement.excluded, column)}
+    ))
+
+def update_community_tallies(db: Session, poll_id: int, user_id: int, deltas: dict[int, int]) -> None:
+    """
+    Moves the per-community rollup of a poll by the voter's vote changes,
+    in every community the voter belongs to, inside the caller's transaction.
+    Must run after update_poll_counters: the poll row lock it takes orders
+    the vote with rebuild_community_tallies.
+
+    Args:
+        db: Database session
+        poll_id: ID of the poll
+        user_id: ID of the voter
+        deltas: Votes added (1) or removed (-1) per option ID
+    """
+    deltas = {option_id: delta for option_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    community_ids = db.exec(
+        select(UserCommunityLink.community_id).where(UserCommunityLink.user_id == user_id)
+    ).all()
+    # Stable order, so concurrent voters lock the rollup rows without deadlocks
+    upsert_tallies(db, PollCommunityTally, ["poll_id", "community_id", "option_id"], [
+        {"poll_id": poll_id, "community_id": community_id, "option_id": option_id, "votes": deltas[option_id]}
+        for community_id in sorted(community_ids)
+        for option_id in sorted(deltas)
+    ], column="votes")
+
+def move_member_community_tallies(db: Session, user_id: int, community_id: int, delta: int) -> None:
+    """
+    Moves the per-community rollup by all the user's votes in one community
+    the user joins (delta 1) or leaves (delta -1), inside the caller's
+    transaction, so the rollup follows the voters' current communities.
+    Locks the user row first, like create_vote, so a concurrent vote is
+    counted under the memberships before or after the change, never both;
+    the poll rows are then locked in ID order, like rebuild_community_tallies.
+
+    Args:
+        db: Database session
+        user_id: ID of the user joining or leaving
+        community_id: ID of the community
+        delta: 1 when joining, -1 when leaving
+    """
+    db.exec(select(User.id).where(User.id == user_id).with_for_update()).one()
+    votes = db.exec(
+        select(PollVote.poll_id, PollVote.option_id).where(PollVote.user_id == user_id)
+    ).all()
+    if not votes:
+        return
+    poll_ids = sorted({poll_id for poll_id, _ in votes})
+    # Cached breakdowns of these polls are outdated
+    db.execute(
+        update(Poll)
+        .where(Poll.id.in_(poll_ids))
+        .values(results_version=Poll.results_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    upsert_tallies(db, PollCommunityTally, ["poll_id", "community_id", "option_id"], [
+        {"poll_id": poll_id, "community_id": community_id, "option_id": option_id, "votes": delta}
+        for poll_id, option_id in sorted(votes)
+    ], column="votes")
+
+def rebuild_community_tallies(db: Session, batch_size: int = 100) -> dict:
+    """
+    Rebuilds the per-community rollup from the votes and the voters' current
+    communities (which votes and membership changes keep it in line with),
+    one batch of polls at a time. Each batch is its own
+    transaction and locks its poll rows, which votes also update, so it is
+    safe to run while the site takes votes.
+
+    Args:
+        db: Database session
+        batch_size: Number of polls per batch
+
+    Returns:
+        Dictionary with the number of polls and rollup rows written
+    """
+    report = {"polls": 0, "rows": 0}
+    rollup = PollCommunityTally.__table__
+    last_id = 0
+    while True:
+        poll_ids = db.exec(
+            select(Poll.id).where(Poll.id > last_id).order_by(Poll.id).limit(batch_size).with_for_update()
+        ).all()
+        if not poll_ids:
+            break
+        last_id = poll_ids[-1]
+
+        db.execute(delete(PollCommunityTally).where(PollCommunityTally.poll_id.in_(poll_ids)))
+        votes = (
+            select(PollVote.poll_id, UserCommunityLink.community_id, PollVote.option_id, func.count())
+            .join(UserCommunityLink, UserCommunityLink.user_id == PollVote.user_id)
+            .where(PollVote.poll_id.in_(poll_ids))
+            .group_by(PollVote.poll_id, UserCommunityLink.community_id, PollVote.option_id)
+        )
+        result = db.execute(
+            insert(rollup).from_select(["poll_id", "community_id", "option_id", "votes"], votes)
+        )
+        # Ends the batch transaction, releasing the row locks
+        db.commit()
+
+        report["polls"] += len(poll_ids)
+        report["rows"] += result.rowcount
+    return report
+
+def get_results_by_community(db: Session, poll: Poll, level: CommunityLevel) -> dict:
+    """
+    Results of a poll per community of the voters at one level (e.g. per
+    country with NATIONAL), read from the per-community rollup only and
+    kept in the results cache for the poll's results_version.
+
+    Args:
+        db: Database session
+        poll: Poll
+        level: Level of the communities
+
+    Returns:
+        Dictionary with poll_id, version, level and the communities, each
+        with its votes and the votes and percentage of every option
+    """
+    key = (poll.id, poll.results_version, "by_community", level)
+    breakdown = results_snapshots.get(key)
+    if breakdown is None:
+        rows = db.exec(
+            select(Community.id, Community.name, PollCommunityTally.option_id, PollCommunityTally.votes)
+            .join(Community, Community.id == PollCommunityTally.community_id)
+            .where(
+                PollCommunityTally.poll_id == poll.id,
+                PollCommunityTally.votes > 0,
+                Community.level == level
+            )
+            .order_by(Community.id, PollCommunityTally.option_id)
+        ).all()
+        communities = {}
+        for community_id, name, option_id, votes in rows:
+            community = communities.setdefault(
+                community_id, {"community_id": community_id, "name": name, "total_votes": 0, "options": []}
+            )
+            community["total_votes"] += votes
+            community["options"].append({"option_id": option_id, "votes": votes})
+        for community in communities.values():
+            for option in community["options"]:
+                option["percentage"] = round(option["votes"] * 100 / community["total_votes"], 2)
+        breakdown = {
+            "poll_id": poll.id,
+            "version": poll.results_version,
+            "level": level.value,
+            "communities": sorted(communities.values(), key=lambda community: -community["total_votes"]),
+        }
+        results_snapshots.set(key, breakdown)
+    return breakdown
+
 def create_or_update_reaction(db: Session, poll_id: int, user_id: int, reaction_type: ReactionType) -> Poll:
     """
     Creates or updates a reaction on a poll.
@@ -414,32 +1169,58 @@ def create_or_update_reaction(db: Session, poll_id: int, user_id: int, reaction_
             detail="Cannot react to a poll that is not published"
         )
     
-    # Check if user already has a reaction
-    existing_reaction = db.exec(
-        select(PollReaction).where(
-            PollReaction.poll_id == poll_id,
-            PollReaction.user_id == user_id
-        )
-    ).first()
-    
-    if existing_reaction:
-        if existing_reaction.reaction == reaction_type:
-            # If reaction is the same, remove it
-            db.delete(existing_reaction)
-        else:
-            # If reaction is different, update it
-            existing_reaction.reaction = reaction_type
-            existing_reaction.reacted_at = datetime.utcnow()
-            db.add(existing_reaction)
+    # Each step is a single conditional statement and the counters only move
+    # by the rows it returned, so concurrent toggles of one user never leave
+    # two reactions or counters that disagree with the rows
+    for _ in range(REACTION_ATTEMPTS):
+        # Same reaction again: remove it
+        removed = db.execute(
+            delete(PollReaction)
+            .where(PollReaction.poll_id == poll_id, PollReaction.user_id == user_id, PollReaction.reaction == reaction_type)
+            .returning(PollReaction.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if removed:
+            update_poll_counters(db, poll_id, **{REACTION_COUNTERS[reaction_type]: -1}, results_version=1)
+            break
+
+        # Another reaction: switch it to this one
+        switched = None
+        for previous_type in REACTION_COUNTERS.keys() - {reaction_type}:
+            switched = db.execute(
+                update(PollReaction)
+                .where(PollReaction.poll_id == poll_id, PollReaction.user_id == user_id, PollReaction.reaction == previous_type)
+                .values(reaction=reaction_type, reacted_at=datetime.utcnow())
+                .returning(PollReaction.id)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if switched:
+                update_poll_counters(db, poll_id, **{
+                    REACTION_COUNTERS[previous_type]: -1,
+                    REACTION_COUNTERS[reaction_type]: 1,
+                }, results_version=1)
+                break
+        if switched:
+            break
+
+        # No reaction yet: add it, unless a concurrent request just did
+        # (uq_pollreaction_poll_id_user_id), in which case start over
+        added = db.execute(
+            dialect_insert(db, PollReaction)
+            .values(poll_id=poll_id, user_id=user_id, reaction=reaction_type, reacted_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=["poll_id", "user_id"])
+            .returning(PollReaction.id)
+        ).first()
+        if added:
+            update_poll_counters(db, poll_id, **{REACTION_COUNTERS[reaction_type]: 1}, results_version=1)
+            break
     else:
-        # Create new reaction
-        new_reaction = PollReaction(
-            poll_id=poll_id,
-            user_id=user_id,
-            reaction=reaction_type,
-            reacted_at=datetime.utcnow()
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The reaction changed concurrently, please try again"
         )
-        db.add(new_reaction)
+    poll_broadcaster.publish(db, poll_id)
     
     db.commit()
     
@@ -455,18 +1236,6 @@ def create_or_update_reaction(db: Session, poll_id: int, user_id: int, reaction_
     
     poll, option, user = result
     
-    # Get updated reaction count
-    reactions_count = db.exec(
-        select(
-            PollReaction.reaction,
-            func.count(PollReaction.id).label('count')
-        ).where(
-            PollReaction.poll_id == poll_id
-        ).group_by(
-            PollReaction.reaction
-        )
-    ).all()
-    
     # Create poll dictionary
     poll_dict = poll.dict()
     if not poll.is_anonymous:
@@ -476,11 +1245,7 @@ def create_or_update_reaction(db: Session, poll_id: int, user_id: int, reaction_
         del poll_dict['creator_id']
     
     # Add reaction count
-    reactions_dict = {'LIKE': 0, 'DISLIKE': 0}
-    for reaction in reactions_count:
-        reactions_dict[reaction.reaction] = reaction.count
-    
-    poll_dict['reactions'] = reactions_dict
+    poll_dict['reactions'] = {'LIKE': poll.likes_count, 'DISLIKE': poll.dislikes_count}
     
     # Get all poll options
     options = db.exec(
@@ -503,14 +1268,15 @@ def get_country_polls(
     scope: str | None = None, 
     current_user_id: int | None = None,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
     """
     Gets all polls associated with a specific country with pagination.
+    See get_all_polls for the cursor and the total flags.
     """
-    # Calculate offset for pagination
-    offset = (page - 1) * size
-
     # Verify country exists
     country = db.exec(
         select(Country).where(Country.cca2 == country_code)
@@ -534,14 +1300,16 @@ def get_country_polls(
     if scope:
         total_query = total_query.where(Poll.scope == scope)
     
-    total = db.exec(total_query).first()
-    total_pages = ceil(total / size)
+    total = list_total(
+        db, "poll", {"country": country_code, "scope": scope}, total_query, include_total, estimate_total
+    )
 
-    # Modify main query to include pagination
-    query = (
-        select(Poll, PollOption, User)
-        .join(PollOption)
-        .join(User, Poll.creator_id == User.id)
+    # Get the page of poll IDs first: the options join below returns one
+    # row per option, and a poll can be linked to several of the country's
+    # communities
+    page_query = (
+        select(Poll.id, Poll.created_at)
+        .distinct()
         .join(PollCommunityLink)
         .join(Community)
         .join(Country)
@@ -549,11 +1317,20 @@ def get_country_polls(
     )
 
     if scope:
-        query = query.where(Poll.scope == scope)
+        page_query = page_query.where(Poll.scope == scope)
 
-    query = query.order_by(Poll.created_at.desc()).offset(offset).limit(size)
+    page_ids, next_cursor = page_poll_ids(db, page_query, cursor, page, size)
+
+    # Get polls with their options and creators (polls without options
+    # still get a row, with option None)
+    query = (
+        select(Poll, PollOption, User)
+        .outerjoin(PollOption)
+        .join(User, Poll.creator_id == User.id)
+        .where(Poll.id.in_(page_ids))
+        .order_by(Poll.created_at.desc(), Poll.id.desc(), PollOption.id)
+    )
 
-    # Get polls
     results = db.exec(query).all()
 
     # Get poll IDs
@@ -575,45 +1352,12 @@ def get_country_polls(
             tags_by_poll[poll_id] = []
         tags_by_poll[poll_id].append(tag_name)
 
-    # Get reaction counts
-    reactions_count = db.exec(
-        select(
-            PollReaction.poll_id,
-            PollReaction.reaction,
-            func.count(PollReaction.id).label('count')
-        ).group_by(
-            PollReaction.poll_id,
-            PollReaction.reaction
-        )
-    ).all()
-
-    # Create reactions dictionary
-    reactions_dict = {}
-    for reaction in reactions_count:
-        if reaction.poll_id not in reactions_dict:
-            reactions_dict[reaction.poll_id] = {'LIKE': 0, 'DISLIKE': 0}
-        reactions_dict[reaction.poll_id][reaction.reaction] = reaction.count
-
-    # Get comments count
-    comments_count = db.exec(
-        select(
-            PollComment.poll_id,
-            func.count(PollComment.id).label('comments_count')
-        ).group_by(
-            PollComment.poll_id
-        )
-    ).all()
-    
-    comments_dict = {
-        comment.poll_id: comment.comments_count 
-        for comment in comments_count
-    }
-
     # Get current user votes if authenticated
     user_votes = {}
     if current_user_id:
         user_votes_query = select(PollVote).where(
-            PollVote.user_id == current_user_id
+            PollVote.user_id == current_user_id,
+            PollVote.poll_id.in_(poll_ids)
         )
         user_votes_result = db.exec(user_votes_query).all()
         for vote in user_votes_result:
@@ -625,7 +1369,8 @@ def get_country_polls(
     user_reactions = {}
     if current_user_id:
         user_reactions_query = select(PollReaction).where(
-            PollReaction.user_id == current_user_id
+            PollReaction.user_id == current_user_id,
+            PollReaction.poll_id.in_(poll_ids)
         )
         user_reactions_result = db.exec(user_reactions_query).all()
         user_reactions = {
@@ -633,6 +1378,9 @@ def get_country_polls(
             for reaction in user_reactions_result
         }
 
+    # Get the country codes of the international polls
+    countries_by_poll = get_poll_countries(db, [poll for poll, _, _ in results])
+
     # Process results
     polls_dict = {}
     for poll, option, user in results:
@@ -644,21 +1392,13 @@ def get_country_polls(
             else:
                 del poll_dict['creator_id']
             
-            poll_dict['reactions'] = reactions_dict.get(poll.id, {'LIKE': 0, 'DISLIKE': 0})
-            poll_dict['comments_count'] = comments_dict.get(poll.id, 0)
+            poll_dict['reactions'] = {'LIKE': poll.likes_count, 'DISLIKE': poll.dislikes_count}
             poll_dict['user_reaction'] = user_reactions.get(poll.id, None)
             poll_dict['user_voted_options'] = list(user_votes.get(poll.id, set())) if current_user_id else None
             
             # Add countries if scope is INTERNATIONAL
             if poll.scope == "INTERNATIONAL":
-                countries = db.exec(
-                    select(Country.cca2)
-                    .join(Community, Community.id == Country.community_id)
-                    .join(PollCommunityLink)
-                    .where(PollCommunityLink.poll_id == poll.id)
-                    .distinct()
-                ).all()
-                poll_dict['countries'] = [country for country in countries if country]
+                poll_dict['countries'] = countries_by_poll.get(poll.id, [])
             
             # Add tags
             poll_dict['tags'] = tags_by_poll.get(poll.id, [])
@@ -666,6 +1406,8 @@ def get_country_polls(
             polls_dict[poll.id] = poll_dict
             polls_dict[poll.id]['options'] = []
 
+        if option is None:
+            continue
         option_dict = option.dict()
         option_dict['voted'] = False
         if current_user_id and poll.id in user_votes:
@@ -678,7 +1420,8 @@ def get_country_polls(
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
 def get_regional_polls(
@@ -687,10 +1430,14 @@ def get_regional_polls(
     scope: str | None = None,
     current_user_id: int | None = None,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
     """
     Get all polls associated with a specific region with pagination.
+    See get_all_polls for the cursor and the total flags.
     """
     # First get the community associated with the region
     region_community = db.exec(
@@ -702,8 +1449,6 @@ def get_regional_polls(
     if not region_community:
         return []
 
-    offset = (page - 1) * size
-
     # Get total for pagination
     total_query = (
         select(func.count(distinct(Poll.id)))
@@ -717,12 +1462,13 @@ def get_regional_polls(
     if scope:
         total_query = total_query.where(Poll.scope == scope)
 
-    total = db.exec(total_query).first()
-    total_pages = ceil(total / size)
+    total = list_total(
+        db, "poll", {"region": region_id, "scope": scope}, total_query, include_total, estimate_total
+    )
 
-    # Modify main query
-    query = (
-        select(Poll)
+    # Page of poll IDs, then the polls themselves
+    page_query = (
+        select(Poll.id, Poll.created_at)
         .distinct()
         .join(PollCommunityLink)
         .where(
@@ -732,145 +1478,330 @@ def get_regional_polls(
     )
 
     if scope:
-        query = query.where(Poll.scope == scope)
+        page_query = page_query.where(Poll.scope == scope)
 
-    query = query.order_by(Poll.created_at.desc()).offset(offset).limit(size)
-
-    polls = db.exec(query).all()
+    page_ids, next_cursor = page_poll_ids(db, page_query, cursor, page, size)
+    polls = get_polls_by_ids(db, page_ids)
     
     return {
-        "items": [
-            enrich_poll(db, poll, current_user_id)
-            for poll in polls
-        ],
+        "items": enrich_polls(db, polls, current_user_id),
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
-def enrich_poll(db: Session, poll: Poll, current_user_id: int | None = None) -> dict:
+def enrich_polls(
+    db: Session,
+    polls: list[Poll],
+    current_user_id: int | None = None,
+    results: dict[int, dict] | None = None
+) -> list[dict]:
     """
-    Enriches a poll with additional information:
-    - Options and votes
-    - Reactions
+    Enriches a page of polls with additional information using a constant
+    number of queries, whatever the page size:
+    - Options and votes (from the denormalized counters)
+    - Reactions (from the denormalized counters)
     - Creator information
-    - Comments count and full comments
+    - Comments count
+    - Tags
     - Current user voting status
+
+    Args:
+        db: Database session
+        polls: Polls to enrich
+        current_user_id: ID of the authenticated user, if any
+        results: Results snapshots (see get_poll_results) by poll ID; their
+            options are used instead of querying them
+
+    Returns:
+        One dictionary per poll, in the same order as `polls`
     """
-    # Get creator
-    creator = db.get(User, poll.creator_id)
-    
-    # Get options with vote counts, ordered by ID to maintain consistency
-    options = db.exec(
-        select(PollOption)
-        .where(PollOption.poll_id == poll.id)
-        .order_by(PollOption.id)
-    ).all()
+    if not polls:
+        return []
 
-    # Count votes per option
-    for option in options:
-        votes_count = db.exec(
-            select(func.count())
-            .where(PollVote.option_id == option.id)
-        ).first()
-        option.votes = votes_count or 0
+    poll_ids = [poll.id for poll in polls]
 
-    # Get reactions
-    reactions = db.exec(
-        select(
-            PollReaction.reaction,
-            func.count(PollReaction.id).label('count')
-        )
-        .where(PollReaction.poll_id == poll.id)
-        .group_by(PollReaction.reaction)
-    ).all()
-    
-    reactions_dict = {'LIKE': 0, 'DISLIKE': 0}
-    for reaction in reactions:
-        reactions_dict[reaction.reaction] = reaction.count
+    # Get creators
+    creator_ids = {poll.creator_id for poll in polls}
+    creators = {
+        user.id: user
+        for user in db.exec(select(User).where(User.id.in_(creator_ids))).all()
+    }
 
-    # Get comments count
-    comments_count = db.exec(
-        select(func.count(PollComment.id))
-        .where(PollComment.poll_id == poll.id)
-    ).first()
+    # Get options, ordered by ID to maintain consistency
+    options_by_poll = {
+        poll_id: snapshot["options"] for poll_id, snapshot in (results or {}).items()
+    }
+    missing_poll_ids = [poll_id for poll_id in poll_ids if poll_id not in options_by_poll]
+    if missing_poll_ids:
+        options = db.exec(
+            select(PollOption)
+            .where(PollOption.poll_id.in_(missing_poll_ids))
+            .order_by(PollOption.id)
+        ).all()
+        for option in options:
+            options_by_poll.setdefault(option.poll_id, []).append(option.dict())
 
-    # Get full comments with user info
-    comments = db.exec(
-        select(PollComment, User)
-        .join(User)
-        .where(PollComment.poll_id == poll.id)
-        .order_by(PollComment.created_at.desc())
+    # Get tags
+    tags_by_poll = {}
+    tags = db.exec(
+        select(PollTagLink.poll_id, Tag.name)
+        .join(Tag, PollTagLink.tag_id == Tag.id)
+        .where(PollTagLink.poll_id.in_(poll_ids))
     ).all()
-    
-    comments_list = [
-        {
-            **comment.dict(),
-            "username": user.username,
-            "can_edit": current_user_id and current_user_id == comment.user_id
-        }
-        for comment, user in comments
-    ]
+    for poll_id, tag_name in tags:
+        tags_by_poll.setdefault(poll_id, []).append(tag_name)
 
-    # Get current user votes if authenticated
-    user_voted_options = []  # Initialize as empty list instead of None
+    # Get current user votes and reactions if authenticated
+    user_votes = {}
+    user_reactions = {}
     if current_user_id:
         votes = db.exec(
-            select(PollVote.option_id)
+            select(PollVote.poll_id, PollVote.option_id)
             .where(
-                PollVote.poll_id == poll.id,
+                PollVote.poll_id.in_(poll_ids),
                 PollVote.user_id == current_user_id
             )
         ).all()
-        if votes:
-            user_voted_options = [vote for vote in votes]
+        for poll_id, option_id in votes:
+            user_votes.setdefault(poll_id, []).append(option_id)
 
-    # Get current user reaction if authenticated
-    user_reaction = None
-    if current_user_id:
-        reaction = db.exec(
-            select(PollReaction)
+        user_reactions = dict(db.exec(
+            select(PollReaction.poll_id, PollReaction.reaction)
             .where(
-                PollReaction.poll_id == poll.id,
+                PollReaction.poll_id.in_(poll_ids),
                 PollReaction.user_id == current_user_id
             )
-        ).first()
-        if reaction:
-            user_reaction = reaction.reaction
+        ).all())
 
-    # Build poll dictionary
-    poll_dict = poll.dict()
-    
-    # Add creator information in standardized format
-    if not poll.is_anonymous and creator:
-        poll_dict['creator'] = {
-            'id': creator.id,
-            'username': creator.username,
-            'image': creator.image
-        }
-    else:
-        poll_dict['creator'] = None
-    
-    del poll_dict['creator_id']
+    enriched = []
+    for poll in polls:
+        # Build poll dictionary
+        poll_dict = poll.dict()
 
-    # Add options with voting status
-    poll_dict['options'] = [
-        {
-            **option.dict(),
-            'voted': option.id in user_voted_options if user_voted_options else False
-        }
-        for option in options
-    ]
+        # Add creator information in standardized format
+        creator = creators.get(poll.creator_id)
+        if not poll.is_anonymous and creator:
+            poll_dict['creator'] = {
+                'id': creator.id,
+                'username': creator.username,
+                'image': creator.image
+            }
+        else:
+            poll_dict['creator'] = None
 
-    # Add reactions and comments
-    poll_dict['reactions'] = reactions_dict
-    poll_dict['comments_count'] = comments_count or 0
-    poll_dict['comments'] = comments_list
-    poll_dict['user_reaction'] = user_reaction
-    poll_dict['user_voted_options'] = user_voted_options
+        del poll_dict['creator_id']
 
-    # Add tags
-    poll_dict['tags'] = [tag.name for tag in poll.tags]
+        # Add options with voting status
+        user_voted_options = user_votes.get(poll.id, [])
+        poll_dict['options'] = [
+            {
+                **option,
+                'voted': option['id'] in user_voted_options
+            }
+            for option in options_by_poll.get(poll.id, [])
+        ]
+
+        # Add reactions (comments are paged through list_poll_comments;
+        # comments_count comes with the poll)
+        poll_dict['reactions'] = {'LIKE': poll.likes_count, 'DISLIKE': poll.dislikes_count}
+        poll_dict['user_reaction'] = user_reactions.get(poll.id)
+        poll_dict['user_voted_options'] = user_voted_options
+
+        # Add tags
+        poll_dict['tags'] = tags_by_poll.get(poll.id, [])
+
+        enriched.append(poll_dict)
+
+    return enriched
+
+def enrich_poll(db: Session, poll: Poll, current_user_id: int | None = None) -> dict:
+    """
+    Enriches a single poll. See enrich_polls; options come from the poll's
+    results snapshot.
+    """
+    return enrich_polls(db, [poll], current_user_id, results={poll.id: get_poll_results(db, poll)})[0]
+
+def reconcile_poll_counters(db: Session, batch_size: int = 500, fix: bool = True, max_reported: int = 100) -> dict:
+    """
+    Recomputes the denormalized poll counters, option vote totals and the
+    running tallies of RANKING and SCALE polls (option scores, ballots per
+    position or value, ballots per ranking) from the vote, reaction and
+    comment tables, one batch of polls at a time, and reports every drift
+    found. Each batch is its own transaction and locks its poll rows, so it
+    is safe to run while the site takes writes.
+
+    Args:
+        db: Database session
+        batch_size: Number of polls per batch
+        fix: Write the recomputed values back (otherwise only report)
+        max_reported: Maximum number of drifted poll IDs listed in the report
+
+    Returns:
+        Dictionary with the number of polls and options checked and drifted,
+        the total absolute drift per counter and tally and the drifted poll IDs
+    """
+    report = {
+        "polls": 0,
+        "drifted_polls": 0,
+        "options": 0,
+        "drifted_options": 0,
+        "drift": dict.fromkeys(POLL_COUNTERS + ("option_votes", "option_scores", "option_ballots", "ranking_ballots"), 0),
+        "drifted_poll_ids": [],
+    }
+    poll_table, option_table = Poll.__table__, PollOption.__table__
+    update_poll = (
+        poll_table.update()
+        .where(poll_table.c.id == bindparam("poll_id"))
+        .values({name: bindparam(f"new_{name}") for name in POLL_COUNTERS})
+        .values(results_version=poll_table.c.results_version + 1)
+    )
+    update_option = (
+        option_table.update()
+        .where(option_table.c.id == bindparam("option_id"))
+        .values(votes=bindparam("new_votes"), score=bindparam("new_score"))
+    )
+
+    last_id = 0
+    while True:
+        polls_query = select(Poll.id, Poll.type, *(getattr(Poll, name) for name in POLL_COUNTERS)).where(Poll.id > last_id).order_by(Poll.id).limit(batch_size)
+        if fix:
+            polls_query = polls_query.with_for_update()
+        polls = db.exec(polls_query).all()
+        if not polls:
+            break
+        poll_ids = [poll.id for poll in polls]
+        last_id = poll_ids[-1]
+        poll_types = {poll.id: poll.type for poll in polls}
+        ballot_poll_ids = [poll.id for poll in polls if poll.type in (PollType.RANKING, PollType.SCALE)]
+        ranking_poll_ids = [poll.id for poll in polls if poll.type == PollType.RANKING]
+
+        actual = {poll_id: dict.fromkeys(POLL_COUNTERS, 0) for poll_id in poll_ids}
+        reactions = db.exec(
+            select(PollReaction.poll_id, PollReaction.reaction, func.count(PollReaction.id))
+            .where(PollReaction.poll_id.in_(poll_ids))
+            .group_by(PollReaction.poll_id, PollReaction.reaction)
+        ).all()
+        for poll_id, reaction, count in reactions:
+            actual[poll_id][REACTION_COUNTERS[ReactionType(reaction)]] = count
+
+        comments = db.exec(
+            select(PollComment.poll_id, func.count(PollComment.id))
+            .where(PollComment.poll_id.in_(poll_ids))
+            .group_by(PollComment.poll_id)
+        ).all()
+        for poll_id, count in comments:
+            actual[poll_id]["comments_count"] = count
+
+        votes_by_option = {}
+        votes = db.exec(
+            select(PollVote.poll_id, PollVote.option_id, func.count(PollVote.id))
+            .where(PollVote.poll_id.in_(poll_ids))
+            .group_by(PollVote.poll_id, PollVote.option_id)
+        ).all()
+        for poll_id, option_id, count in votes:
+            actual[poll_id]["total_votes"] += count
+            votes_by_option[option_id] = count
+
+        options = db.exec(
+            select(PollOption.id, PollOption.poll_id, PollOption.votes, PollOption.score).where(PollOption.poll_id.in_(poll_ids))
+        ).all()
+        options_per_poll = Counter(option.poll_id for option in options)
+
+        # Tallies of RANKING and SCALE polls, recomputed from the ballots
+        # as replace_ballot moves them (Borda points: the first of n options
+        # gets n - 1, SCALE: the value)
+        scores_by_option, expected_buckets, expected_rankings = {}, {}, {}
+        if ballot_poll_ids:
+            bucket = func.coalesce(PollVote.rank, PollVote.value)
+            for poll_id, option_id, value, count in db.exec(
+                select(PollVote.poll_id, PollVote.option_id, bucket, func.count(PollVote.id))
+                .where(PollVote.poll_id.in_(ballot_poll_ids), bucket.is_not(None))
+                .group_by(PollVote.poll_id, PollVote.option_id, bucket)
+            ).all():
+                points = options_per_poll[poll_id] - value if poll_types[poll_id] == PollType.RANKING else value
+                scores_by_option[option_id] = scores_by_option.get(option_id, 0) + count * points
+                expected_buckets[(option_id, value)] = (poll_id, count)
+        if ranking_poll_ids:
+            ballots = db.exec(
+                select(PollVote.poll_id, PollVote.user_id, PollVote.option_id)
+                .where(PollVote.poll_id.in_(ranking_poll_ids))
+                .order_by(PollVote.poll_id, PollVote.user_id, PollVote.rank)
+            ).all()
+            rankings = Counter(
+                (poll_id, ranking_key([option_id for _, _, option_id in rows]))
+                for (poll_id, _), rows in groupby(ballots, key=lambda row: (row[0], row[1]))
+            )
+            expected_rankings = {key: (key[0], count) for key, count in rankings.items()}
+
+        drifted_poll_ids = set()
+        tally_fixes = {}
+        for model, keys, expected_tallies, drift in (
+            (PollOptionTally, (PollOptionTally.option_id, PollOptionTally.bucket), expected_buckets, "option_ballots"),
+            (PollRankingBallot, (PollRankingBallot.poll_id, PollRankingBallot.ranking), expected_rankings, "ranking_ballots"),
+        ):
+            stored_tallies = {
+                (first, second): (poll_id, ballots)
+                for first, second, poll_id, ballots in db.exec(
+                    select(*keys, model.poll_id, model.ballots)
+                    .where(model.poll_id.in_(ballot_poll_ids), model.ballots != 0)
+                ).all()
+            } if ballot_poll_ids else {}
+            tally_fixes[model] = (keys, [])
+            for key in stored_tallies.keys() | expected_tallies.keys():
+                poll_id, ballots = expected_tallies.get(key) or (stored_tallies[key][0], 0)
+                difference = abs(stored_tallies.get(key, (poll_id, 0))[1] - ballots)
+                if difference:
+                    report["drift"][drift] += difference
+                    drifted_poll_ids.add(poll_id)
+                    tally_fixes[model][1].append({
+                        keys[0].key: key[0], keys[1].key: key[1], "poll_id": poll_id, "ballots": ballots
+                    })
+
+        option_fixes = []
+        for option_id, poll_id, option_votes, option_score in options:
+            expected_votes = votes_by_option.get(option_id, 0)
+            expected_score = scores_by_option.get(option_id, 0)
+            if option_votes != expected_votes or option_score != expected_score:
+                report["drift"]["option_votes"] += abs(option_votes - expected_votes)
+                report["drift"]["option_scores"] += abs(option_score - expected_score)
+                drifted_poll_ids.add(poll_id)
+                option_fixes.append({"option_id": option_id, "new_votes": expected_votes, "new_score": expected_score})
+
+        poll_fixes = []
+        for poll in polls:
+            expected = actual[poll.id]
+            for name in POLL_COUNTERS:
+                difference = abs(getattr(poll, name) - expected[name])
+                if difference:
+                    report["drift"][name] += difference
+                    drifted_poll_ids.add(poll.id)
+            # Also bumps results_version, so cached results are read again
+            if poll.id in drifted_poll_ids:
+                poll_fixes.append({"poll_id": poll.id, **{f"new_{name}": value for name, value in expected.items()}})
+                if len(report["drifted_poll_ids"]) < max_reported:
+                    report["drifted_poll_ids"].append(poll.id)
+
+        if fix and poll_fixes:
+            db.execute(update_poll, poll_fixes)
+        if fix and option_fixes:
+            db.execute(update_option, option_fixes)
+        if fix:
+            for model, (keys, rows) in tally_fixes.items():
+                if rows:
+                    statement = dialect_insert(db, model).values(rows)
+                    db.execute(statement.on_conflict_do_update(
+                        index_elements=[column.key for column in keys],
+                        set_={"ballots": statement.excluded.ballots}
+                    ))
+        # Ends the batch transaction, releasing the row locks
+        db.commit()
+
+        report["polls"] += len(polls)
+        report["drifted_polls"] += len(poll_fixes)
+        report["options"] += len(options)
+        report["drifted_options"] += len(option_fixes)
 
-    return poll_dict
\ No newline at end of file
+    return report
@@ -1,6 +1,7 @@
 from enum import Enum
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index, UniqueConstraint
 from typing import Optional
 from api.public.tag.models import Tag
 from api.utils.generic_models import PollCommunityLink, PollTagLink
@@ -32,6 +33,8 @@ class PollBase(SQLModel):
     is_anonymous: bool = Field(default=True)
     ends_at: Optional[datetime] = Field(nullable=True)
     scope: str = Field(max_length=100, nullable=True, description="The scope of the poll, e.g. 'GLOBAL', 'INTERNATIONAL', 'NATIONAL', etc.")
+    scale_min: Optional[int] = Field(default=None, nullable=True, description="Lowest value of SCALE polls (default 1)")
+    scale_max: Optional[int] = Field(default=None, nullable=True, description="Highest value of SCALE polls (default 5)")
 
     @field_validator("ends_at")
     def ends_at_must_be_future_if_published(cls, v, info):
@@ -40,6 +43,11 @@ class PollBase(SQLModel):
         return v
 
 class Poll(PollBase, table=True):
+    # Keyset pagination of the listings (newest first)
+    __table_args__ = (
+        Index("ix_poll_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     slug: str = Field(max_length=100, index=True, unique=True)
     creator_id: int = Field(foreign_key="users.id")
@@ -47,6 +55,15 @@ class Poll(PollBase, table=True):
     created_at: datetime = Field(default=datetime.utcnow)
     updated_at: datetime = Field(default=datetime.utcnow)
     views_count: int = Field(default=0)
+    # Denormalized counters, kept in sync by the vote, reaction and comment
+    # paths (see update_poll_counters) and checked by reconcile_poll_counters
+    likes_count: int = Field(default=0)
+    dislikes_count: int = Field(default=0)
+    comments_count: int = Field(default=0)
+    total_votes: int = Field(default=0)
+    # Bumped by every write that changes the results (votes, reactions) or
+    # the comment count; names the results snapshot and the detail ETag
+    results_version: int = Field(default=0)
 
     # Relationships
     communities: list["Community"] = Relationship(back_populates="polls", link_model=PollCommunityLink)
@@ -56,33 +73,93 @@ class Poll(PollBase, table=True):
     votes: list["PollVote"] = Relationship(back_populates="poll", cascade_delete=True)
     reactions: list["PollReaction"] = Relationship(back_populates="poll", cascade_delete=True)
     comments: list["PollComment"] = Relationship(back_populates="poll", cascade_delete=True)
+    ranking_ballots: list["PollRankingBallot"] = Relationship(back_populates="poll", cascade_delete=True)
 
 class PollOption(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    poll_id: int = Field(foreign_key="poll.id")
+    poll_id: int = Field(foreign_key="poll.id", index=True)
     text: str = Field(max_length=150)
     votes: int = Field(default=0)
+    # Running score of RANKING (Borda points) and SCALE (sum of values) polls
+    score: int = Field(default=0)
     is_custom_option: bool = Field(default=False)
     custom_responses: list["PollCustomResponse"] = Relationship(back_populates="option")
 
     # Relationships
     poll: Poll = Relationship(back_populates="options")
     votes_rel: list["PollVote"] = Relationship(back_populates="option")
+    tallies: list["PollOptionTally"] = Relationship(back_populates="option", cascade_delete=True)
+    community_tallies: list["PollCommunityTally"] = Relationship(back_populates="option", cascade_delete=True)
 
 class PollVote(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_pollvote_user_id_poll_id", "user_id", "poll_id"),
+        UniqueConstraint("poll_id", "user_id", "option_id", name="uq_pollvote_poll_id_user_id_option_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    poll_id: int = Field(foreign_key="poll.id")
+    poll_id: int = Field(foreign_key="poll.id", index=True)
     option_id: int = Field(foreign_key="polloption.id")
     user_id: int = Field(foreign_key="users.id")
+    # Position of the option on the ballot (RANKING polls, 1 is the first choice)
+    rank: Optional[int] = Field(default=None, nullable=True)
+    # Value given to the option (SCALE polls)
+    value: Optional[int] = Field(default=None, nullable=True)
 
     # Relationships
     poll: Poll = Relationship(back_populates="votes")
     option: Optional[PollOption] = Relationship(back_populates="votes_rel")
     user: "User" = Relationship(back_populates="poll_votes")
 
+class PollOptionTally(SQLModel, table=True):
+    """
+    Running distribution of an option's ballots on RANKING (ballots per
+    position) and SCALE (ballots per value) polls, kept in sync by create_vote.
+    """
+    option_id: int = Field(foreign_key="polloption.id", primary_key=True)
+    bucket: int = Field(primary_key=True, description="Position (RANKING) or value (SCALE)")
+    poll_id: int = Field(foreign_key="poll.id", index=True)
+    ballots: int = Field(default=0)
+
+    # Relationships
+    option: PollOption = Relationship(back_populates="tallies")
+
+class PollCommunityTally(SQLModel, table=True):
+    """
+    Votes per option and community of the voters (every community they
+    currently belong to), kept in sync by create_vote and by joining or
+    leaving a community (move_member_community_tallies), and rebuilt from
+    the votes by rebuild_community_tallies.
+    """
+    poll_id: int = Field(foreign_key="poll.id", primary_key=True)
+    community_id: int = Field(foreign_key="community.id", primary_key=True)
+    option_id: int = Field(foreign_key="polloption.id", primary_key=True)
+    votes: int = Field(default=0)
+
+    # Relationships
+    option: PollOption = Relationship(back_populates="community_tallies")
+
+class PollRankingBallot(SQLModel, table=True):
+    """
+    Ballots of a RANKING poll grouped by ranking (comma-separated option IDs,
+    first choice first), kept in sync by create_vote; input of the
+    instant-runoff count.
+    """
+    poll_id: int = Field(foreign_key="poll.id", primary_key=True)
+    ranking: str = Field(primary_key=True)
+    ballots: int = Field(default=0)
+
+    # Relationships
+    poll: Poll = Relationship(back_populates="ranking_ballots")
+
 class PollReaction(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_pollreaction_user_id_poll_id", "user_id", "poll_id"),
+        UniqueConstraint("poll_id", "user_id", name="uq_pollreaction_poll_id_user_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    poll_id: int = Field(foreign_key="poll.id")
+    poll_id: int = Field(foreign_key="poll.id", index=True)
     user_id: int = Field(foreign_key="users.id")
     reaction: ReactionType = Field()
     reacted_at: datetime = Field(default=datetime.utcnow)
@@ -92,6 +169,11 @@ class PollReaction(SQLModel, table=True):
     user: "User" = Relationship(back_populates="poll_reactions")
 
 class PollComment(SQLModel, table=True):
+    # Keyset pagination of a poll's comments (also serves lookups by poll)
+    __table_args__ = (
+        Index("ix_pollcomment_poll_id_created_at_id", "poll_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     poll_id: int = Field(foreign_key="poll.id")
     user_id: int = Field(foreign_key="users.id")
@@ -116,6 +198,21 @@ class PollCreate(PollBase):
     subregion_id: Optional[int] = Field(default=None, description="National subdivision ID for subnational polls")
     tags: list[str] = Field(default=[], description="List of tags for the poll")
 
+class PollBulkCreate(SQLModel):
+    polls: list[PollCreate]
+
+class PollBulkItemResult(SQLModel):
+    index: int = Field(description="Position of the poll in the request")
+    status: str = Field(description="'created' or 'invalid'")
+    id: Optional[int] = None
+    slug: Optional[str] = None
+    errors: list[str] = []
+
+class PollBulkResult(SQLModel):
+    created: int
+    invalid: int
+    items: list[PollBulkItemResult]
+
 class PollReactionCount(SQLModel):
     LIKE: int = 0
     DISLIKE: int = 0
@@ -149,14 +246,15 @@ class PollRead(PollBase):
     options: list[PollOptionRead]
     communities: list[CommunityMinimal]
     reactions: PollReactionCount
+    total_votes: int = 0
     comments_count: int = 0
-    comments: list[PollCommentRead] = []
     countries: Optional[list[str]] = None
     user_reaction: Optional[ReactionType] = None
     user_voted_options: Optional[list[int]] = None
 
 class PollVoteCreate(SQLModel):
-    option_ids: list[int] = Field(description="List of IDs of selected options")
+    option_ids: list[int] = Field(description="List of IDs of selected options (RANKING polls: first choice first)")
+    values: Optional[list[int]] = Field(default=None, description="SCALE polls: value given to each option of option_ids, in the same order")
 
 class PollReactionCreate(SQLModel):
     reaction: ReactionType
@@ -0,0 +1,128 @@
+from array import array
+from typing import Iterable, Optional, Sequence
+
+def ranking_key(option_ids: Sequence[int]) -> str:
+    """Key of a ranking in PollRankingBallot (comma-separated option IDs, first choice first)"""
+    return ",".join(str(option_id) for option_id in option_ids)
+
+def parse_ranking(key: str) -> list[int]:
+    return [int(option_id) for option_id in key.split(",")] if key else []
+
+class RankedBallots:
+    """
+    Ranked ballots packed into flat integer arrays: the choices of every
+    distinct ranking one after another (as candidate indexes), where each
+    ranking starts, and how many ballots cast it. A million ballots over a
+    handful of options fit in a few thousand rankings.
+    """
+
+    __slots__ = ("candidates", "choices", "starts", "weights", "_index")
+
+    def __init__(self, candidates: Sequence[int]):
+        """
+        Args:
+            candidates: Option IDs that can be ranked; choices of other IDs
+                (e.g. deleted options) are skipped
+        """
+        self.candidates = list(candidates)
+        self.choices = array("i")
+        self.starts = array("i", [0])
+        self.weights = array("q")
+        self._index = {candidate: index for index, candidate in enumerate(self.candidates)}
+
+    def add(self, ranking: Iterable[int], ballots: int = 1) -> None:
+        """Adds `ballots` ballots with the given ranking (option IDs, first choice first)"""
+        if ballots <= 0:
+            return
+        seen = set()
+        for option_id in ranking:
+            index = self._index.get(option_id)
+            if index is not None and index not in seen:
+                seen.add(index)
+                self.choices.append(index)
+        self.starts.append(len(self.choices))
+        self.weights.append(ballots)
+
+    @classmethod
+    def from_rows(cls, candidates: Sequence[int], rows: Iterable[tuple[str, int]]) -> "RankedBallots":
+        """Builds the ballots from (ranking key, ballots) rows of PollRankingBallot"""
+        ballots = cls(candidates)
+        for key, count in rows:
+            ballots.add(parse_ranking(key), count)
+        return ballots
+
+    def __len__(self) -> int:
+        return sum(self.weights)
+
+def instant_runoff(ballots: RankedBallots) -> dict:
+    """
+    Instant-runoff count: every round the ballots count for their highest
+    ranked option still running; an option with more than half of those
+    ballots wins, otherwise the option with the fewest is eliminated (ties
+    are broken against the option listed last) and its ballots move on to
+    their next choice. Ballots without further choices are exhausted.
+
+    Only the ballots of the eliminated option are looked at again, so the
+    whole count reads each ranking's choices at most once.
+
+    Returns:
+        Dictionary with the winner (option ID, None without ballots), the
+        number of ballots and the rounds, each with the ballots counting for
+        every running option, the exhausted ballots and the eliminated option
+    """
+    candidates = ballots.candidates
+    choices, starts, weights = ballots.choices, ballots.starts, ballots.weights
+    running = [True] * len(candidates)
+    tallies = [0] * len(candidates)
+    # Rankings currently counting for each option
+    piles: list[Optional[list[int]]] = [[] for _ in candidates]
+    # Next choice to read of each ranking
+    position = array("i", starts[:-1])
+    exhausted = 0
+
+    for ranking, weight in enumerate(weights):
+        start = starts[ranking]
+        if start < starts[ranking + 1]:
+            candidate = choices[start]
+            tallies[candidate] += weight
+            piles[candidate].append(ranking)
+        else:
+            exhausted += weight
+
+    rounds = []
+    winner = None
+    remaining = list(range(len(candidates)))
+    while remaining:
+        counting = sum(tallies[candidate] for candidate in remaining)
+        result = {
+            "tallies": {candidates[candidate]: tallies[candidate] for candidate in remaining},
+            "exhausted": exhausted,
+            "eliminated": None,
+        }
+        rounds.append(result)
+        if not counting:
+            break
+        leader = max(remaining, key=lambda candidate: (tallies[candidate], -candidate))
+        if tallies[leader] * 2 > counting or len(remaining) == 1:
+            winner = candidates[leader]
+            break
+
+        loser = min(remaining, key=lambda candidate: (tallies[candidate], -candidate))
+        result["eliminated"] = candidates[loser]
+        remaining.remove(loser)
+        running[loser] = False
+        pile, piles[loser] = piles[loser], None
+        tallies[loser] = 0
+        for ranking in pile:
+            index, end = position[ranking] + 1, starts[ranking + 1]
+            while index < end and not running[choices[index]]:
+                index += 1
+            position[ranking] = index
+            if index < end:
+                candidate = choices[index]
+                tallies[candidate] += weights[ranking]
+                piles[candidate].append(ranking)
+            else:
+                exhausted += weights[ranking]
+
+    return {"winner": winner, "ballots": sum(weights), "rounds": rounds}
@@ -1,37 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
-from api.database import get_session
+import json
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from api.config import settings
+from api.database import get_routing_session, get_async_routing_session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import Session, select, func
 from sqlalchemy import distinct
-from api.public.user.models import User
-from api.public.poll.crud import get_all_polls, create_poll, create_vote, create_or_update_reaction, get_country_polls, get_regional_polls, enrich_poll
+from api.public.user.models import User, UserRole
+from api.public.poll.crud import check_poll_data, create_polls_bulk, get_all_polls, create_poll, create_vote, create_or_update_reaction, get_country_polls, get_regional_polls, enrich_poll, enrich_polls, update_poll_counters, get_poll_results, get_instant_runoff, get_results_by_community, poll_updates, page_poll_ids, get_polls_by_ids, list_poll_comments
 from api.public.poll.models import (
     PollCreate, 
     PollRead, 
+    PollBulkCreate,
+    PollBulkResult,
     PollVoteCreate,
     Poll,
     PollStatus, 
     PollType, 
-    PollOption,
-    PollVote,
     PollReactionCreate,
     PollComment,
     PollCommentCreate,
     PollCommentUpdate,
     PollCommunityLink,
 )
-from api.auth.dependencies import get_current_user, get_current_user_optional
+from api.auth.dependencies import get_current_user, get_current_user_optional, get_current_user_optional_async
 from datetime import datetime
 from api.public.country.models import Country
 from api.public.subregion.models import Subregion
-from api.public.community.models import Community
+from api.public.community.models import Community, CommunityLevel
 from api.public.region.models import Region
 from typing import Optional
-from api.utils.generic_models import UserCommunityLink
+from api.public.community.crud import is_member_of_item_communities
+from api.utils.view_counter import view_counter
+from api.utils.pagination import list_total, list_totals, page_count
 
 router = APIRouter()
 
 @router.get("/")
-def read_polls(
+async def read_polls(
     scope: str | None = None,
     country: str | None = None,
     region: int | None = None,
@@ -39,8 +47,11 @@ def read_polls(
     community_id: int | None = None,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Items per page"),
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(default=True, description="Count the matching polls (total and pages)"),
+    estimate_total: bool = Query(default=False, description="Use the database's row estimate for unfiltered listings"),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncSession = Depends(get_async_routing_session)
 ):
     """
     Get polls with optional filters and pagination.
@@ -51,6 +62,41 @@ def read_polls(
     - community_id: Filter by community ID
     - page: Page number (default: 1)
     - size: Items per page (default: 10, max: 100)
+    - cursor: Opaque cursor from a previous response's next_cursor; faster than page on deep pages
+    - include_total: Set to false to skip counting; total and pages are then null
+    - estimate_total: Approximate total (PostgreSQL planner estimate) when no filter is applied
+    """
+    return await db.run_sync(
+        list_polls,
+        scope=scope,
+        country=country,
+        region=region,
+        subregion=subregion,
+        community_id=community_id,
+        page=page,
+        size=size,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total,
+        current_user=current_user
+    )
+
+def list_polls(
+    db: Session,
+    scope: str | None = None,
+    country: str | None = None,
+    region: int | None = None,
+    subregion: int | None = None,
+    community_id: int | None = None,
+    page: int = 1,
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
+    current_user: User | None = None
+):
+    """
+    Sync implementation of read_polls, run on the request's AsyncSession.
     """
     # Filtrar parámetros indefinidos
     if country == "undefined" or country == "null":
@@ -79,55 +125,34 @@ def read_polls(
                 detail=f"Community with ID {community_id} not found"
             )
         
-        # Calculate offset for pagination
-        offset = (page - 1) * size
-        
-        # Base query that joins Poll with PollCommunityLink
-        query = (
-            select(Poll)
+        # Page of poll IDs first, then the polls themselves
+        page_query = (
+            select(Poll.id, Poll.created_at)
+            .distinct()
             .join(PollCommunityLink)
             .where(PollCommunityLink.community_id == community_id)
         )
         
         # Apply additional filter by scope if provided
         if scope:
-            query = query.where(Poll.scope == scope)
-            
-        # Consulta para el total debe incluir los mismos filtros que la consulta principal
-        base_query = (
-            select(Poll.id)
-            .join(PollCommunityLink)
-            .where(PollCommunityLink.community_id == community_id)
-        )
-
-        # Aplicar el mismo filtro de scope a la consulta total
-        if scope:
-            base_query = base_query.where(Poll.scope == scope)
+            page_query = page_query.where(Poll.scope == scope)
 
-        # Ahora usar esa consulta base para el conteo
-        total_query = select(func.count()).select_from(
-            base_query.distinct().subquery()
+        total_query = select(func.count()).select_from(page_query.subquery())
+        total = list_total(
+            db, "poll", {"community": community_id, "scope": scope}, total_query, include_total, estimate_total
         )
-
-        total = db.exec(total_query).first() or 0
-        total_pages = (total + size - 1) // size if total > 0 else 1
         
-        # Apply sorting and pagination
-        query = query.order_by(Poll.created_at.desc()).offset(offset).limit(size)
-        
-        # Execute the query
-        polls = db.exec(query).all()
+        page_ids, next_cursor = page_poll_ids(db, page_query, cursor, page, size)
+        polls = get_polls_by_ids(db, page_ids)
         
         # Enrich with additional information
         return {
-            "items": [
-                enrich_poll(db, poll, current_user.id if current_user else None)
-                for poll in polls
-            ],
+            "items": enrich_polls(db, polls, current_user.id if current_user else None),
             "total": total,
             "page": page,
             "size": size,
-            "pages": total_pages
+            "pages": page_count(total, size),
+            "next_cursor": next_cursor
         }
     
     # If there is a subregion parameter and the scope is SUBREGIONAL
@@ -148,8 +173,9 @@ def read_polls(
         community_id = subregion_obj.community_id
         
         # Now filter the polls that are associated with this community and have the scope SUBREGIONAL
-        query = (
-            select(Poll)
+        page_query = (
+            select(Poll.id, Poll.created_at)
+            .distinct()
             .join(PollCommunityLink)
             .where(
                 Poll.scope == scope,
@@ -157,25 +183,22 @@ def read_polls(
             )
         )
         
-        # Apply pagination
-        total = db.scalar(select(func.count()).select_from(query.subquery()))
+        total = list_total(
+            db, "poll", {"subregion": subregion, "scope": scope},
+            select(func.count()).select_from(page_query.subquery()), include_total, estimate_total
+        )
         
-        # Execute the query
-        polls = db.exec(query).all()
+        # Apply pagination
+        page_ids, next_cursor = page_poll_ids(db, page_query, cursor, page, size)
+        polls = get_polls_by_ids(db, page_ids)
         
-        # Enrich the polls if there is an authenticated user
-        if current_user:
-            polls = [
-                enrich_poll(db, poll, current_user.id)
-                for poll in polls
-            ]
-            
         return {
-            "items": polls,
+            "items": enrich_polls(db, polls, current_user.id if current_user else None),
             "total": total,
             "page": page,
             "size": size,
-            "pages": (total + size - 1) // size
+            "pages": page_count(total, size),
+            "next_cursor": next_cursor
         }
     
     # Rest of the original code
@@ -186,7 +209,10 @@ def read_polls(
             scope=scope,
             current_user_id=current_user.id if current_user else None,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            include_total=include_total,
+            estimate_total=estimate_total
         )
     
     if region:
@@ -208,7 +234,10 @@ def read_polls(
             scope=scope,
             current_user_id=current_user.id if current_user else None,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            include_total=include_total,
+            estimate_total=estimate_total
         )
     
     return get_all_polls(
@@ -216,33 +245,61 @@ def read_polls(
         scope=scope, 
         current_user_id=current_user.id if current_user else None,
         page=page,
-        size=size
+        size=size,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total
     )
 
 @router.post("/", response_model=PollRead, status_code=status.HTTP_201_CREATED)
 def create_new_poll(
     poll_data: PollCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create a new poll.
     Requires authentication.
     """
-    if len(poll_data.options) < 2:
+    errors = check_poll_data(poll_data)
+    if errors:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="The poll must have at least 2 options"
+            detail=errors[0]
         )
     
     return create_poll(db, poll_data, current_user.id)
 
+@router.post("/bulk", response_model=PollBulkResult)
+def create_polls_in_bulk(
+    bulk_data: PollBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_routing_session)
+):
+    """
+    Import several polls at once, in a single transaction.
+    Only for administrators. Invalid polls are skipped; the response has one
+    result per poll, in request order, with its ID and slug or its errors.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can import polls"
+        )
+    if len(bulk_data.polls) > settings.POLL_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.POLL_BULK_MAX_ITEMS} polls can be imported at once"
+        )
+
+    return create_polls_bulk(db, bulk_data.polls, current_user.id)
+
 @router.post("/{poll_id}/vote", response_model=PollRead)
 def vote_poll(
     poll_id: int,
     vote_data: PollVoteCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Vote on a poll.
@@ -264,21 +321,7 @@ def vote_poll(
         )
     
     # Verify that the user is a member of at least one of the poll's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    
-    user_community_ids = set(user_communities)
-    
-    poll_communities = db.exec(
-        select(PollCommunityLink.community_id)
-        .where(PollCommunityLink.poll_id == poll_id)
-    ).all()
-    
-    poll_community_ids = set(poll_communities)
-    
-    if not user_community_ids.intersection(poll_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, PollCommunityLink.poll_id, poll_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to vote in this poll"
@@ -298,55 +341,16 @@ def vote_poll(
             detail=f"This poll expired on {poll.ends_at}"
         )
 
-    # If option_ids is empty, just remove the existing votes
-    if len(vote_data.option_ids) == 0:
-        # Find and delete existing votes
-        existing_votes = db.query(PollVote).filter(
-            PollVote.poll_id == poll_id,
-            PollVote.user_id == current_user.id
-        ).all()
-        
-        # Decrement vote counters and delete the votes
-        for vote in existing_votes:
-            option = db.get(PollOption, vote.option_id)
-            if option:
-                option.votes = max(0, option.votes - 1)
-            db.delete(vote)
-        
-        db.commit()
-        db.refresh(poll)
-        return poll
-
-    # If there are option_ids, continue with the normal validation...
-    valid_options = []
-    for option_id in vote_data.option_ids:
-        option = db.query(PollOption).filter(
-            PollOption.id == option_id,
-            PollOption.poll_id == poll_id
-        ).first()
-        if not option:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Option {option_id} does not exist in poll {poll_id}"
-            )
-        valid_options.append(option)
-
-    # Validate the number of options according to the poll type
-    if poll.type == PollType.BINARY or poll.type == PollType.SINGLE_CHOICE:
-        if len(vote_data.option_ids) != 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This type of poll only allows selecting one option"
-            )
-
-    return create_vote(db, poll_id, vote_data.option_ids, current_user.id)
+    # Options are validated by create_vote in a single query; an empty
+    # option_ids list removes the user's existing votes
+    return create_vote(db, poll_id, vote_data.option_ids, current_user.id, values=vote_data.values)
 
 @router.post("/{poll_id}/react", response_model=PollRead)
 def react_to_poll(
     poll_id: int,
     reaction_data: PollReactionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     React to a poll with like or dislike.
@@ -361,21 +365,7 @@ def react_to_poll(
         )
     
     # Verify that the user is a member of at least one of the poll's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    
-    user_community_ids = set(user_communities)
-    
-    poll_communities = db.exec(
-        select(PollCommunityLink.community_id)
-        .where(PollCommunityLink.poll_id == poll_id)
-    ).all()
-    
-    poll_community_ids = set(poll_communities)
-    
-    if not user_community_ids.intersection(poll_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, PollCommunityLink.poll_id, poll_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to react to this poll"
@@ -391,12 +381,16 @@ def react_to_poll(
 @router.get("/{poll_id}/comments")
 def get_poll_comments(
     poll_id: int,
+    size: int = Query(default=20, ge=1, le=100, description="Comments per page"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
     current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
-    Get all comments for a specific poll.
+    Get the comments of a poll, newest first, one page at a time.
     Does not require authentication.
+    - size: Comments per page (default: 20, max: 100)
+    - cursor: Opaque cursor from a previous response's next_cursor (null on the last page)
     """
     poll = db.get(Poll, poll_id)
     if not poll:
@@ -405,28 +399,17 @@ def get_poll_comments(
             detail="Poll not found"
         )
 
-    comments = db.exec(
-        select(PollComment, User)
-        .join(User)
-        .where(PollComment.poll_id == poll_id)
-        .order_by(PollComment.created_at.desc())
-    ).all()
-
-    return [
-        {
-            **comment.dict(),
-            "username": user.username,
-            "can_edit": current_user and current_user.id == comment.user_id
-        }
-        for comment, user in comments
-    ]
+    return {
+        **list_poll_comments(db, poll_id, cursor, size, current_user.id if current_user else None),
+        "total": poll.comments_count
+    }
 
 @router.post("/{poll_id}/comments", status_code=status.HTTP_201_CREATED)
 def create_poll_comment(
     poll_id: int,
     comment_data: PollCommentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create a comment on a poll.
@@ -441,23 +424,7 @@ def create_poll_comment(
         )
     
     # Verify that the user is a member of at least one of the poll's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    
-    # Usar directamente los enteros
-    user_community_ids = set(user_communities)
-    
-    poll_communities = db.exec(
-        select(PollCommunityLink.community_id)
-        .where(PollCommunityLink.poll_id == poll_id)
-    ).all()
-    
-    # Usar directamente los enteros
-    poll_community_ids = set(poll_communities)
-    
-    if not user_community_ids.intersection(poll_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, PollCommunityLink.poll_id, poll_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to comment on this poll"
@@ -471,6 +438,7 @@ def create_poll_comment(
         updated_at=datetime.utcnow()
     )
     db.add(new_comment)
+    update_poll_counters(db, poll_id, comments_count=1, results_version=1)
     db.commit()
     db.refresh(new_comment)
 
@@ -486,7 +454,7 @@ def update_poll_comment(
     comment_id: int,
     comment_data: PollCommentUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Update an existing comment.
@@ -522,7 +490,7 @@ def delete_poll_comment(
     poll_id: int,
     comment_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Delete a comment.
@@ -542,17 +510,168 @@ def delete_poll_comment(
         )
 
     db.delete(comment)
+    update_poll_counters(db, poll_id, comments_count=-1, results_version=1)
     db.commit()
 
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def poll_etag(poll: Poll, current_user: User | None = None) -> str:
+    """
+    Weak ETag of a poll detail: changes with the poll's results_version and
+    updated_at, and differs per user (the detail includes their votes).
+    """
+    user_id = current_user.id if current_user else 0
+    digest = hashlib.sha1(f"{poll.updated_at.isoformat()}:{user_id}".encode()).hexdigest()[:16]
+    return f'W/"poll-{poll.id}-{poll.results_version}-{digest}"'
+
+@router.get("/{poll_id}/results")
+def read_poll_results(
+    poll_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_routing_session)
+):
+    """
+    Get the results of a poll: option tallies and percentages, total votes
+    and reaction counts.
+    Responses carry an ETag; a request whose If-None-Match matches the
+    current results gets an empty 304.
+    """
+    poll = db.get(Poll, poll_id)
+    if not poll:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Poll not found"
+        )
+
+    etag = f'W/"poll-{poll.id}-results-{poll.results_version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return JSONResponse(get_poll_results(db, poll), headers=headers)
+
+@router.get("/{poll_id}/results/instant-runoff")
+def read_poll_instant_runoff(
+    poll_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_routing_session)
+):
+    """
+    Get the instant-runoff count of a RANKING poll: the winner and, for
+    every round, the ballots counting for each remaining option, the
+    exhausted ballots and the eliminated option.
+    Responses carry an ETag; a request whose If-None-Match matches the
+    current results gets an empty 304.
+    """
+    poll = db.get(Poll, poll_id)
+    if not poll:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Poll not found"
+        )
+    if poll.type != PollType.RANKING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Instant runoff is only available for RANKING polls"
+        )
+
+    etag = f'W/"poll-{poll.id}-instant-runoff-{poll.results_version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return JSONResponse(get_instant_runoff(db, poll), headers=headers)
+
+@router.get("/{poll_id}/results/by-community")
+def read_poll_results_by_community(
+    poll_id: int,
+    level: CommunityLevel = Query(CommunityLevel.NATIONAL, description="Level of the voters' communities to break the results down by"),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_routing_session)
+):
+    """
+    Get the results of a poll per community of the voters at one level,
+    e.g. per country with level=NATIONAL: votes of every option in each
+    community, from the most to the least active community.
+    Responses carry an ETag; a request whose If-None-Match matches the
+    current results gets an empty 304.
+    """
+    poll = db.get(Poll, poll_id)
+    if not poll:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Poll not found"
+        )
+
+    etag = f'W/"poll-{poll.id}-by-community-{level.value}-{poll.results_version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return JSONResponse(get_results_by_community(db, poll, level), headers=headers)
+
+def sse_event(payload: dict) -> str:
+    """Formats a results snapshot as a Server-Sent Event"""
+    return f"event: results\nid: {payload['version']}\ndata: {json.dumps(payload)}\n\n"
+
+@router.get("/{poll_id}/stream")
+async def stream_poll_results(poll_id: int):
+    """
+    Stream the results of a poll as Server-Sent Events.
+    The current results are sent on connect, then again whenever votes or
+    reactions change them, at most once every LIVE_UPDATES_INTERVAL seconds.
+    Each event has type "results", the results version as ID and the same
+    data as GET /polls/{poll_id}/results.
+    """
+    # Subscribe before reading the latest results, so no change between
+    # both is missed; they are only loaded when no subscriber has them yet
+    subscription = poll_updates.subscribe(poll_id, heartbeat=settings.LIVE_UPDATES_HEARTBEAT)
+    try:
+        results = await poll_updates.latest(poll_id)
+    except Exception:
+        subscription.close()
+        raise
+    if results is None:
+        subscription.close()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Poll not found"
+        )
+
+    async def events():
+        try:
+            yield sse_event(results)
+            async for payload in subscription:
+                # Keep-alive comment, also how disconnected clients are noticed
+                yield sse_event(payload) if payload else ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{poll_id_or_slug}")
 def read_poll(
     poll_id_or_slug: str,
+    if_none_match: str | None = Header(default=None),
     current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get a specific poll by ID or slug.
     Does not require authentication.
+    Responses carry an ETag; a request whose If-None-Match matches the
+    current version gets an empty 304 (and is not counted as a view).
     """
     # Determine if it is an ID or a slug
     if poll_id_or_slug.isdigit():
@@ -566,19 +685,25 @@ def read_poll(
             detail="Poll not found"
         )
     
-    # Increment view count
-    poll.views_count += 1
-    db.add(poll)
-    db.commit()
+    etag = poll_etag(poll, current_user)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # Count the view; it is written in the background
+    view_counter.add(Poll, poll.id)
     
     # Enrich the poll with additional information
-    return enrich_poll(db, poll, current_user.id if current_user else None)
+    return JSONResponse(
+        jsonable_encoder(enrich_poll(db, poll, current_user.id if current_user else None)),
+        headers=headers
+    )
 
 @router.delete("/{poll_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_poll(
     poll_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Delete a poll.
@@ -603,5 +728,6 @@ def delete_poll(
     # Delete the poll
     db.delete(poll)
     db.commit()
+    list_totals.invalidate("poll")
     
     # Return 204 No Content (already defined in the decorator)
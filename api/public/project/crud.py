@@ -8,7 +8,7 @@ from api.public.project.models import (
 )
 from api.public.community.models import Community
 from api.public.user.models import User
-from api.utils.slug import create_slug
+from api.utils.slug import create_slug, add_with_unique_slug
 from datetime import datetime
 from fastapi import HTTPException, status
 from api.public.community.crud import get_community_by_id
@@ -17,10 +17,11 @@ from api.public.region.crud import get_region_by_id
 from api.public.subregion.crud import get_subregion_by_id
 from api.public.locality.models import Locality
 from api.utils.generic_models import ProjectCommunityLink
+from api.utils.pagination import keyset_paginate, page_with_cursor, list_total, list_totals, page_count
 from api.public.country.models import Country
-from math import ceil
-import random
-import string
+
+# Sort key of the project listings, used for keyset (cursor) pagination
+PROJECT_SORT_KEY = [Project.created_at, Project.id]
 
 def get_all_projects(
     db: Session, 
@@ -31,10 +32,17 @@ def get_all_projects(
     search = None,
     current_user_id = None,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
     """
-    Retrieves all projects with pagination and optional filters
+    Retrieves all projects with pagination and optional filters.
+    With a cursor (the next_cursor of the previous response) the page is
+    fetched by keyset instead of by offset, and `page` is ignored.
+    Without include_total the count is skipped and total/pages are None;
+    with estimate_total an unfiltered listing reports the planner estimate.
     """
     # Calculate offset for pagination
     offset = (page - 1) * size
@@ -59,8 +67,8 @@ def get_all_projects(
             Project.title.contains(search) | Project.description.contains(search)
         )
     
-    total = db.exec(total_query).first() or 0
-    total_pages = ceil(total / size)
+    filters = {"status": status, "scope": scope, "community_id": community_id, "creator_id": creator_id, "search": search}
+    total = list_total(db, "project", filters, total_query, include_total, estimate_total)
 
     # Main query to get the projects
     projects_query = select(Project).where(Project.id > 0)
@@ -83,16 +91,19 @@ def get_all_projects(
         )
     
     # Add sorting and pagination
-    projects_query = projects_query.order_by(Project.created_at.desc()).offset(offset).limit(size)
+    projects_query = keyset_paginate(projects_query, PROJECT_SORT_KEY, cursor, size)
+    if not cursor:
+        projects_query = projects_query.offset(offset)
     
-    projects = db.exec(projects_query).all()
+    projects, next_cursor = page_with_cursor(db.exec(projects_query).all(), PROJECT_SORT_KEY, size)
     
     return {
         "items": [enrich_project(db, project) for project in projects],
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
 def get_project_by_filters(
@@ -108,10 +119,14 @@ def get_project_by_filters(
     search = None,
     current_user_id = None,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
     """
     Retrieves projects with specific geographic filters (country, region, etc.)
+    See get_all_projects for the cursor and the total flags.
     """
     # Calculate offset for pagination
     offset = (page - 1) * size
@@ -168,35 +183,32 @@ def get_project_by_filters(
             count_query = count_query.join(ProjectCommunityLink).where(ProjectCommunityLink.community_id == locality.community.id)
     
     # Execute count query
-    total = db.exec(count_query).first() or 0
-    total_pages = ceil(total / size)
+    filters = {
+        "status": status, "scope": scope, "community_id": community_id, "country_code": country_code,
+        "region_id": region_id, "subregion_id": subregion_id, "locality_id": locality_id,
+        "creator_id": creator_id, "search": search,
+    }
+    total = list_total(db, "project", filters, count_query, include_total, estimate_total)
     
     # Finalize and execute main query
-    projects_query = base_query.order_by(Project.created_at.desc()).offset(offset).limit(size)
-    projects = db.exec(projects_query).all()
+    projects_query = keyset_paginate(base_query, PROJECT_SORT_KEY, cursor, size)
+    if not cursor:
+        projects_query = projects_query.offset(offset)
+    projects, next_cursor = page_with_cursor(db.exec(projects_query).all(), PROJECT_SORT_KEY, size)
     
     return {
         "items": [enrich_project(db, project) for project in projects],
         "total": total,
         "page": page,
         "size": size,
-        "pages": total_pages
+        "pages": page_count(total, size),
+        "next_cursor": next_cursor
     }
 
 def create_project(db: Session, project_data: ProjectCreate, user_id: int) -> Project:
     """
     Creates a new project with its steps and resources
     """
-    # Generate unique slug
-    slug = create_slug(project_data.title)
-    
-    # Check if the slug already exists
-    existing = db.exec(select(Project).where(Project.slug == slug)).first()
-    if existing:
-        # Add random suffix if the slug already exists
-        random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
-        slug = f"{slug}-{random_suffix}"
-    
     # Create project
     new_project = Project(
         title=project_data.title,
@@ -205,13 +217,12 @@ def create_project(db: Session, project_data: ProjectCreate, user_id: int) -> Pr
         goal_amount=project_data.goal_amount,
         current_amount=0.0,
         scope=project_data.scope,
-        slug=slug,
         creator_id=user_id,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    db.add(new_project)
-    db.flush()  # Get generated ID
+    # Flushed with a unique slug, which also gets the generated ID
+    add_with_unique_slug(db, new_project, create_slug(project_data.title), max_length=100)
     
     # Add communities based on the project's scope
     if project_data.scope == "INTERNATIONAL" and project_data.country_codes:
@@ -270,6 +281,7 @@ def create_project(db: Session, project_data: ProjectCreate, user_id: int) -> Pr
             db.add(new_resource)
     
     db.commit()
+    list_totals.invalidate("project")
     db.refresh(new_project)
     
     return enrich_project(db, new_project)
@@ -326,6 +338,8 @@ def update_project(db: Session, project_id: int, project_data: ProjectUpdate) ->
     
     db.add(project)
     db.commit()
+    # Status, scope, communities and texts are listing filters
+    list_totals.invalidate("project")
     db.refresh(project)
     
     return enrich_project(db, project)
@@ -343,6 +357,7 @@ def delete_project(db: Session, project_id: int) -> None:
     
     db.delete(project)
     db.commit()
+    list_totals.invalidate("project")
 
 def add_project_commitment(db: Session, project_id: int, user_id: int, commitment_data: ProjectCommitmentCreate):
     """
@@ -1,6 +1,7 @@
 from enum import Enum
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index
 from typing import Optional
 from api.public.tag.models import Tag
 from api.public.user.models import User
@@ -34,6 +35,11 @@ class ProjectBase(SQLModel):
     scope: str = Field(max_length=100, nullable=True, description="Scope: 'LOCAL', 'REGIONAL', etc.")
 
 class Project(ProjectBase, table=True):
+    # Keyset pagination of the listings (newest first)
+    __table_args__ = (
+        Index("ix_project_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     slug: str = Field(max_length=100, index=True, unique=True, description="Unique readable identifier")
     creator_id: int = Field(foreign_key="users.id", description="Creator user ID")
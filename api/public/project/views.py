@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session, select
 from datetime import datetime
 from typing import Optional
-from api.database import get_session
-from api.auth.dependencies import get_current_user, get_current_user_optional
+from api.database import get_routing_session, get_async_routing_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from api.auth.dependencies import get_current_user, get_current_user_optional, get_current_user_optional_async
 from api.public.user.models import User, UserRole
 from api.public.project.models import (
-    ProjectCreate, ProjectRead, ProjectUpdate, 
+    Project, ProjectCreate, ProjectRead, ProjectUpdate, 
     ProjectStatus, ProjectCommitmentCreate,
     ProjectDonationCreate, ProjectComment, ProjectCommentCreate, ProjectCommentRead
 )
@@ -16,14 +17,15 @@ from api.public.project.crud import (
     add_project_donation, get_project_by_filters
 )
 from api.utils.slug import create_slug
-from api.public.user.models import UserCommunityLink
+from api.utils.view_counter import view_counter
+from api.public.community.crud import is_member_of_item_communities
 from api.public.project.models import ProjectCommunityLink
 from api.utils.shared_models import UserMinimal
 
 router = APIRouter()
 
 @router.get("/")
-def read_projects(
+async def read_projects(
     status: Optional[ProjectStatus] = None,
     scope: Optional[str] = None,
     community_id: Optional[int] = None,
@@ -35,8 +37,11 @@ def read_projects(
     search: Optional[str] = None,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Items per page"),
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(default=True, description="Count the matching projects (total and pages)"),
+    estimate_total: bool = Query(default=False, description="Use the database's row estimate for unfiltered listings"),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncSession = Depends(get_async_routing_session)
 ):
     """
     Get projects with optional filters and pagination.
@@ -51,10 +56,13 @@ def read_projects(
     - search: Search by text in title or description
     - page: Page number (default: 1)
     - size: Items per page (default: 10, max: 100)
+    - cursor: Opaque cursor from a previous response's next_cursor; faster than page on deep pages
+    - include_total: Set to false to skip counting; total and pages are then null
+    - estimate_total: Approximate total (PostgreSQL planner estimate) when no filter is applied
     """
     if any([country_code, region_id, subregion_id, locality_id]):
-        return get_project_by_filters(
-            db,
+        return await db.run_sync(
+            get_project_by_filters,
             status=status,
             scope=scope,
             community_id=community_id,
@@ -66,11 +74,14 @@ def read_projects(
             search=search,
             current_user_id=current_user.id if current_user else None,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            include_total=include_total,
+            estimate_total=estimate_total
         )
     
-    return get_all_projects(
-        db, 
+    return await db.run_sync(
+        get_all_projects,
         status=status,
         scope=scope,
         community_id=community_id,
@@ -78,14 +89,17 @@ def read_projects(
         search=search,
         current_user_id=current_user.id if current_user else None,
         page=page,
-        size=size
+        size=size,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total
     )
 
 @router.post("/", response_model=ProjectRead, status_code=status.HTTP_201_CREATED)
 def create_new_project(
     project_data: ProjectCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Create a new project.
@@ -97,7 +111,7 @@ def create_new_project(
 def get_project(
     project_id_or_slug: str,
     current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get a specific project by ID or slug.
@@ -105,11 +119,8 @@ def get_project(
     """
     project = get_project_by_id_or_slug(db, project_id_or_slug)
     
-    # Increment view counter
-    project.views_count += 1
-    db.add(project)
-    db.commit()
-    db.refresh(project)
+    # Count the view; it is written in the background
+    view_counter.add(Project, project.id)
     
     return project
 
@@ -118,7 +129,7 @@ def update_project_details(
     project_id: int,
     project_data: ProjectUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Update an existing project.
@@ -139,7 +150,7 @@ def update_project_details(
 def delete_project_endpoint(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Delete a project.
@@ -161,7 +172,7 @@ def add_commitment(
     project_id: int,
     commitment_data: ProjectCommitmentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Add a commitment to a project.
@@ -170,19 +181,7 @@ def add_commitment(
     project = get_project_by_id_or_slug(db, str(project_id))
     
     # Verify that the user is a member of at least one of the project's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    project_communities = db.exec(
-        select(ProjectCommunityLink.community_id)
-        .where(ProjectCommunityLink.project_id == project_id)
-    ).all()
-    project_community_ids = set(pc.community_id for pc in project_communities)
-    
-    if not user_community_ids.intersection(project_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, ProjectCommunityLink.project_id, project_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to commit to this project"
@@ -202,7 +201,7 @@ def add_donation(
     project_id: int,
     donation_data: ProjectDonationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Add a donation to a project.
@@ -211,19 +210,7 @@ def add_donation(
     project = get_project_by_id_or_slug(db, str(project_id))
     
     # Verify that the user is a member of at least one of the project's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    project_communities = db.exec(
-        select(ProjectCommunityLink.community_id)
-        .where(ProjectCommunityLink.project_id == project_id)
-    ).all()
-    project_community_ids = set(pc.community_id for pc in project_communities)
-    
-    if not user_community_ids.intersection(project_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, ProjectCommunityLink.project_id, project_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to donate to this project"
@@ -243,7 +230,7 @@ def add_project_comment(
     project_id: int,
     comment_data: ProjectCommentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Add a comment to a project.
@@ -252,19 +239,7 @@ def add_project_comment(
     project = get_project_by_id_or_slug(db, str(project_id))
     
     # Verify that the user is a member of at least one of the project's communities
-    user_communities = db.exec(
-        select(UserCommunityLink.community_id)
-        .where(UserCommunityLink.user_id == current_user.id)
-    ).all()
-    user_community_ids = set(uc.community_id for uc in user_communities)
-    
-    project_communities = db.exec(
-        select(ProjectCommunityLink.community_id)
-        .where(ProjectCommunityLink.project_id == project_id)
-    ).all()
-    project_community_ids = set(pc.community_id for pc in project_communities)
-    
-    if not user_community_ids.intersection(project_community_ids):
+    if not is_member_of_item_communities(db, current_user.id, ProjectCommunityLink.project_id, project_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of the community to comment on this project"
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from typing import Optional
 
-from api.database import get_session
+from api.database import get_routing_session
 from api.public.region.models import Region
 from api.public.subregion.models import Subregion
 
@@ -12,7 +12,7 @@ router = APIRouter()
 def get_region_subregions(
     region_id: int,
     name: Optional[str] = None,
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Retrieves all subregions of a specific region using its ID.
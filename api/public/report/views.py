@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session
 
 from api.auth.dependencies import get_current_user
-from api.database import get_session
+from api.database import get_routing_session
 from .models import ReportCreate, ReportResponse, ReportStatus
 from .crud import (
     create_report,
@@ -19,7 +19,7 @@ router = APIRouter()
 @router.post("/", response_model=ReportResponse, status_code=201)
 def create_new_report(
     report_data: ReportCreate,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_routing_session),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new report"""
@@ -37,7 +37,7 @@ def read_reports(
     skip: int = 0,
     limit: int = 100,
     status: ReportStatus = None,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_routing_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of reports (only for administrators and moderators)"""
@@ -54,7 +54,7 @@ def read_reports(
 @router.get("/{report_id}", response_model=ReportResponse)
 def read_report(
     report_id: int,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_routing_session),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific report (only for administrators and moderators)"""
@@ -77,7 +77,7 @@ def update_status(
     report_id: int,
     status: ReportStatus,
     notes: str = None,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_routing_session),
     current_user: User = Depends(get_current_user)
 ):
     """Update the status of a report (only for administrators and moderators)"""
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 
-from api.database import get_session
+from api.database import get_routing_session
 from api.public.subregion.models import Subregion
 from api.public.locality.models import Locality
 router = APIRouter()
@@ -9,7 +9,7 @@ router = APIRouter()
 @router.get("/{subregion_id}/localities", response_model=list[Subregion])
 def get_divisions_by_region(
     subregion_id: int,
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Retrieves all divisions of a specific subnation by its ID
@@ -1,6 +1,13 @@
 from sqlmodel import Session, select
-from typing import Optional
+from typing import Iterable, Optional
+from api.config import settings
+from api.database import dialect_insert
 from api.public.tag.models import Tag
+from api.utils.cache import TTLCache
+
+# Tag name -> ID. Only IDs of tags committed by other transactions are
+# cached, so a rolled back creation never leaves a dangling ID behind
+tag_ids = TTLCache(maxsize=settings.TAG_CACHE_SIZE, ttl=settings.TAG_CACHE_TTL)
 
 def get_tag_by_name(session: Session, name: str) -> Optional[Tag]:
     """
@@ -32,6 +39,44 @@ def create_tag(session: Session, name: str) -> Tag:
     session.refresh(tag)
     return tag
 
+def get_or_create_tags(session: Session, names: Iterable[str]) -> dict[str, int]:
+    """
+    Gets the IDs of tags by name, creating the missing ones.
+
+    Names not in the cache are inserted with one
+    `INSERT ... ON CONFLICT (name) DO NOTHING RETURNING`; the IDs of the
+    names that already existed (or that a concurrent request has just
+    created) are then read with one SELECT. New tags are part of the
+    caller's transaction, which must commit them.
+
+    Args:
+        session: Database session
+        names: Tag names (duplicates are ignored)
+
+    Returns:
+        Dictionary of tag IDs by name, in the order of the names
+    """
+    names = list(dict.fromkeys(names))
+    found = {name: tag_ids.get(name) for name in names}
+    missing = [name for name, tag_id in found.items() if tag_id is None]
+    if missing:
+        # Rows are inserted in name order, so concurrent requests creating
+        # overlapping tags lock the unique index entries in the same order
+        # instead of deadlocking
+        inserted = dict(session.execute(
+            dialect_insert(session, Tag)
+            .values([{"name": name} for name in sorted(missing)])
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(Tag.name, Tag.id)
+        ).all())
+        existing = [name for name in missing if name not in inserted]
+        if existing:
+            for name, tag_id in session.exec(select(Tag.name, Tag.id).where(Tag.name.in_(existing))).all():
+                inserted[name] = tag_id
+                tag_ids.set(name, tag_id)
+        found.update(inserted)
+    return found
+
 def get_all_tags(session: Session, skip: int = 0, limit: int = 100) -> list[Tag]:
     """
     Get all tags with pagination
@@ -56,5 +101,7 @@ def delete_tag(session: Session, tag_id: int) -> None:
     """
     tag = session.get(Tag, tag_id)
     if tag:
+        name = tag.name
         session.delete(tag)
-        session.commit() 
\ No newline at end of file
+        session.commit()
+        tag_ids.delete(name) 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session
 
-from api.database import get_session
+from api.database import get_routing_session
 from api.public.tag.models import TagRead
 from api.public.tag.crud import get_all_tags
 
@@ -11,7 +11,7 @@ router = APIRouter()
 async def read_tags(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_routing_session)
 ):
     """
     Retrieves a paginated list of all tags
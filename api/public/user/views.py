@@ -3,8 +3,8 @@ from sqlmodel import Session, select, func
 from typing import Optional
 import re
 import random
-from api.database import get_session
-from api.auth.dependencies import get_current_user, get_current_user_optional
+from api.database import get_routing_session
+from api.auth.dependencies import get_current_user, get_current_user_optional, invalidate_cached_user
 from api.public.user.models import User, UserFollowLink, UserUpdateSchema, UsernameUpdateSchema, GenerateUsernameSchema
 from api.public.community.models import Community
 from api.utils.generic_models import UserFollowLink, UserCommunityLink
@@ -12,6 +12,7 @@ from api.utils.generic_models import UserFollowLink, UserCommunityLink
 # Imports for activity statistics
 from api.public.debate.models import Debate, Opinion, PointOfView
 from api.public.poll.models import Poll, PollVote
+from api.public.poll.crud import move_member_community_tallies
 from api.public.project.models import Project, ProjectCommitment, ProjectDonation
 from api.public.issue.models import Issue, IssueSupport, IssueComment
 
@@ -20,7 +21,7 @@ router = APIRouter()
 @router.get("/me")
 def read_me(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get information about the currently authenticated user.
@@ -59,7 +60,7 @@ def read_me(
 def get_user_profile(
     username: str = Path(..., description="Username to query"),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Get information about a user profile by username.
@@ -226,7 +227,7 @@ def get_user_profile(
 def follow_user(
     username: str = Path(..., description="Username to follow"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Follow a user. Authentication required.
@@ -268,7 +269,7 @@ def follow_user(
 def unfollow_user(
     username: str = Path(..., description="Username to unfollow"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Unfollow a user. Authentication required.
@@ -309,7 +310,7 @@ def unfollow_user(
 def update_profile(
     update_data: UserUpdateSchema,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Update the authenticated user's profile data. Authentication required.
@@ -331,13 +332,17 @@ def update_profile(
     db.commit()
     db.refresh(user)
     
+    # The email may have changed, so drop both cache entries
+    invalidate_cached_user(current_user.email)
+    invalidate_cached_user(user.email)
+    
     return user
 
 @router.post("/generate-username", status_code=status.HTTP_200_OK)
 def generate_and_update_username(
     data: GenerateUsernameSchema,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Generate and update the username for the authenticated user.
@@ -382,6 +387,7 @@ def generate_and_update_username(
             db.add(user)
             db.commit()
             db.refresh(user)
+            invalidate_cached_user(user.email)
             
             # Check if the user is already a member of the global community (ID 1)
             # And add them if not
@@ -421,6 +427,7 @@ def generate_and_update_username(
         db.add(user)
         db.commit()
         db.refresh(user)
+        invalidate_cached_user(user.email)
         
         # Add user to the global community (ID 1)
         _add_user_to_global_community(db, current_user.id)
@@ -452,6 +459,7 @@ def generate_and_update_username(
             db.add(user)
             db.commit()
             db.refresh(user)
+            invalidate_cached_user(user.email)
             
             # Add user to the global community (ID 1)
             _add_user_to_global_community(db, current_user.id)
@@ -488,13 +496,14 @@ def _add_user_to_global_community(db: Session, user_id: int):
                 is_public=False  # By default, the user is private in the community
             )
             db.add(new_membership)
+            move_member_community_tallies(db, user_id, 1, 1)
             db.commit()
 
 @router.patch("/me/username", status_code=status.HTTP_200_OK)
 def update_username(
     update_data: UsernameUpdateSchema,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Update the username. Authentication required.
@@ -526,6 +535,7 @@ def update_username(
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user.email)
     
     return user
 
@@ -534,7 +544,7 @@ def update_community_visibility(
     community_id: int,
     is_public: bool = Body(..., embed=True),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_routing_session)
 ):
     """
     Update the user's visibility in a specific community.
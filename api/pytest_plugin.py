@@ -0,0 +1,37 @@
+"""
+Pytest helpers for keeping per-endpoint SQL statement counts in check.
+
+Enable them from a conftest.py:
+
+    pytest_plugins = ["api.pytest_plugin"]
+
+and use the fixture:
+
+    def test_list_polls(client, query_budget):
+        with query_budget(max_statements=10, max_repeats=1):
+            client.get("/api/v1/polls/")
+
+or the decorator from api.utils.query_counter:
+
+    @max_queries(10, max_repeats=1)
+    def test_list_polls(client):
+        client.get("/api/v1/polls/")
+"""
+from contextlib import contextmanager
+from typing import Optional
+import pytest
+from api.utils.query_counter import assert_max_queries, count_queries
+
+@pytest.fixture
+def query_budget():
+    """
+    Returns a context manager that fails the test when the statements
+    executed inside it exceed the given budgets.
+    """
+    @contextmanager
+    def budget(max_statements: Optional[int] = None, max_repeats: Optional[int] = None):
+        with count_queries(all_threads=True) as counter:
+            yield counter
+        assert_max_queries(counter, max_statements, max_repeats)
+
+    return budget
@@ -24,7 +24,7 @@ class DebateTagLink(SQLModel, table=True):
     )
 class PollCommunityLink(SQLModel, table=True):
     poll_id: int = Field(foreign_key="poll.id", primary_key=True)
-    community_id: int = Field(foreign_key="community.id", primary_key=True)
+    community_id: int = Field(foreign_key="community.id", primary_key=True, index=True)
 
 class DebateCommunityLink(SQLModel, table=True):
     debate_id: Optional[int] = Field(
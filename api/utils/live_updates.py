@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import threading
+import asyncpg
+from typing import Callable, Optional
+from anyio import to_thread
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlmodel import Session
+
+logger = logging.getLogger("live_updates")
+
+class Topic:
+    """Latest payload of one key and the subscribers waiting for the next one"""
+
+    __slots__ = ("payload", "sequence", "changed", "subscribers", "loading")
+
+    def __init__(self):
+        self.payload: Optional[dict] = None
+        self.sequence = 0
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        # Load of the first payload shared by the subscribers waiting for it
+        self.loading: Optional[asyncio.Future] = None
+
+class Broker:
+    """
+    In-process pub/sub of coalesced updates, one topic per key (a poll ID).
+
+    Writers only mark a key as changed (`mark_changed`, thread-safe). Every
+    `interval` seconds `run` reloads the changed keys that have subscribers
+    in this process, with a single call to `loader`, and wakes their
+    subscribers, so each key is pushed at most once per interval whatever
+    the write rate. Subscribers share the topic's payload; a slow
+    subscriber skips intermediate payloads and gets the latest one, and a
+    new subscriber starts from it (`latest`) without loading it again.
+    """
+
+    def __init__(self, loader: Callable[[list[int]], dict[int, dict]]):
+        """
+        Args:
+            loader: Loads the current payload of several keys (sync; run in
+                a worker thread). Keys missing from its result are skipped.
+        """
+        self._loader = loader
+        self._topics: dict[int, Topic] = {}
+        self._changed: set[int] = set()
+        self._lock = threading.Lock()
+
+    def mark_changed(self, key: int) -> None:
+        """Schedules a push of `key` on the next tick; callable from any thread"""
+        with self._lock:
+            self._changed.add(key)
+
+    def subscribers(self, key: int) -> int:
+        topic = self._topics.get(key)
+        return topic.subscribers if topic else 0
+
+    async def load(self, key: int) -> Optional[dict]:
+        """Current payload of a key, straight from the loader"""
+        payloads = await to_thread.run_sync(self._loader, [key])
+        return payloads.get(key)
+
+    async def latest(self, key: int) -> Optional[dict]:
+        """
+        Latest payload of a subscribed key: the last one pushed, or, until
+        the first push, a single load shared by every caller and kept as the
+        topic's payload. Subscribe first, so no later change is missed.
+        """
+        topic = self._topics.get(key)
+        if topic is None:
+            return await self.load(key)
+        if topic.payload is not None:
+            return topic.payload
+        if topic.loading is None:
+            topic.loading = asyncio.ensure_future(self.load(key))
+            topic.loading.add_done_callback(lambda future: self._loaded(topic, future))
+        # A disconnecting caller must not cancel the load of the others
+        return await asyncio.shield(topic.loading)
+
+    def _loaded(self, topic: Topic, future: asyncio.Future) -> None:
+        topic.loading = None
+        # A payload pushed meanwhile is at least as recent
+        if not future.cancelled() and future.exception() is None and topic.payload is None:
+            topic.payload = future.result()
+
+    def subscribe(self, key: int, heartbeat: Optional[float] = None) -> "Subscription":
+        """
+        Registers a subscriber of `key`. Payloads pushed from now on are
+        delivered by iterating the subscription, which must be closed.
+        """
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = Topic()
+        topic.subscribers += 1
+        return Subscription(self, key, topic, heartbeat)
+
+    def _unsubscribe(self, key: int, topic: Topic) -> None:
+        topic.subscribers -= 1
+        if topic.subscribers == 0 and self._topics.get(key) is topic:
+            del self._topics[key]
+
+    def push(self, key: int, payload: dict) -> None:
+        """Hands a payload to the subscribers of `key` (event loop thread only)"""
+        topic = self._topics.get(key)
+        if topic is None:
+            return
+        topic.payload = payload
+        topic.sequence += 1
+        changed, topic.changed = topic.changed, asyncio.Event()
+        changed.set()
+
+    async def tick(self) -> int:
+        """
+        Reloads and pushes the keys changed since the last tick.
+
+        Returns:
+            Number of keys pushed
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        keys = [key for key in changed if key in self._topics]
+        if not keys:
+            return 0
+        payloads = await to_thread.run_sync(self._loader, keys)
+        for key, payload in payloads.items():
+            self.push(key, payload)
+        return len(payloads)
+
+    async def run(self, interval: float):
+        """Pushes the changed keys every `interval` seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Could not push live updates")
+
+class Subscription:
+    """
+    Async iterator over the payloads pushed for one key. Yields None when
+    nothing was pushed for `heartbeat` seconds, so the caller can keep the
+    connection alive (and notice disconnected clients).
+    """
+
+    __slots__ = ("_broker", "_key", "_topic", "_heartbeat", "_seen", "_closed")
+
+    def __init__(self, broker: Broker, key: int, topic: Topic, heartbeat: Optional[float]):
+        self._broker = broker
+        self._key = key
+        self._topic = topic
+        self._heartbeat = heartbeat
+        self._seen = topic.sequence
+        self._closed = False
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Optional[dict]:
+        if self._closed:
+            raise StopAsyncIteration
+        topic = self._topic
+        changed = topic.changed
+        if topic.sequence == self._seen:
+            try:
+                async with asyncio.timeout(self._heartbeat):
+                    await changed.wait()
+            except TimeoutError:
+                return None
+        self._seen = topic.sequence
+        return topic.payload
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._broker._unsubscribe(self._key, self._topic)
+
+class LocalBroadcaster:
+    """
+    Delivers changes to the broker of this process only (single worker).
+    """
+
+    def __init__(self, broker: Broker):
+        self.broker = broker
+        # Session.info entry holding the keys published in the session's
+        # current transaction
+        self._pending = ("live_updates", id(self))
+
+    def publish(self, db: Session, key: int) -> None:
+        """
+        Announces a change of `key` made in the session's transaction; it is
+        delivered once the transaction commits, and dropped if it rolls back
+        or the session is closed without committing.
+        """
+        pending = db.info.get(self._pending)
+        if pending is None:
+            pending = db.info[self._pending] = set()
+            event.listen(db, "after_commit", self._deliver)
+            event.listen(db, "after_transaction_end", self._discard)
+        pending.add(key)
+
+    def _deliver(self, session: Session) -> None:
+        pending = session.info[self._pending]
+        for key in pending:
+            self.broker.mark_changed(key)
+        pending.clear()
+
+    def _discard(self, session: Session, transaction) -> None:
+        # Runs after _deliver on commit; only the outermost transaction
+        # ends the keys' lifetime (a savepoint rollback keeps them)
+        if transaction.parent is None:
+            session.info[self._pending].clear()
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+class PostgresBroadcaster(LocalBroadcaster):
+    """
+    Delivers changes to the brokers of every worker through PostgreSQL
+    LISTEN/NOTIFY. The NOTIFY is part of the writer's transaction, so it is
+    only sent if the transaction commits; each worker keeps one dedicated
+    asyncpg connection listening on the channel.
+    """
+
+    def __init__(self, broker: Broker, database_url: str, channel: str):
+        super().__init__(broker)
+        url = make_url(database_url).set(drivername="postgresql")
+        self._dsn = url.render_as_string(hide_password=False)
+        self.channel = channel
+        self._connection = None
+
+    def publish(self, db: Session, key: int) -> None:
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": str(key)})
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            self.broker.mark_changed(int(payload))
+        except ValueError:
+            logger.warning(f"Ignoring malformed notification on {channel}: {payload!r}")
+
+    async def start(self) -> None:
+        self._connection = await asyncpg.connect(self._dsn)
+        await self._connection.add_listener(self.channel, self._on_notification)
+
+    async def stop(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+def build_broadcaster(kind: str, broker: Broker, database_url: str, channel: str) -> LocalBroadcaster:
+    """
+    Builds the broadcaster selected by LIVE_UPDATES_BROADCASTER.
+
+    Args:
+        kind: "local" (single worker) or "postgres" (LISTEN/NOTIFY)
+        broker: Broker of this process
+        database_url: Primary database URL (used by "postgres")
+        channel: NOTIFY channel (used by "postgres")
+    """
+    if kind == "local":
+        return LocalBroadcaster(broker)
+    if kind == "postgres":
+        return PostgresBroadcaster(broker, database_url, channel)
+    raise ValueError(f"Unknown live updates broadcaster: {kind}")
@@ -1,5 +1,16 @@
-from typing import TypeVar, Any
+import json
+import base64
+import binascii
+import threading
+from math import ceil
+from datetime import datetime
+from typing import TypeVar, Any, Callable, Optional
+from fastapi import HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy import Select, text, tuple_
+from sqlmodel import Session
+from api.config import settings
+from api.utils.cache import TTLCache
 
 T = TypeVar('T')
 
@@ -21,5 +32,195 @@ class PaginatedResponse(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
+def encode_cursor(*values: Any) -> str:
+    """
+    Builds an opaque keyset cursor from the sort key of the last item of a page.
+
+    Args:
+        *values: Sort key values, e.g. (created_at, id)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, types: list[type]) -> tuple:
+    """
+    Decodes a cursor built by encode_cursor.
+
+    Args:
+        cursor: Cursor received from the client
+        types: Python type of each sort key value
+
+    Returns:
+        Sort key values
+
+    Raises:
+        HTTPException: 400 when the cursor is malformed
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Wrong number of values")
+        return tuple(
+            datetime.fromisoformat(value) if type_ is datetime else type_(value)
+            for value, type_ in zip(values, types)
+        )
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def _python_type(column) -> type:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        # SQLModel's AutoString does not declare one
+        return str
+
+def keyset_paginate(query: Select, columns: list, cursor: Optional[str], size: int, descending: bool = True) -> Select:
+    """
+    Orders a query by `columns` and limits it to one page (plus one row, used
+    by page_with_cursor to detect the next page). With a cursor, only rows
+    after it are returned, using a row-value comparison that is served by a
+    composite index on the same columns.
+
+    Args:
+        query: Query to paginate
+        columns: Sort key, unique as a whole (e.g. [Poll.created_at, Poll.id])
+        cursor: Cursor of the previous page, if any
+        size: Page size
+        descending: Sort direction
+
+    Returns:
+        Paginated query; apply an offset to it for page-number pagination
+    """
+    if cursor:
+        values = decode_cursor(cursor, [_python_type(column) for column in columns])
+        key = tuple_(*columns)
+        after = tuple_(*values, types=[column.type for column in columns])
+        query = query.where(key < after if descending else key > after)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(size + 1)
+
+def page_with_cursor(rows: list, columns: list, size: int, key: Callable[[Any], Any] = lambda row: row) -> tuple[list, Optional[str]]:
+    """
+    Trims the extra row fetched by keyset_paginate and builds the cursor of
+    the next page.
+
+    Args:
+        rows: Rows returned by the paginated query
+        columns: Sort key given to keyset_paginate
+        size: Page size
+        key: Extracts the model instance from a row (for multi-entity selects)
 
+    Returns:
+        The page rows and the next cursor (None on the last page)
+    """
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = key(rows[-1])
+    return rows, encode_cursor(*(getattr(last, column.key) for column in columns))
+
+class ListTotals:
+    """
+    Cache of listing totals keyed by resource and normalized filter set.
+
+    Any write that can change which rows a listing holds (creating,
+    deleting or soft-deleting a row, or changing a filtered field such as
+    its status) invalidates all of the resource's totals in this process by
+    bumping the resource's generation (older entries are
+    simply never read again). Other workers see the change once their
+    entries expire, after LIST_TOTAL_CACHE_TTL seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, resource: str, filters: dict) -> tuple:
+        normalized = tuple(sorted(
+            (name, str(value)) for name, value in filters.items() if value is not None
+        ))
+        with self._lock:
+            return (resource, self._generations.get(resource, 0), normalized)
+
+    def get_or_count(self, db: Session, resource: str, filters: dict, count_query: Select) -> int:
+        """
+        Returns the cached total for the filters, running `count_query` on a miss.
+        """
+        key = self._key(resource, filters)
+        total = self._cache.get(key)
+        if total is None:
+            total = db.exec(count_query).first() or 0
+            self._cache.set(key, total)
+        return total
+
+    def invalidate(self, resource: str) -> None:
+        """Drops every cached total of a resource (call after any write changing list membership)"""
+        with self._lock:
+            self._generations[resource] = self._generations.get(resource, 0) + 1
+
+list_totals = ListTotals(maxsize=settings.LIST_TOTAL_CACHE_SIZE, ttl=settings.LIST_TOTAL_CACHE_TTL)
+
+def estimated_row_count(db: Session, table: str) -> Optional[int]:
+    """
+    Row count of a table as estimated by the PostgreSQL planner (pg_class.reltuples,
+    refreshed by ANALYZE/autovacuum).
+
+    Returns:
+        The estimate, or None on other databases or for never analyzed tables
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    estimate = db.exec(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        params={"table": table},
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return estimate
+
+def list_total(
+    db: Session,
+    resource: str,
+    filters: dict,
+    count_query: Select,
+    include_total: bool = True,
+    estimate_total: bool = False,
+) -> Optional[int]:
+    """
+    Total number of items of a listing.
+
+    Args:
+        db: Database session
+        resource: Table listed (also the cache namespace), e.g. "poll"
+        filters: Filters applied to the listing; None values are ignored
+        count_query: Exact count query, only run on a cache miss
+        include_total: When False the count is skipped and None returned
+        estimate_total: Use the planner estimate for unfiltered listings
+            (PostgreSQL only; falls back to the exact, cached count)
+
+    Returns:
+        The total, or None when not requested
+    """
+    if not include_total:
+        return None
+    if estimate_total and all(value is None for value in filters.values()):
+        estimate = estimated_row_count(db, resource)
+        if estimate is not None:
+            return estimate
+    return list_totals.get_or_count(db, resource, filters, count_query)
 
+def page_count(total: Optional[int], size: int) -> Optional[int]:
+    """Number of pages for a total (None when the total was not computed)"""
+    if total is None:
+        return None
+    return ceil(total / size)
@@ -0,0 +1,175 @@
+import re
+import logging
+import threading
+import functools
+import inspect
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from api.config import settings
+
+logger = logging.getLogger("query_counter")
+
+# Literals and placeholder lists that vary between otherwise identical statements
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\([^)]*\)s|\$\d+|:\w+|\?|%s")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """
+    Returns the shape of a SQL statement: literals and bind parameters are
+    replaced by `?` and IN lists are collapsed, so the same query issued in a
+    loop always yields the same fingerprint.
+
+    Args:
+        statement: SQL statement as sent to the driver
+
+    Returns:
+        Normalized statement
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+class QueryCounter:
+    """
+    Statements executed within a scope (usually one request), grouped by shape.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str) -> None:
+        self.statements += 1
+        self.shapes[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Shapes executed more than `threshold` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def over_budget(self, max_statements: Optional[int] = None, max_repeats: Optional[int] = None) -> list[str]:
+        """
+        Describes every budget this counter exceeds.
+
+        Args:
+            max_statements: Maximum number of statements
+            max_repeats: Maximum executions of a single statement shape
+
+        Returns:
+            One message per exceeded budget (empty when within budget)
+        """
+        problems = []
+        if max_statements is not None and self.statements > max_statements:
+            problems.append(f"{self.statements} statements (budget {max_statements})")
+        if max_repeats is not None:
+            for shape, count in self.repeated(max_repeats):
+                problems.append(f"{count}x repeated statement (budget {max_repeats}): {shape}")
+        return problems
+
+_current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+# Counters that see statements from every thread (used by tests, where the
+# app runs on the TestClient's portal thread)
+_global_counters: list[QueryCounter] = []
+_global_lock = threading.Lock()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.record(statement)
+    if _global_counters:
+        with _global_lock:
+            for global_counter in _global_counters:
+                global_counter.record(statement)
+
+def current_counter() -> Optional[QueryCounter]:
+    """The counter of the active scope, or None outside of one"""
+    return _current_counter.get()
+
+@contextmanager
+def count_queries(all_threads: bool = False):
+    """
+    Counts statements executed by any engine inside the block.
+    Threadpool workers started inside it run on a copy of the context and
+    report to the same counter.
+
+    Args:
+        all_threads: Also count statements issued by other threads while the block runs
+
+    Usage:
+        with count_queries() as counter:
+            ...
+        counter.statements
+    """
+    counter = QueryCounter()
+    if all_threads:
+        with _global_lock:
+            _global_counters.append(counter)
+        try:
+            yield counter
+        finally:
+            with _global_lock:
+                _global_counters.remove(counter)
+        return
+
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+def warn_if_over_budget(counter: QueryCounter, route: str) -> None:
+    """
+    Logs a warning in development when a request exceeds the statement budgets.
+    """
+    if settings.ENV != "development":
+        return
+    for problem in counter.over_budget(settings.SQL_STATEMENT_BUDGET, settings.SQL_REPEATED_STATEMENT_BUDGET):
+        logger.warning(f"Query budget exceeded on {route}: {problem}")
+
+def assert_max_queries(counter: QueryCounter, max_statements: Optional[int] = None, max_repeats: Optional[int] = None) -> None:
+    """
+    Raises AssertionError when the counter exceeds the given budgets.
+    """
+    problems = counter.over_budget(max_statements, max_repeats)
+    if problems:
+        raise AssertionError("Query budget exceeded:\n" + "\n".join(problems))
+
+def max_queries(max_statements: Optional[int] = None, max_repeats: Optional[int] = None):
+    """
+    Decorator failing a test (or any callable) that exceeds the statement budgets.
+    Statements from every thread are counted, so requests made through
+    TestClient are included.
+
+    Usage:
+        @max_queries(10, max_repeats=1)
+        def test_list_polls(client):
+            client.get("/api/v1/polls/")
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with count_queries(all_threads=True) as counter:
+                    result = await func(*args, **kwargs)
+                assert_max_queries(counter, max_statements, max_repeats)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with count_queries(all_threads=True) as counter:
+                result = func(*args, **kwargs)
+            assert_max_queries(counter, max_statements, max_repeats)
+            return result
+        return wrapper
+    return decorator
@@ -1,6 +1,15 @@
 import re
 import unicodedata
+from contextlib import nullcontext
 from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import or_
+from sqlmodel import Session, select
+
+# Room kept for a "-<n>" suffix when a slug is truncated to max_length
+SUFFIX_ROOM = 8
+# Base slugs looked up per query by allocate_slugs
+LIKE_BATCH_SIZE = 100
 
 def create_slug(text: str, max_length: Optional[int] = 100) -> str:
     """
@@ -40,3 +49,93 @@ def create_slug(text: str, max_length: Optional[int] = 100) -> str:
         text = "untitled"
     
     return text
+
+def with_suffix(base_slug: str, number: int, max_length: Optional[int]) -> str:
+    """`base_slug` with a "-<number>" suffix, shortened to fit max_length"""
+    suffix = f"-{number}"
+    if max_length and len(base_slug) + len(suffix) > max_length:
+        base_slug = base_slug[:max_length - len(suffix)].rstrip('-')
+    return f"{base_slug}{suffix}"
+
+def allocate_slugs(db: Session, model, base_slugs: list[str], max_length: Optional[int] = 100) -> list[str]:
+    """
+    Chooses free slugs for several new rows of `model`: each base slug
+    itself, otherwise the first free of base-1, base-2, ... Rows sharing a
+    base get consecutive suffixes. The slugs taken are fetched with one
+    `LIKE 'base%' OR ...` query per LIKE_BATCH_SIZE distinct bases.
+
+    Args:
+        db: Database session
+        model: Table model with a unique slug column (Poll, Debate, ...)
+        base_slugs: Slug to start from for each row (see create_slug)
+        max_length: Maximum length of the slug column
+
+    Returns:
+        One slug per base slug, in the same order, none of them used when
+        the queries ran; add_with_unique_slug handles rows inserted
+        concurrently
+    """
+    stems = sorted({
+        base_slug[:max_length - SUFFIX_ROOM] if max_length and len(base_slug) > max_length - SUFFIX_ROOM else base_slug
+        for base_slug in base_slugs
+    })
+    taken = set()
+    for start in range(0, len(stems), LIKE_BATCH_SIZE):
+        batch = stems[start:start + LIKE_BATCH_SIZE]
+        taken.update(db.exec(select(model.slug).where(or_(*(model.slug.like(f"{stem}%") for stem in batch)))).all())
+
+    slugs = []
+    next_number: dict[str, int] = {}
+    for base_slug in base_slugs:
+        number = next_number.get(base_slug, 0)
+        slug = with_suffix(base_slug, number, max_length) if number else base_slug
+        while slug in taken:
+            number += 1
+            slug = with_suffix(base_slug, number, max_length)
+        taken.add(slug)
+        next_number[base_slug] = number + 1
+        slugs.append(slug)
+    return slugs
+
+def allocate_slug(db: Session, model, base_slug: str, max_length: Optional[int] = 100) -> str:
+    """
+    Chooses a free slug for a new row of `model` (see allocate_slugs), with
+    a single `LIKE 'base%'` query.
+    """
+    return allocate_slugs(db, model, [base_slug], max_length)[0]
+
+def add_with_unique_slug(db: Session, instance, base_slug: str, max_length: Optional[int] = 100, attempts: int = 5):
+    """
+    Adds and flushes a new row with a unique slug (see allocate_slug).
+    On PostgreSQL the INSERT runs in a savepoint; if another transaction
+    took the slug in the meantime, the unique violation rolls back the
+    savepoint only and the next free slug is tried. SQLite runs one writer
+    at a time and its driver would commit the caller's transaction when
+    releasing the savepoint, so there the row is flushed directly.
+
+    Args:
+        db: Database session
+        instance: New row of a model with a unique slug column
+        base_slug: Slug to start from
+        max_length: Maximum length of the slug column
+        attempts: Slugs tried before the unique violation is raised
+
+    Returns:
+        The flushed instance
+    """
+    model = type(instance)
+    savepoints = db.get_bind().dialect.name == "postgresql"
+    for attempt in range(attempts):
+        instance.slug = allocate_slug(db, model, base_slug, max_length)
+        try:
+            with db.begin_nested() if savepoints else nullcontext():
+                db.add(instance)
+                db.flush()
+            return instance
+        except IntegrityError:
+            # Other unique or foreign key violations are not retried
+            if not savepoints or attempt == attempts - 1:
+                raise
+            taken = db.exec(select(model.slug).where(model.slug == instance.slug)).first()
+            if taken is None:
+                raise
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import threading
+from collections import Counter
+from anyio import to_thread
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("view_counter")
+
+# Rows per UPDATE statement
+FLUSH_BATCH_SIZE = 1000
+
+class ViewCounter:
+    """
+    Buffers views_count increments in memory, per (table, id), and writes
+    them in batches so detail GETs do not have to update the row they read.
+
+    Every process keeps its own buffer; increments are added to the stored
+    value, never overwritten, so several workers can flush concurrently.
+    Views buffered when a process dies without flushing are lost.
+    """
+
+    def __init__(self):
+        self._pending: Counter[tuple[str, int]] = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, model, id: int, count: int = 1) -> None:
+        """
+        Records views of a row
+
+        Args:
+            model: Table model with a views_count column (Poll, Debate, ...)
+            id: Primary key of the row
+            count: Number of views
+        """
+        with self._lock:
+            self._pending[(model.__table__.name, id)] += count
+
+    def pending(self, model, id: int) -> int:
+        """Views of a row recorded by this process and not flushed yet"""
+        with self._lock:
+            return self._pending.get((model.__table__.name, id), 0)
+
+    def flush(self, engine: Engine) -> int:
+        """
+        Writes the buffered views with one
+        `UPDATE ... FROM (VALUES ...)` per table and batch.
+        If the write fails the views are put back in the buffer.
+
+        Args:
+            engine: Engine of the primary database
+
+        Returns:
+            Number of rows updated
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        by_table: dict[str, list[tuple[int, int]]] = {}
+        for (table, id), count in pending.items():
+            by_table.setdefault(table, []).append((id, count))
+
+        try:
+            with engine.begin() as connection:
+                for table, rows in by_table.items():
+                    # Lock rows in a stable order so concurrent flushes cannot deadlock
+                    rows.sort()
+                    for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+                        batch = rows[start:start + FLUSH_BATCH_SIZE]
+                        values = ", ".join(
+                            f"(CAST(:id_{i} AS INTEGER), CAST(:count_{i} AS INTEGER))" for i in range(len(batch))
+                        )
+                        parameters = {}
+                        for i, (id, count) in enumerate(batch):
+                            parameters[f"id_{i}"] = id
+                            parameters[f"count_{i}"] = count
+                        connection.execute(text(
+                            f"UPDATE {table} SET views_count = {table}.views_count + pending.column2 "
+                            f"FROM (VALUES {values}) AS pending "
+                            f"WHERE {table}.id = pending.column1"
+                        ), parameters)
+        except Exception:
+            logger.exception(f"Could not flush {len(pending)} view counts; they will be retried")
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return len(pending)
+
+view_counter = ViewCounter()
+
+async def flush_views_periodically(engine: Engine, interval: float):
+    """Flushes the buffered view counts every `interval` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        await to_thread.run_sync(view_counter.flush, engine)
@@ -0,0 +1,116 @@
+"""
+Concurrency benchmark for the authentication dependencies.
+
+Drives GET /api/v1/polls/ in-process with N concurrent authenticated clients
+and reports latency percentiles for two modes:
+
+- blocking: the previous behaviour, where JWE decryption and the user query
+  run directly on the event loop on every request
+- offloaded: the current dependencies (token cache + threadpool offloading)
+
+A per-statement delay can be injected to emulate a remote Postgres round-trip
+when running against a local SQLite file.
+
+Usage:
+    python -m benchmarks.auth_concurrency [--clients 200] [--requests 5] [--db-latency-ms 5]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from jose import jwe
+from fastapi import Depends, Header
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, select
+from api.app import create_app
+from api.config import settings
+from api.database import engine, get_session
+from api.auth import dependencies
+from api.auth.dependencies import get_current_user_optional_async, token_cache, user_cache
+from api.public.user.models import User
+from benchmarks.common import make_token, summarize
+
+def seed_users(clients: int) -> list[str]:
+    """Create one user per client and return their session tokens"""
+    SQLModel.metadata.create_all(engine)
+    tokens = []
+    with Session(engine) as db:
+        for i in range(clients):
+            email = f"bench-{i}@geounity.org"
+            if not db.exec(select(User).where(User.email == email)).first():
+                db.add(User(email=email, username=f"bench_{i}"))
+            tokens.append(make_token(email))
+        db.commit()
+    return tokens
+
+async def blocking_get_current_user_optional(
+    authorization: str | None = Header(default=None),
+    db: Session = Depends(get_session)
+) -> User | None:
+    """
+    Previous dependency: decrypts and queries on the event loop, without
+    caching. Replaces get_current_user_optional_async, the dependency of
+    GET /polls/; the blocking query runs on a synchronous session.
+    """
+    if not authorization:
+        return None
+    token = authorization.split(" ")[1]
+    key = dependencies.get_derived_encryption_key.__wrapped__(dependencies.AUTHJS_SECRET, dependencies.AUTHJS_SALT)
+    token_data = json.loads(jwe.decrypt(token, key).decode("utf-8"))
+    return db.exec(select(User).where(User.email == token_data["email"])).first()
+
+async def run_mode(app, tokens: list[str], requests_per_client: int) -> dict:
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(token: str):
+            headers = {"Authorization": f"Bearer {token}"}
+            for _ in range(requests_per_client):
+                start = time.perf_counter()
+                response = await client.get("/api/v1/polls/", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(token) for token in tokens))
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5, help="Requests per client")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="Delay added to every SQL statement")
+    args = parser.parse_args()
+
+    tokens = seed_users(args.clients)
+
+    if args.db_latency_ms:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _simulate_latency(*_):
+            time.sleep(args.db_latency_ms / 1000)
+
+    app = create_app(settings)
+    results = {}
+
+    app.dependency_overrides[get_current_user_optional_async] = blocking_get_current_user_optional
+    results["blocking"] = asyncio.run(run_mode(app, tokens, args.requests))
+
+    app.dependency_overrides.clear()
+    token_cache.clear()
+    user_cache.clear()
+    results["offloaded"] = asyncio.run(run_mode(app, tokens, args.requests))
+
+    print(json.dumps({"clients": args.clients, "db_latency_ms": args.db_latency_ms, **results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import json
+import time
+import statistics
+from jose import jwe
+from api.auth import dependencies
+from api.auth.dependencies import get_derived_encryption_key
+
+def make_token(email: str, ttl: int = 3600) -> str:
+    """Build an Auth.js session token for the given email"""
+    key = get_derived_encryption_key(dependencies.AUTHJS_SECRET, dependencies.AUTHJS_SALT)
+    payload = {"email": email, "exp": int(time.time()) + ttl}
+    return jwe.encrypt(json.dumps(payload), key, algorithm="dir", encryption="A256CBC-HS512").decode("utf-8")
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """Latency percentiles (ms) and throughput for a list of request durations (s)"""
+    if not latencies:
+        return {"requests": 0}
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+    }
@@ -0,0 +1,365 @@
+"""
+Deterministic synthetic dataset for the benchmarks.
+
+Creates users, a community tree (global, countries, regions, subregions),
+polls with options, votes, reactions and comments, debates with points of
+view, opinions and opinion votes, projects and issues through the existing
+SQLModel models. The same seed and sizes always produce the same rows.
+
+Usage:
+    python -m benchmarks.dataset [--users 500] [--polls 1000] [--seed 42] [--reset]
+"""
+import os
+import time
+import random
+import argparse
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timedelta
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel
+from api.models import (
+    Community, CommunityLevel, Country, Region, Subregion, User, Tag,
+    Debate, DebateType, PointOfView, Opinion, OpinionVote,
+    Project, Issue, Organization, OrganizationLevel,
+    UserCommunityLink, PollCommunityLink, PollTagLink, DebateCommunityLink,
+    DebateTagLink, ProjectCommunityLink,
+)
+from api.public.poll.models import Poll, PollOption, PollVote, PollReaction, PollComment, PollType, ReactionType
+from api.public.debate.models import Comment
+from api.utils.generic_models import IssueCommunityLink
+
+# Fixed reference time so timestamps do not depend on when the data is generated
+BASE_TIME = datetime(2025, 1, 1)
+BATCH_SIZE = 5000
+
+POLL_SCOPES = ["GLOBAL", "INTERNATIONAL", "NATIONAL", "REGIONAL", "SUBREGIONAL"]
+
+@dataclass
+class DatasetSize:
+    users: int = 500
+    countries: int = 10
+    regions_per_country: int = 3
+    subregions_per_region: int = 2
+    tags: int = 50
+    polls: int = 1000
+    options_per_poll: int = 4
+    votes_per_poll: int = 50
+    reactions_per_poll: int = 20
+    comments_per_poll: int = 5
+    debates: int = 200
+    points_of_view_per_debate: int = 3
+    opinions_per_point_of_view: int = 4
+    votes_per_opinion: int = 5
+    comments_per_debate: int = 3
+    projects: int = 200
+    issues: int = 200
+    organizations: int = 20
+
+def email_for(index: int) -> str:
+    return f"bench-{index}@geounity.org"
+
+def _insert_rows(db: Session, model, rows: list[dict]) -> None:
+    """Bulk insert plain rows in batches (executemany)"""
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(model.__table__), rows[start:start + BATCH_SIZE])
+
+def _add_all(db: Session, objects: list) -> list:
+    """Insert ORM objects in batches and return them with their IDs"""
+    for start in range(0, len(objects), BATCH_SIZE):
+        db.add_all(objects[start:start + BATCH_SIZE])
+        db.flush()
+    return objects
+
+def reset_database(engine) -> None:
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+def generate(engine, size: DatasetSize = DatasetSize(), seed: int = 42) -> dict:
+    """
+    Populates the database with a deterministic synthetic dataset.
+
+    Args:
+        engine: Engine of an empty database with the schema already created
+        size: Number of rows to create per entity
+        seed: Random seed
+
+    Returns:
+        Number of rows created per table
+    """
+    rng = random.Random(seed)
+    counts: dict[str, int] = {}
+
+    with Session(engine) as db:
+        # Community tree: global -> countries -> regions -> subregions
+        global_community = Community(name="Global", description="Global community", level=CommunityLevel.GLOBAL)
+        db.add(global_community)
+        db.flush()
+
+        country_communities = _add_all(db, [
+            Community(name=f"Country {c}", description=f"Country {c}", level=CommunityLevel.NATIONAL, parent_id=global_community.id)
+            for c in range(size.countries)
+        ])
+        countries = _add_all(db, [
+            Country(name=f"Country {c}", cca2=f"{chr(65 + c // 26 % 26)}{chr(65 + c % 26)}", community_id=community.id)
+            for c, community in enumerate(country_communities)
+        ])
+
+        region_specs = [(country, r) for country in countries for r in range(size.regions_per_country)]
+        region_communities = _add_all(db, [
+            Community(name=f"{country.name} Region {r}", description="Region", level=CommunityLevel.REGIONAL, parent_id=country.community_id)
+            for country, r in region_specs
+        ])
+        regions = _add_all(db, [
+            Region(name=community.name, country_cca2=country.cca2, country_id=country.id, community_id=community.id)
+            for (country, _), community in zip(region_specs, region_communities)
+        ])
+
+        subregion_specs = [(region, s) for region in regions for s in range(size.subregions_per_region)]
+        subregion_communities = _add_all(db, [
+            Community(name=f"{region.name} Subregion {s}", description="Subregion", level=CommunityLevel.SUBREGIONAL, parent_id=region.community_id)
+            for region, s in subregion_specs
+        ])
+        subregions = _add_all(db, [
+            Subregion(name=community.name, region_id=region.id, community_id=community.id)
+            for (region, _), community in zip(subregion_specs, subregion_communities)
+        ])
+        counts["community"] = 1 + len(country_communities) + len(region_communities) + len(subregion_communities)
+
+        # Users, each a member of the global community and of one branch of the tree
+        users = _add_all(db, [
+            User(email=email_for(i), username=f"bench_{i}", name=f"Bench {i}", created_at=BASE_TIME)
+            for i in range(size.users)
+        ])
+        regions_by_id = {region.id: region for region in regions}
+        countries_by_id = {country.id: country for country in countries}
+        members: dict[int, list[int]] = {}
+        membership_rows = []
+        for user in users:
+            subregion = rng.choice(subregions)
+            region = regions_by_id[subregion.region_id]
+            country = countries_by_id[region.country_id]
+            for community_id in (global_community.id, country.community_id, region.community_id, subregion.community_id):
+                membership_rows.append({"user_id": user.id, "community_id": community_id, "is_public": True})
+                members.setdefault(community_id, []).append(user.id)
+        _insert_rows(db, UserCommunityLink, membership_rows)
+        counts["users"] = len(users)
+
+        tags = _add_all(db, [Tag(name=f"tag-{t}") for t in range(size.tags)])
+
+        # Polls spread over every scope
+        poll_specs = []
+        for p in range(size.polls):
+            scope = POLL_SCOPES[p % len(POLL_SCOPES)]
+            if scope == "GLOBAL":
+                community_ids = [global_community.id]
+            elif scope == "INTERNATIONAL":
+                community_ids = [c.community_id for c in rng.sample(countries, min(3, len(countries)))]
+            elif scope == "NATIONAL":
+                community_ids = [rng.choice(countries).community_id]
+            elif scope == "REGIONAL":
+                community_ids = [rng.choice(regions).community_id]
+            else:
+                community_ids = [rng.choice(subregions).community_id]
+            poll_specs.append((scope, community_ids))
+
+        polls = _add_all(db, [
+            Poll(
+                title=f"Benchmark poll {p}",
+                description="Synthetic poll",
+                type=PollType.SINGLE_CHOICE,
+                is_anonymous=p % 4 == 0,
+                scope=scope,
+                slug=f"benchmark-poll-{p}",
+                creator_id=rng.choice(users).id,
+                created_at=BASE_TIME - timedelta(minutes=p),
+                updated_at=BASE_TIME - timedelta(minutes=p),
+            )
+            for p, (scope, _) in enumerate(poll_specs)
+        ])
+        _insert_rows(db, PollCommunityLink, [
+            {"poll_id": poll.id, "community_id": community_id}
+            for poll, (_, community_ids) in zip(polls, poll_specs)
+            for community_id in community_ids
+        ])
+        _insert_rows(db, PollTagLink, [
+            {"poll_id": poll.id, "tag_id": tag.id}
+            for poll in polls
+            for tag in rng.sample(tags, min(2, len(tags)))
+        ])
+
+        options = _add_all(db, [
+            PollOption(poll_id=poll.id, text=f"Option {o}")
+            for poll in polls
+            for o in range(size.options_per_poll)
+        ])
+        options_by_poll: dict[int, list[PollOption]] = {}
+        for option in options:
+            options_by_poll.setdefault(option.poll_id, []).append(option)
+
+        vote_rows, reaction_rows, comment_rows = [], [], []
+        for poll, (_, community_ids) in zip(polls, poll_specs):
+            eligible = sorted({user_id for community_id in community_ids for user_id in members.get(community_id, [])})
+            if not eligible:
+                continue
+            for user_id in rng.sample(eligible, min(size.votes_per_poll, len(eligible))):
+                option = rng.choice(options_by_poll[poll.id])
+                option.votes += 1
+                poll.total_votes += 1
+                vote_rows.append({"poll_id": poll.id, "option_id": option.id, "user_id": user_id})
+            for user_id in rng.sample(eligible, min(size.reactions_per_poll, len(eligible))):
+                reaction = ReactionType.LIKE if rng.random() < 0.7 else ReactionType.DISLIKE
+                if reaction == ReactionType.LIKE:
+                    poll.likes_count += 1
+                else:
+                    poll.dislikes_count += 1
+                reaction_rows.append({"poll_id": poll.id, "user_id": user_id, "reaction": reaction.name, "reacted_at": BASE_TIME})
+            for c in range(size.comments_per_poll):
+                created_at = poll.created_at + timedelta(seconds=c + 1)
+                poll.comments_count += 1
+                comment_rows.append({
+                    "poll_id": poll.id, "user_id": rng.choice(eligible), "content": f"Comment {c}",
+                    "created_at": created_at, "updated_at": created_at,
+                })
+        _insert_rows(db, PollVote, vote_rows)
+        _insert_rows(db, PollReaction, reaction_rows)
+        _insert_rows(db, PollComment, comment_rows)
+        db.flush()
+        counts.update(poll=len(polls), polloption=len(options), pollvote=len(vote_rows),
+                      pollreaction=len(reaction_rows), pollcomment=len(comment_rows))
+
+        # Debates with points of view, opinions and opinion votes
+        debate_specs = []
+        for d in range(size.debates):
+            if d % 2 == 0:
+                debate_specs.append((DebateType.GLOBAL, [global_community.id]))
+            else:
+                debate_specs.append((DebateType.NATIONAL, [rng.choice(countries).community_id]))
+        debates = _add_all(db, [
+            Debate(
+                title=f"Benchmark debate {d}",
+                description="Synthetic debate",
+                slug=f"benchmark-debate-{d}",
+                type=debate_type,
+                creator_id=rng.choice(users).id,
+                created_at=BASE_TIME - timedelta(minutes=d),
+            )
+            for d, (debate_type, _) in enumerate(debate_specs)
+        ])
+        _insert_rows(db, DebateCommunityLink, [
+            {"debate_id": debate.id, "community_id": community_id}
+            for debate, (_, community_ids) in zip(debates, debate_specs)
+            for community_id in community_ids
+        ])
+        _insert_rows(db, DebateTagLink, [
+            {"debate_id": debate.id, "tag_id": rng.choice(tags).id} for debate in debates
+        ])
+        points_of_view = _add_all(db, [
+            PointOfView(
+                name=f"Point of view {v}",
+                debate_id=debate.id,
+                created_by_id=rng.choice(users).id,
+                community_id=rng.choice(countries).community_id,
+            )
+            for debate in debates
+            for v in range(size.points_of_view_per_debate)
+        ])
+        opinions = _add_all(db, [
+            Opinion(point_of_view_id=pov.id, user_id=rng.choice(users).id, content=f"Opinion {o}", created_at=BASE_TIME)
+            for pov in points_of_view
+            for o in range(size.opinions_per_point_of_view)
+        ])
+        opinion_vote_rows = [
+            {"opinion_id": opinion.id, "user_id": user.id, "value": rng.choice((1, -1)), "created_at": BASE_TIME}
+            for opinion in opinions
+            for user in rng.sample(users, min(size.votes_per_opinion, len(users)))
+        ]
+        _insert_rows(db, OpinionVote, opinion_vote_rows)
+        debate_comment_rows = [
+            {"debate_id": debate.id, "user_id": rng.choice(users).id, "content": f"Comment {c}", "created_at": BASE_TIME}
+            for debate in debates
+            for c in range(size.comments_per_debate)
+        ]
+        _insert_rows(db, Comment, debate_comment_rows)
+        counts.update(debate=len(debates), pointofview=len(points_of_view), opinion=len(opinions),
+                      opinionvote=len(opinion_vote_rows), comment=len(debate_comment_rows))
+
+        # Projects and issues attached to national communities
+        projects = _add_all(db, [
+            Project(
+                title=f"Benchmark project {p}",
+                description="Synthetic project",
+                slug=f"benchmark-project-{p}",
+                scope="NATIONAL",
+                goal_amount=1000.0,
+                current_amount=0.0,
+                creator_id=rng.choice(users).id,
+                created_at=BASE_TIME - timedelta(minutes=p),
+                updated_at=BASE_TIME - timedelta(minutes=p),
+            )
+            for p in range(size.projects)
+        ])
+        _insert_rows(db, ProjectCommunityLink, [
+            {"project_id": project.id, "community_id": rng.choice(countries).community_id} for project in projects
+        ])
+        issues = _add_all(db, [
+            Issue(
+                title=f"Benchmark issue {i}",
+                description="Synthetic issue",
+                slug=f"benchmark-issue-{i}",
+                scope="NATIONAL",
+                creator_id=rng.choice(users).id,
+                created_at=BASE_TIME - timedelta(minutes=i),
+                updated_at=BASE_TIME - timedelta(minutes=i),
+            )
+            for i in range(size.issues)
+        ])
+        _insert_rows(db, IssueCommunityLink, [
+            {"issue_id": issue.id, "community_id": rng.choice(countries).community_id} for issue in issues
+        ])
+        organizations = _add_all(db, [
+            Organization(
+                name=f"Benchmark organization {o}",
+                level=OrganizationLevel.NATIONAL,
+                community_id=rng.choice(countries).community_id,
+            )
+            for o in range(size.organizations)
+        ])
+        counts.update(project=len(projects), issue=len(issues), organization=len(organizations))
+
+        db.commit()
+
+    return counts
+
+def add_size_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds one --<field> option per DatasetSize field"""
+    for field in fields(DatasetSize):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=int, default=field.default)
+
+def size_from_arguments(args: argparse.Namespace) -> DatasetSize:
+    return DatasetSize(**{field.name: getattr(args, field.name) for field in fields(DatasetSize)})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    from api.database import engine
+    if args.reset:
+        reset_database(engine)
+    else:
+        SQLModel.metadata.create_all(engine)
+
+    size = size_from_arguments(args)
+    start = time.perf_counter()
+    counts = generate(engine, size, seed=args.seed)
+    print({"size": asdict(size), "rows": counts, "seconds": round(time.perf_counter() - start, 2)})
+
+if __name__ == "__main__":
+    main()
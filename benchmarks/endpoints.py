@@ -0,0 +1,249 @@
+"""
+Endpoint benchmark suite.
+
+Drives the FastAPI app in-process through httpx.ASGITransport against the
+database in DATABASE_URL (local Postgres or a SQLite file) and reports, for
+every public GET and the hot POSTs (vote, react, opinion vote):
+
+- p50 / p95 / p99 / mean latency and throughput under concurrency
+- SQL statements per request (measured on a sequential warm-up request)
+- status codes
+
+Results are written as JSON so runs can be compared.
+
+Usage:
+    python -m benchmarks.endpoints --generate [--polls 1000 ...]
+    python -m benchmarks.endpoints [--requests 200] [--concurrency 10] [--only polls] [--output results.json]
+"""
+import os
+import json
+import time
+import logging
+import asyncio
+import argparse
+import platform
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from sqlmodel import Session, SQLModel, select
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.models import Community, CommunityLevel, Country, Region, Subregion, User, Debate, Opinion, Project, Issue, Organization
+from api.public.poll.models import Poll, PollOption
+from api.utils.query_counter import count_queries
+from benchmarks.common import make_token, summarize
+from benchmarks.dataset import add_size_arguments, email_for, generate, reset_database, size_from_arguments
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: str
+    # Builds the JSON body of the i-th request
+    body: Optional[Callable[[int], dict]] = None
+    # Send the token of a rotating user with every request
+    authenticated: bool = False
+
+def load_targets(db: Session) -> dict:
+    """Picks the rows the endpoints are exercised against"""
+    global_polls = db.exec(
+        select(Poll).where(Poll.scope == "GLOBAL").order_by(Poll.id).limit(50)
+    ).all()
+    if not global_polls:
+        raise SystemExit("The database has no benchmark data; run with --generate first")
+
+    poll_ids = [poll.id for poll in global_polls]
+    options = db.exec(select(PollOption).where(PollOption.poll_id.in_(poll_ids)).order_by(PollOption.id)).all()
+    options_by_poll: dict[int, list[int]] = {}
+    for option in options:
+        options_by_poll.setdefault(option.poll_id, []).append(option.id)
+
+    country = db.exec(select(Country).order_by(Country.id)).first()
+    region = db.exec(select(Region).order_by(Region.id)).first()
+    subregion = db.exec(select(Subregion).order_by(Subregion.id)).first()
+    national = db.exec(select(Community).where(Community.level == CommunityLevel.NATIONAL).order_by(Community.id)).first()
+    debate = db.exec(select(Debate).order_by(Debate.id)).first()
+    opinions = db.exec(select(Opinion.id).order_by(Opinion.id).limit(50)).all()
+    project = db.exec(select(Project).order_by(Project.id)).first()
+    issue = db.exec(select(Issue).order_by(Issue.id)).first()
+    organization = db.exec(select(Organization).order_by(Organization.id)).first()
+    user = db.exec(select(User).order_by(User.id)).first()
+
+    return {
+        "poll": global_polls[0],
+        "poll_ids": poll_ids,
+        "options_by_poll": options_by_poll,
+        "country": country,
+        "region": region,
+        "subregion": subregion,
+        "community": national,
+        "debate": debate,
+        "opinion_ids": list(opinions),
+        "project": project,
+        "issue": issue,
+        "organization": organization,
+        "user": user,
+    }
+
+def build_endpoints(t: dict) -> list[Endpoint]:
+    poll_ids, options_by_poll, opinion_ids = t["poll_ids"], t["options_by_poll"], t["opinion_ids"]
+    api = "/api/v1"
+    endpoints = [
+        Endpoint("polls.list", "GET", f"{api}/polls/"),
+        Endpoint("polls.list.authenticated", "GET", f"{api}/polls/", authenticated=True),
+        Endpoint("polls.list.global", "GET", f"{api}/polls/?scope=GLOBAL"),
+        Endpoint("polls.list.national", "GET", f"{api}/polls/?scope=NATIONAL&country={t['country'].cca2}"),
+        Endpoint("polls.list.international", "GET", f"{api}/polls/?scope=INTERNATIONAL"),
+        Endpoint("polls.list.regional", "GET", f"{api}/polls/?scope=REGIONAL&region={t['region'].id}"),
+        Endpoint("polls.list.subregional", "GET", f"{api}/polls/?scope=SUBREGIONAL&subregion={t['subregion'].id}", authenticated=True),
+        Endpoint("polls.list.community", "GET", f"{api}/polls/?community_id={t['community'].id}"),
+        Endpoint("polls.detail", "GET", f"{api}/polls/{t['poll'].id}"),
+        Endpoint("polls.detail.slug", "GET", f"{api}/polls/{t['poll'].slug}", authenticated=True),
+        Endpoint("polls.comments", "GET", f"{api}/polls/{t['poll'].id}/comments"),
+        Endpoint("debates.list", "GET", f"{api}/debates/"),
+        Endpoint("debates.list.national", "GET", f"{api}/debates/?type=NATIONAL&country_code={t['country'].cca2}"),
+        Endpoint("debates.detail", "GET", f"{api}/debates/{t['debate'].slug}"),
+        Endpoint("projects.list", "GET", f"{api}/projects/"),
+        Endpoint("projects.detail", "GET", f"{api}/projects/{t['project'].slug}"),
+        Endpoint("issues.list", "GET", f"{api}/issues/"),
+        Endpoint("issues.detail", "GET", f"{api}/issues/{t['issue'].slug}"),
+        Endpoint("organizations.list", "GET", f"{api}/organizations/"),
+        Endpoint("organizations.detail", "GET", f"{api}/organizations/{t['organization'].id}"),
+        Endpoint("communities.detail", "GET", f"{api}/communities/{t['community'].id}"),
+        Endpoint("communities.members", "GET", f"{api}/communities/{t['community'].id}/members"),
+        Endpoint("communities.search", "GET", f"{api}/communities/search?level=NATIONAL&country={t['country'].name}"),
+        Endpoint("countries.list", "GET", f"{api}/countries/"),
+        Endpoint("countries.detail", "GET", f"{api}/countries/{t['country'].cca2}"),
+        Endpoint("countries.divisions", "GET", f"{api}/countries/{t['country'].cca2}/divisions"),
+        Endpoint("regions.subregions", "GET", f"{api}/regions/{t['region'].id}/subregions"),
+        Endpoint("tags.list", "GET", f"{api}/tags/"),
+        Endpoint("users.me", "GET", f"{api}/users/me", authenticated=True),
+        Endpoint("users.profile", "GET", f"{api}/users/{t['user'].username}"),
+    ]
+
+    # Hot writes, spread over several polls/opinions so rows are not all contended
+    def vote_body(i: int) -> dict:
+        options = options_by_poll[poll_ids[i % len(poll_ids)]]
+        return {"option_ids": [options[i % len(options)]]}
+
+    endpoints += [
+        Endpoint("polls.vote", "POST", f"{api}/polls/{{poll_id}}/vote", body=vote_body, authenticated=True),
+        Endpoint("polls.react", "POST", f"{api}/polls/{{poll_id}}/react",
+                 body=lambda i: {"reaction": "LIKE" if i % 3 else "DISLIKE"}, authenticated=True),
+        Endpoint("debates.opinion_vote", "POST", f"{api}/debates/opinions/{{opinion_id}}/vote",
+                 body=lambda i: {"opinion_id": opinion_ids[i % len(opinion_ids)], "value": 1 if i % 2 else -1},
+                 authenticated=True),
+    ]
+    return endpoints
+
+def request_path(endpoint: Endpoint, targets: dict, i: int) -> str:
+    poll_ids, opinion_ids = targets["poll_ids"], targets["opinion_ids"]
+    return endpoint.path.format(
+        poll_id=poll_ids[i % len(poll_ids)],
+        opinion_id=opinion_ids[i % len(opinion_ids)] if opinion_ids else 0,
+    )
+
+async def send(client: httpx.AsyncClient, endpoint: Endpoint, targets: dict, tokens: list[str], i: int) -> httpx.Response:
+    headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"} if endpoint.authenticated else {}
+    body = endpoint.body(i) if endpoint.body else None
+    return await client.request(endpoint.method, request_path(endpoint, targets, i), headers=headers, json=body)
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, targets: dict, tokens: list[str], requests: int, concurrency: int) -> dict:
+    # Sequential warm-up request, also used to count SQL statements
+    with count_queries(all_threads=True) as counter:
+        warmup = await send(client, endpoint, targets, tokens, 0)
+
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    queue = iter(range(1, requests + 1))
+
+    async def worker():
+        for i in queue:
+            start = time.perf_counter()
+            response = await send(client, endpoint, targets, tokens, i)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "method": endpoint.method,
+        "path": endpoint.path,
+        "sql_statements": counter.statements,
+        "sql_max_repeated": max(counter.shapes.values(), default=0),
+        "warmup_status": warmup.status_code,
+        "statuses": statuses,
+        **summarize(latencies, elapsed),
+    }
+
+async def run(endpoints: list[Endpoint], targets: dict, tokens: list[str], requests: int, concurrency: int) -> dict:
+    app = create_app(settings)
+    results = {}
+    # Unhandled errors are reported as 500s instead of aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint in endpoints:
+            results[endpoint.name] = await run_endpoint(client, endpoint, targets, tokens, requests, concurrency)
+            print(
+                f"{endpoint.name:32} p50 {results[endpoint.name].get('p50_ms')}ms "
+                f"p99 {results[endpoint.name].get('p99_ms')}ms "
+                f"sql {results[endpoint.name]['sql_statements']} "
+                f"statuses {results[endpoint.name]['statuses']}"
+            )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generate", action="store_true", help="Reset the database and generate the dataset first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=100, help="Distinct authenticated users")
+    parser.add_argument("--only", default=None, help="Only run endpoints whose name contains this text")
+    parser.add_argument("--output", default="benchmark-results.json")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    # Statement counts are part of the report; skip the per-request budget warnings
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    size = size_from_arguments(args)
+    if args.generate:
+        reset_database(engine)
+        generate(engine, size, seed=args.seed)
+    else:
+        SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        targets = load_targets(db)
+        user_count = len(db.exec(select(User.id).limit(args.clients)).all())
+
+    tokens = [make_token(email_for(i)) for i in range(max(1, user_count))]
+    endpoints = build_endpoints(targets)
+    if args.only:
+        endpoints = [endpoint for endpoint in endpoints if args.only in endpoint.name]
+
+    results = asyncio.run(run(endpoints, targets, tokens, args.requests, args.concurrency))
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "dataset": asdict(size) if args.generate else None,
+        "endpoints": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
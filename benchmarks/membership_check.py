@@ -0,0 +1,171 @@
+"""
+Community membership check benchmark.
+
+- Accuracy and cost: for --checks random (user, item) pairs over polls,
+  debates, projects and issues, is_member_of_item_communities is compared
+  with the former check (the user's memberships and the item's community
+  links loaded and intersected in Python). Statements and latency are
+  reported for the former check, the first check of a pair and a repeated
+  one.
+- Invalidation: a member votes on a poll, leaves the poll's community
+  through DELETE /communities/{id}/join and must then be refused; after
+  joining again through POST /communities/{id}/join the vote is accepted.
+
+Any disagreement fails the run.
+
+Usage:
+    python -m benchmarks.membership_check [--users 2000] [--checks 2000]
+"""
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.models import User
+from api.public.community.crud import is_member_of_item_communities, user_memberships
+from api.public.poll.models import Poll, PollOption, PollStatus
+from api.utils.generic_models import (
+    UserCommunityLink, PollCommunityLink, DebateCommunityLink, ProjectCommunityLink, IssueCommunityLink,
+)
+from api.utils.query_counter import count_queries
+from benchmarks.common import make_token, summarize
+from benchmarks.dataset import add_size_arguments, generate, reset_database, size_from_arguments
+
+ITEM_COLUMNS = {
+    "poll": PollCommunityLink.poll_id,
+    "debate": DebateCommunityLink.debate_id,
+    "project": ProjectCommunityLink.project_id,
+    "issue": IssueCommunityLink.issue_id,
+}
+
+def intersect(db: Session, user_id: int, item_column, item_id: int) -> bool:
+    """The former check: both membership lists loaded and intersected"""
+    user_community_ids = set(db.exec(
+        select(UserCommunityLink.community_id).where(UserCommunityLink.user_id == user_id)
+    ).all())
+    item_community_ids = set(db.exec(
+        select(item_column.class_.community_id).where(item_column == item_id)
+    ).all())
+    return bool(user_community_ids & item_community_ids)
+
+def timed(check, *args) -> tuple[bool, float, int]:
+    with count_queries() as counter:
+        start = time.perf_counter()
+        result = check(*args)
+        seconds = time.perf_counter() - start
+    return result, seconds, counter.statements
+
+def compare(checks: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    user_memberships.clear()
+    with Session(engine) as db:
+        user_ids = list(db.exec(select(User.id)).all())
+        items = {
+            kind: list(db.exec(select(column).distinct()).all())
+            for kind, column in ITEM_COLUMNS.items()
+        }
+        pairs = [
+            (kind, rng.choice(user_ids), rng.choice(items[kind]))
+            for kind in rng.choices(list(ITEM_COLUMNS), k=checks)
+            if items[kind]
+        ]
+        report = {"checks": len(pairs), "members": 0, "mismatches": 0}
+        timings = {"intersect": ([], []), "first": ([], []), "repeated": ([], [])}
+        for kind, user_id, item_id in pairs:
+            column = ITEM_COLUMNS[kind]
+            expected, seconds, statements = timed(intersect, db, user_id, column, item_id)
+            timings["intersect"][0].append(seconds)
+            timings["intersect"][1].append(statements)
+            user_memberships.delete(user_id)
+            for name in ("first", "repeated"):
+                actual, seconds, statements = timed(is_member_of_item_communities, db, user_id, column, item_id)
+                timings[name][0].append(seconds)
+                timings[name][1].append(statements)
+                report["mismatches"] += actual != expected
+            report["members"] += expected
+    for name, (latencies, statements) in timings.items():
+        report[name] = {
+            **summarize(latencies, sum(latencies)),
+            "statements_per_check": round(sum(statements) / len(statements), 2) if statements else 0,
+        }
+    return report
+
+def invalidation() -> dict:
+    """Leave and join again through the API around votes on a poll"""
+    with Session(engine) as db:
+        poll, community_id, user = db.exec(
+            select(Poll, PollCommunityLink.community_id, User)
+            .join(PollCommunityLink, PollCommunityLink.poll_id == Poll.id)
+            .join(UserCommunityLink, UserCommunityLink.community_id == PollCommunityLink.community_id)
+            .join(User, User.id == UserCommunityLink.user_id)
+            .where(Poll.status == PollStatus.PUBLISHED)
+            .order_by(Poll.id)
+        ).first()
+        # Leaving the community must leave the user without any of the poll's communities
+        db.exec(PollCommunityLink.__table__.delete().where(
+            PollCommunityLink.poll_id == poll.id, PollCommunityLink.community_id != community_id
+        ))
+        db.commit()
+        option_id = db.exec(select(PollOption.id).where(PollOption.poll_id == poll.id)).first()
+        poll_id, email = poll.id, user.email
+
+    client = TestClient(create_app(settings))
+    headers = {"Authorization": f"Bearer {make_token(email)}"}
+    vote = lambda: client.post(f"/api/v1/polls/{poll_id}/vote", json={"option_ids": [option_id]}, headers=headers).status_code
+    statuses = {"member": vote()}
+    client.delete(f"/api/v1/communities/{community_id}/join", headers=headers).raise_for_status()
+    statuses["after_leave"] = vote()
+    client.post(f"/api/v1/communities/{community_id}/join", headers=headers).raise_for_status()
+    statuses["after_join"] = vote()
+    return statuses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=2000, help="Random (user, item) pairs checked")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-membership-check.json")
+    add_size_arguments(parser)
+    parser.set_defaults(users=2000, votes_per_poll=0, reactions_per_poll=0, comments_per_poll=0)
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    reset_database(engine)
+    generate(engine, size_from_arguments(args), seed=args.seed)
+    checks = compare(args.checks, args.seed)
+    statuses = invalidation()
+    exact = (
+        not checks["mismatches"]
+        and statuses == {"member": 200, "after_leave": 403, "after_join": 200}
+    )
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "checks": checks,
+        "invalidation": statuses,
+        "exact": exact,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    for name in ("intersect", "first", "repeated"):
+        result = checks[name]
+        print(f"{name:10} statements/check {result['statements_per_check']} p50 {result['p50_ms']}ms")
+    print(json.dumps({"members": checks["members"], "mismatches": checks["mismatches"], "invalidation": statuses, "exact": exact}))
+    if not exact:
+        raise SystemExit("The membership check disagrees with the memberships")
+
+if __name__ == "__main__":
+    main()
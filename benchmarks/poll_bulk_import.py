@@ -0,0 +1,176 @@
+"""
+Bulk poll import benchmark.
+
+Imports --polls polls over every scope, with options and tags (half of
+them new), through POST /api/v1/polls/bulk, and the same payloads one by
+one through POST /api/v1/polls/. Reports wall time and SQL statements of
+both. --invalid of the imported payloads are broken (one option, unknown
+country) and must be reported and skipped; the polls, options,
+community links and tag links written must match the valid payloads.
+
+Usage:
+    python -m benchmarks.poll_bulk_import [--polls 1000] [--invalid 20]
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from sqlmodel import Session, select, func
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.models import Community, CommunityLevel, Country, Region, Subregion, Tag, User, UserRole
+from api.public.poll.models import Poll, PollOption
+from api.utils.generic_models import PollCommunityLink, PollTagLink
+from api.utils.query_counter import count_queries
+from benchmarks.common import make_token
+from benchmarks.dataset import DatasetSize, email_for, generate, reset_database
+
+def prepare(seed: int) -> dict:
+    """Geography and tags to reference, and an administrator"""
+    reset_database(engine)
+    generate(engine, DatasetSize(
+        users=10, polls=0, votes_per_poll=0, reactions_per_poll=0, comments_per_poll=0,
+        debates=0, projects=0, issues=0, organizations=0,
+    ), seed=seed)
+    with Session(engine) as db:
+        admin = db.exec(select(User).where(User.email == email_for(0))).one()
+        admin.role = UserRole.ADMIN
+        db.add(admin)
+        db.commit()
+        return {
+            "global": db.exec(select(Community.id).where(Community.level == CommunityLevel.GLOBAL)).first(),
+            "countries": list(db.exec(select(Country.cca2)).all()),
+            "regions": list(db.exec(select(Region.id)).all()),
+            "subregions": list(db.exec(select(Subregion.id)).all()),
+            "tags": list(db.exec(select(Tag.name)).all()),
+        }
+
+def payloads(references: dict, polls: int, invalid: int, prefix: str, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    items = []
+    for p in range(polls):
+        scope = ["GLOBAL", "INTERNATIONAL", "NATIONAL", "REGIONAL", "SUBREGIONAL"][p % 5]
+        item = {
+            "title": f"{prefix} poll {p % 200}",
+            "description": "Imported poll",
+            "type": "SINGLE_CHOICE",
+            "ends_at": None,
+            "scope": scope,
+            "options": [{"text": f"Option {o}"} for o in range(rng.randint(2, 6))],
+            "tags": rng.sample(references["tags"], 2) + [f"{prefix}-tag-{rng.randint(0, 50)}"],
+        }
+        if scope == "GLOBAL":
+            item["community_ids"] = [references["global"]]
+        elif scope == "INTERNATIONAL":
+            item["country_codes"] = rng.sample(references["countries"], 3)
+        elif scope == "NATIONAL":
+            item["country_code"] = rng.choice(references["countries"])
+        elif scope == "REGIONAL":
+            item["region_id"] = rng.choice(references["regions"])
+        else:
+            item["subregion_id"] = rng.choice(references["subregions"])
+        items.append(item)
+    for i, index in enumerate(rng.sample(range(polls), min(invalid, polls))):
+        item = items[index]
+        if i % 2:
+            item["options"] = item["options"][:1]
+        else:
+            for key in ("community_ids", "country_codes", "region_id", "subregion_id"):
+                item.pop(key, None)
+            item.update(scope="NATIONAL", country_code="??")
+    return items
+
+def counts() -> dict:
+    with Session(engine) as db:
+        return {
+            model.__name__: db.exec(select(func.count()).select_from(model)).one()
+            for model in (Poll, PollOption, PollCommunityLink, PollTagLink, Tag)
+        }
+
+async def run(bulk: list[dict], single: list[dict]) -> dict:
+    app = create_app(settings)
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {make_token(email_for(0))}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        before = counts()
+        with count_queries(all_threads=True) as counter:
+            start = time.perf_counter()
+            response = await client.post("/api/v1/polls/bulk", json={"polls": bulk}, headers=headers)
+            bulk_seconds = time.perf_counter() - start
+        response.raise_for_status()
+        result = response.json()
+        written = {name: count - before[name] for name, count in counts().items()}
+        bulk_report = {"seconds": round(bulk_seconds, 3), "statements": counter.statements,
+                       "created": result["created"], "invalid": result["invalid"], "written": written}
+
+        with count_queries(all_threads=True) as counter:
+            start = time.perf_counter()
+            statuses = []
+            for item in single:
+                statuses.append((await client.post("/api/v1/polls/", json=item, headers=headers)).status_code)
+            single_seconds = time.perf_counter() - start
+        single_report = {"seconds": round(single_seconds, 3), "statements": counter.statements,
+                         "created": statuses.count(201)}
+    return {"bulk": bulk_report, "single": single_report, "items": result["items"]}
+
+def check(bulk: list[dict], report: dict) -> bool:
+    valid = [item for item in bulk if len(item["options"]) >= 2 and item.get("country_code") != "??"]
+    results = report["items"]
+    expected_options = sum(len(item["options"]) for item in valid)
+    expected_tag_links = sum(len(set(item["tags"])) for item in valid)
+    written = report["bulk"]["written"]
+    return (
+        report["bulk"]["created"] == len(valid)
+        and report["bulk"]["invalid"] == len(bulk) - len(valid)
+        and [result["index"] for result in results] == list(range(len(bulk)))
+        and all(bool(result["errors"]) == (result["status"] == "invalid") for result in results)
+        and len({result["slug"] for result in results if result["slug"]}) == len(valid)
+        and written["Poll"] == len(valid)
+        and written["PollOption"] == expected_options
+        and written["PollTagLink"] == expected_tag_links
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--polls", type=int, default=1000)
+    parser.add_argument("--invalid", type=int, default=20, help="Invalid payloads mixed into the import")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-poll-bulk-import.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    references = prepare(args.seed)
+    bulk = payloads(references, args.polls, args.invalid, "Bulk", args.seed)
+    single = payloads(references, args.polls, 0, "Single", args.seed)
+    results = asyncio.run(run(bulk, single))
+    exact = check(bulk, results)
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "polls": args.polls,
+        "invalid": args.invalid,
+        "bulk": results["bulk"],
+        "single": results["single"],
+        "exact": exact,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps(report))
+    if not exact:
+        raise SystemExit("The bulk import did not write the expected rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Poll comments benchmark.
+
+Gives the newest poll --comments comments (several per second, so
+created_at ties are common), then:
+
+- Reports the size and latency of the poll listing page and the poll
+  detail that include it; neither embeds comments, only comments_count.
+- Walks all the poll's comments through /polls/{id}/comments with
+  --page-size pages, timing the first and the last pages. The pages joined
+  must hold every comment exactly once, newest first by (created_at, id).
+
+Usage:
+    python -m benchmarks.poll_comments [--comments 20000] [--page-size 100]
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+from datetime import timedelta
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from sqlmodel import Session, select
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.public.poll.models import Poll, PollComment
+from api.models import User
+from api.utils.query_counter import count_queries
+from benchmarks.common import summarize
+from benchmarks.dataset import BATCH_SIZE, DatasetSize, generate, reset_database
+
+def prepare(comments: int, seed: int) -> int:
+    """Dataset with a long comment thread on the newest poll; returns its ID"""
+    reset_database(engine)
+    generate(engine, DatasetSize(
+        users=200, polls=50, votes_per_poll=0, reactions_per_poll=0, comments_per_poll=5,
+        debates=0, projects=0, issues=0, organizations=0,
+    ), seed=seed)
+    with Session(engine) as db:
+        poll = db.exec(select(Poll).order_by(Poll.created_at.desc(), Poll.id.desc())).first()
+        user_ids = list(db.exec(select(User.id)).all())
+        rows = [
+            {
+                "poll_id": poll.id, "user_id": user_ids[c % len(user_ids)], "content": f"Thread comment {c}",
+                # Three comments per second
+                "created_at": poll.created_at + timedelta(seconds=c // 3),
+                "updated_at": poll.created_at + timedelta(seconds=c // 3),
+            }
+            for c in range(comments)
+        ]
+        for start in range(0, len(rows), BATCH_SIZE):
+            db.execute(PollComment.__table__.insert(), rows[start:start + BATCH_SIZE])
+        poll.comments_count += comments
+        db.add(poll)
+        db.commit()
+        return poll.id
+
+async def timed(client: httpx.AsyncClient, url: str) -> tuple[httpx.Response, float, int]:
+    with count_queries(all_threads=True) as counter:
+        start = time.perf_counter()
+        response = await client.get(url)
+        seconds = time.perf_counter() - start
+    response.raise_for_status()
+    return response, seconds, counter.statements
+
+async def run(poll_id: int, page_size: int) -> dict:
+    app = create_app(settings)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        pages = {}
+        for name, url in (("list", "/api/v1/polls/?size=20"), ("detail", f"/api/v1/polls/{poll_id}")):
+            response, seconds, statements = await timed(client, url)
+            pages[name] = {"bytes": len(response.content), "ms": round(seconds * 1000, 2), "statements": statements}
+
+        ids, latencies, statements, cursor = [], [], [], None
+        while True:
+            url = f"/api/v1/polls/{poll_id}/comments?size={page_size}" + (f"&cursor={cursor}" if cursor else "")
+            response, seconds, count = await timed(client, url)
+            page = response.json()
+            ids += [comment["id"] for comment in page["items"]]
+            latencies.append(seconds)
+            statements.append(count)
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+    tail = max(1, len(latencies) // 10)
+    return {
+        "pages": pages,
+        "comment_ids": ids,
+        "comments": {
+            "pages": len(latencies),
+            "total": page["total"],
+            "statements_per_page": max(statements),
+            "first_10pct": summarize(latencies[:tail], sum(latencies[:tail])),
+            "last_10pct": summarize(latencies[-tail:], sum(latencies[-tail:])),
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, default=20000, help="Comments on the newest poll")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-poll-comments.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    poll_id = prepare(args.comments, args.seed)
+    results = asyncio.run(run(poll_id, args.page_size))
+    with Session(engine) as db:
+        expected = list(db.exec(
+            select(PollComment.id)
+            .where(PollComment.poll_id == poll_id)
+            .order_by(PollComment.created_at.desc(), PollComment.id.desc())
+        ).all())
+    exact = results.pop("comment_ids") == expected and results["comments"]["total"] == len(expected)
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "thread_comments": len(expected),
+        "page_size": args.page_size,
+        **results,
+        "exact": exact,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps(report))
+    if not exact:
+        raise SystemExit("Paging through the comments did not return every comment once, in order")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Per-community poll results benchmark.
+
+Checks and measures the results breakdown by community of the voters
+(/polls/{id}/results/by-community), read from the PollCommunityTally rollup:
+
+- Rebuild: the rollup of the generated votes is rebuilt in batches
+  (rebuild_community_tallies) and timed.
+- Reads: for the poll with the most votes and every level, the breakdown
+  read from the rollup is compared with, and timed against, the join it
+  replaces (PollVote -> UserCommunityLink -> Community).
+- Incremental upkeep: --changes votes are then changed or removed through
+  create_vote and the rollup must still match the join.
+- Membership changes: --memberships voters of the poll then join a national
+  community and leave another one through POST / DELETE
+  /communities/{id}/join; the rollup follows the voters' current
+  communities and must still match the join.
+
+Any mismatch fails the run.
+
+Usage:
+    python -m benchmarks.poll_community_breakdown [--users 20000] [--votes-per-poll 20000] [--changes 500]
+"""
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+from dataclasses import asdict
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select, func
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.models import Community, CommunityLevel
+from api.public.poll.crud import create_vote, get_results_by_community, rebuild_community_tallies, results_snapshots
+from api.public.poll.models import Poll, PollOption, PollVote
+from api.public.user.models import User
+from api.utils.generic_models import UserCommunityLink
+from benchmarks.common import make_token, summarize
+from benchmarks.dataset import add_size_arguments, generate, reset_database, size_from_arguments
+
+LEVELS = (CommunityLevel.GLOBAL, CommunityLevel.NATIONAL, CommunityLevel.REGIONAL, CommunityLevel.SUBREGIONAL)
+
+def joined(db: Session, poll_id: int, level: CommunityLevel) -> dict[tuple[int, int], int]:
+    """Votes per (community, option) computed from the votes, as before the rollup"""
+    rows = db.exec(
+        select(Community.id, PollVote.option_id, func.count(PollVote.id))
+        .join(UserCommunityLink, UserCommunityLink.user_id == PollVote.user_id)
+        .join(Community, Community.id == UserCommunityLink.community_id)
+        .where(PollVote.poll_id == poll_id, Community.level == level)
+        .group_by(Community.id, PollVote.option_id)
+    ).all()
+    return {(community_id, option_id): votes for community_id, option_id, votes in rows}
+
+def from_rollup(db: Session, poll: Poll, level: CommunityLevel) -> dict[tuple[int, int], int]:
+    results_snapshots.clear()
+    breakdown = get_results_by_community(db, poll, level)
+    return {
+        (community["community_id"], option["option_id"]): option["votes"]
+        for community in breakdown["communities"]
+        for option in community["options"]
+    }
+
+def compare(db: Session, poll_id: int, repeat: int) -> dict:
+    poll = db.get(Poll, poll_id)
+    report = {}
+    for level in LEVELS:
+        timings = {"join": [], "rollup": []}
+        for _ in range(repeat):
+            start = time.perf_counter()
+            expected = joined(db, poll_id, level)
+            timings["join"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            actual = from_rollup(db, poll, level)
+            timings["rollup"].append(time.perf_counter() - start)
+        report[level.value] = {
+            "communities": len({community_id for community_id, _ in expected}),
+            "exact": expected == actual,
+            "join": summarize(timings["join"], sum(timings["join"])),
+            "rollup": summarize(timings["rollup"], sum(timings["rollup"])),
+        }
+    return report
+
+def change_votes(poll_id: int, changes: int, seed: int) -> dict:
+    """Changes or removes the votes of random voters of the poll through create_vote"""
+    rng = random.Random(seed)
+    with Session(engine) as db:
+        voters = list(db.exec(select(PollVote.user_id).where(PollVote.poll_id == poll_id)).all())
+        option_ids = list(db.exec(select(PollOption.id).where(PollOption.poll_id == poll_id)).all())
+    latencies = []
+    start = time.perf_counter()
+    for user_id in rng.sample(voters, min(changes, len(voters))):
+        option_ids_ = [] if rng.random() < 0.2 else [rng.choice(option_ids)]
+        began = time.perf_counter()
+        with Session(engine) as db:
+            create_vote(db, poll_id, option_ids_, user_id)
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - start)
+
+def change_memberships(poll_id: int, changes: int, seed: int) -> dict:
+    """Random voters of the poll join a national community and leave one of theirs through the API"""
+    rng = random.Random(seed)
+    with Session(engine) as db:
+        voters = list(db.exec(
+            select(User.id, User.email).join(PollVote, PollVote.user_id == User.id).where(PollVote.poll_id == poll_id).distinct()
+        ).all())
+        national_ids = list(db.exec(select(Community.id).where(Community.level == CommunityLevel.NATIONAL)).all())
+        memberships = {}
+        for user_id, community_id in db.exec(
+            select(UserCommunityLink.user_id, UserCommunityLink.community_id)
+            .join(Community, Community.id == UserCommunityLink.community_id)
+            .where(Community.level != CommunityLevel.GLOBAL)
+        ).all():
+            memberships.setdefault(user_id, []).append(community_id)
+    client = TestClient(create_app(settings))
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    for user_id, email in rng.sample(voters, min(changes, len(voters))):
+        headers = {"Authorization": f"Bearer {make_token(email)}"}
+        requests = [("POST", rng.choice([c for c in national_ids if c not in memberships.get(user_id, [])]))]
+        if memberships.get(user_id):
+            requests.append(("DELETE", rng.choice(memberships[user_id])))
+        for method, community_id in requests:
+            began = time.perf_counter()
+            status_code = client.request(method, f"/api/v1/communities/{community_id}/join", headers=headers).status_code
+            latencies.append(time.perf_counter() - began)
+            statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+    return {"statuses": statuses, **summarize(latencies, time.perf_counter() - start)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--changes", type=int, default=500, help="Votes changed through create_vote")
+    parser.add_argument("--memberships", type=int, default=200, help="Voters joining and leaving communities")
+    parser.add_argument("--batch-size", type=int, default=100, help="Polls per rebuild batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed reads per level")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-poll-community-breakdown.json")
+    add_size_arguments(parser)
+    parser.set_defaults(users=20000, polls=20, votes_per_poll=20000, reactions_per_poll=0, comments_per_poll=0,
+                        debates=0, projects=0, issues=0, organizations=0)
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    size = size_from_arguments(args)
+    reset_database(engine)
+    generate(engine, size, seed=args.seed)
+
+    start = time.perf_counter()
+    with Session(engine) as db:
+        rebuild = rebuild_community_tallies(db, batch_size=args.batch_size)
+    rebuild["seconds"] = round(time.perf_counter() - start, 2)
+
+    with Session(engine) as db:
+        poll_id = db.exec(select(Poll.id).order_by(Poll.total_votes.desc(), Poll.id)).first()
+        rebuilt = compare(db, poll_id, args.repeat)
+    changes = change_votes(poll_id, args.changes, args.seed)
+    with Session(engine) as db:
+        maintained = compare(db, poll_id, 1)
+    membership_changes = change_memberships(poll_id, args.memberships, args.seed)
+    with Session(engine) as db:
+        followed = compare(db, poll_id, 1)
+
+    exact = (
+        all(level["exact"] for report in (rebuilt, maintained, followed) for level in report.values())
+        and set(membership_changes["statuses"]) <= {"200"}
+    )
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "dataset": asdict(size),
+        "poll_id": poll_id,
+        "rebuild": rebuild,
+        "after_rebuild": rebuilt,
+        "vote_changes": changes,
+        "after_changes": maintained,
+        "membership_changes": membership_changes,
+        "after_membership_changes": followed,
+        "exact": exact,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps({
+        "rebuild": rebuild,
+        "vote_changes_p50_ms": changes.get("p50_ms"),
+        "membership_changes": membership_changes["statuses"],
+        "membership_changes_p50_ms": membership_changes.get("p50_ms"),
+        "exact": exact,
+    }))
+    for level, result in rebuilt.items():
+        print(
+            f"{level:12} communities {result['communities']:5} "
+            f"join p50 {result['join']['p50_ms']}ms rollup p50 {result['rollup']['p50_ms']}ms"
+        )
+    if not exact:
+        raise SystemExit("The per-community rollup does not match the votes")
+
+if __name__ == "__main__":
+    main()
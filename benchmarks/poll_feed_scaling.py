@@ -0,0 +1,220 @@
+"""
+Poll feed scaling benchmark.
+
+Measures GET /api/v1/polls/ (anonymous and authenticated) while the vote and
+reaction tables grow, to check that the feed only touches the rows of the
+polls on the requested page. Filler votes and reactions go to older polls,
+never to the first page, so the response itself does not change between
+steps; the authenticated user also gets a long vote and reaction history on
+those older polls.
+
+Latency should stay flat from the smallest to the largest step. Growing
+both tables to 10M rows takes a while on SQLite; pass smaller --sizes for a
+quick check.
+
+Usage:
+    python -m benchmarks.poll_feed_scaling [--sizes 10000,100000,1000000,10000000] [--requests 100]
+"""
+import os
+import json
+import time
+import logging
+import asyncio
+import argparse
+import platform
+from dataclasses import asdict
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from sqlalchemy import func, insert
+from sqlmodel import Session, select
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.models import User
+from api.public.poll.models import Poll, PollOption, PollVote, PollReaction, ReactionType
+from api.utils.query_counter import count_queries
+from benchmarks.common import make_token, summarize
+from benchmarks.dataset import BASE_TIME, BATCH_SIZE, add_size_arguments, email_for, generate, reset_database, size_from_arguments
+
+FEED_PATH = "/api/v1/polls/"
+
+def load_filler_polls(db: Session, skip: int) -> list[tuple[int, int]]:
+    """(poll_id, first option id) of every poll except the `skip` newest ones"""
+    polls = db.exec(select(Poll.id).order_by(Poll.created_at.desc()).offset(skip)).all()
+    first_options = dict(db.exec(
+        select(PollOption.poll_id, func.min(PollOption.id)).group_by(PollOption.poll_id)
+    ).all())
+    return [(poll_id, first_options[poll_id]) for poll_id in polls if poll_id in first_options]
+
+def ensure_filler_users(db: Session, count: int) -> list[int]:
+    """IDs of `count` users that only exist to own filler rows"""
+    existing = db.exec(
+        select(User.id).where(User.username.like("filler_%")).order_by(User.id)
+    ).all()
+    missing = count - len(existing)
+    if missing > 0:
+        start = len(existing)
+        for offset in range(0, missing, BATCH_SIZE):
+            db.add_all([
+                User(email=f"filler-{i}@geounity.org", username=f"filler_{i}", name=f"Filler {i}", created_at=BASE_TIME)
+                for i in range(start + offset, start + min(missing, offset + BATCH_SIZE))
+            ])
+            db.flush()
+        existing = db.exec(
+            select(User.id).where(User.username.like("filler_%")).order_by(User.id)
+        ).all()
+    return list(existing[:count])
+
+def grow(db: Session, model, target: int, filler_polls: list[tuple[int, int]], row) -> int:
+    """
+    Inserts filler rows into `model` until it holds `target` rows.
+    The k-th filler row belongs to poll k % P and filler user k // P, so every
+    (poll, user) pair is used at most once.
+
+    Returns:
+        Number of rows inserted
+    """
+    current = db.exec(select(func.count()).select_from(model)).one()
+    missing = target - current
+    if missing <= 0:
+        return 0
+
+    first = db.exec(select(func.count()).select_from(model).where(
+        model.user_id.in_(select(User.id).where(User.username.like("filler_%")))
+    )).one()
+    per_user = len(filler_polls)
+    user_ids = ensure_filler_users(db, (first + missing + per_user - 1) // per_user)
+
+    for start in range(first, first + missing, BATCH_SIZE):
+        stop = min(start + BATCH_SIZE, first + missing)
+        db.execute(insert(model.__table__), [
+            row(filler_polls[k % per_user], user_ids[k // per_user]) for k in range(start, stop)
+        ])
+    db.commit()
+    return missing
+
+def add_user_history(db: Session, user_id: int, filler_polls: list[tuple[int, int]]) -> None:
+    """Gives the authenticated user a vote and a reaction on every filler poll"""
+    voted = set(db.exec(select(PollVote.poll_id).where(PollVote.user_id == user_id)).all())
+    reacted = set(db.exec(select(PollReaction.poll_id).where(PollReaction.user_id == user_id)).all())
+    votes = [
+        {"poll_id": poll_id, "option_id": option_id, "user_id": user_id}
+        for poll_id, option_id in filler_polls if poll_id not in voted
+    ]
+    reactions = [
+        {"poll_id": poll_id, "user_id": user_id, "reaction": ReactionType.LIKE.name, "reacted_at": BASE_TIME}
+        for poll_id, _ in filler_polls if poll_id not in reacted
+    ]
+    for start in range(0, len(votes), BATCH_SIZE):
+        db.execute(insert(PollVote.__table__), votes[start:start + BATCH_SIZE])
+    for start in range(0, len(reactions), BATCH_SIZE):
+        db.execute(insert(PollReaction.__table__), reactions[start:start + BATCH_SIZE])
+    db.commit()
+
+def analyze() -> None:
+    """Refreshes planner statistics after a bulk load"""
+    with engine.connect() as connection:
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+
+async def measure(client: httpx.AsyncClient, headers: dict, requests: int, concurrency: int) -> dict:
+    # Sequential warm-up request, also used to count SQL statements
+    with count_queries(all_threads=True) as counter:
+        warmup = await client.get(FEED_PATH, headers=headers)
+
+    latencies: list[float] = []
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            start = time.perf_counter()
+            response = await client.get(FEED_PATH, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"status": warmup.status_code, "sql_statements": counter.statements, **summarize(latencies, elapsed)}
+
+async def run(steps: list[int], filler_polls: list[tuple[int, int]], token: str, requests: int, concurrency: int) -> list[dict]:
+    app = create_app(settings)
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for target in steps:
+            with Session(engine) as db:
+                grow(db, PollVote, target, filler_polls,
+                     lambda poll, user_id: {"poll_id": poll[0], "option_id": poll[1], "user_id": user_id})
+                grow(db, PollReaction, target, filler_polls,
+                     lambda poll, user_id: {"poll_id": poll[0], "user_id": user_id,
+                                            "reaction": ReactionType.DISLIKE.name, "reacted_at": BASE_TIME})
+                rows = {
+                    "pollvote": db.exec(select(func.count()).select_from(PollVote)).one(),
+                    "pollreaction": db.exec(select(func.count()).select_from(PollReaction)).one(),
+                }
+            analyze()
+
+            step = {
+                "rows": rows,
+                "anonymous": await measure(client, {}, requests, concurrency),
+                "authenticated": await measure(client, {"Authorization": f"Bearer {token}"}, requests, concurrency),
+            }
+            results.append(step)
+            print(
+                f"votes {rows['pollvote']:>10} reactions {rows['pollreaction']:>10} "
+                f"anonymous p50 {step['anonymous']['p50_ms']}ms "
+                f"authenticated p50 {step['authenticated']['p50_ms']}ms"
+            )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000,10000000",
+                        help="Comma-separated row counts the vote and reaction tables are grown to")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=100, help="Timed requests per step and user")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=10, help="Newest polls kept free of filler rows")
+    parser.add_argument("--output", default="benchmark-results-poll-feed.json")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    # The base dataset must stay under the smallest step
+    size = size_from_arguments(args)
+    steps = sorted(int(value) for value in args.sizes.split(","))
+    reset_database(engine)
+    generate(engine, size, seed=args.seed)
+
+    with Session(engine) as db:
+        filler_polls = load_filler_polls(db, skip=args.page_size)
+        user_id = db.exec(select(User.id).where(User.email == email_for(0))).one()
+        add_user_history(db, user_id, filler_polls)
+
+    results = asyncio.run(run(steps, filler_polls, make_token(email_for(0)), args.requests, args.concurrency))
+
+    first, last = results[0], results[-1]
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "dataset": asdict(size),
+        "steps": results,
+        "p50_growth": {
+            kind: round(last[kind]["p50_ms"] / first[kind]["p50_ms"], 2)
+            for kind in ("anonymous", "authenticated")
+        },
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"p50 growth {report['p50_growth']}; results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
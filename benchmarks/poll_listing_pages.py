@@ -0,0 +1,219 @@
+"""
+Poll listing page benchmark.
+
+Measures the community-based poll listings (country, region, community and
+subregion), which page through distinct poll IDs first and then fetch
+options and metadata for that page only. Their page sizes are checked by
+tests/test_poll_listing_pages.py.
+
+For a deep page of the country listing, the former single-phase statement
+(polls x options x creators, limited by option rows) is compared with the
+two phases. Rows returned and latency are reported on every database. The
+work done is reported as rows scanned (sum of actual rows over the plan
+nodes of EXPLAIN ANALYZE) on PostgreSQL and as virtual machine instructions
+on SQLite.
+
+Usage:
+    python -m benchmarks.poll_listing_pages [--polls 5000] [--options-per-poll 8] [--page-size 10]
+"""
+import os
+import json
+import time
+import logging
+import argparse
+import platform
+from dataclasses import asdict
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+from api.database import engine
+from api.models import Community, CommunityLevel, Country, Region, Subregion, User
+from api.public.poll.models import Poll, PollOption
+from api.public.poll.crud import POLL_SORT_KEY
+from api.utils.generic_models import PollCommunityLink
+from benchmarks.common import summarize
+from benchmarks.dataset import add_size_arguments, generate, reset_database, size_from_arguments
+
+def busiest(db: Session, model, level: CommunityLevel) -> tuple:
+    """Row of `model` whose community has the most polls, and that poll count"""
+    return db.exec(
+        select(model, func.count(PollCommunityLink.poll_id).label("polls"))
+        .join(Community, Community.id == model.community_id)
+        .join(PollCommunityLink, PollCommunityLink.community_id == Community.id)
+        .where(Community.level == level)
+        .group_by(model.id)
+        .order_by(func.count(PollCommunityLink.poll_id).desc())
+    ).first()
+
+def load_listings(db: Session) -> dict[str, str]:
+    """Query string of every listing, on its busiest country/region/community"""
+    country, _ = busiest(db, Country, CommunityLevel.NATIONAL)
+    region, _ = busiest(db, Region, CommunityLevel.REGIONAL)
+    subregion, _ = busiest(db, Subregion, CommunityLevel.SUBREGIONAL)
+    return {
+        "country": f"country={country.cca2}",
+        "region": f"region={region.id}",
+        "community": f"community_id={country.community_id}",
+        "subregion": f"scope=SUBREGIONAL&subregion={subregion.id}",
+    }
+
+def rows_scanned(db: Session, statement) -> int | None:
+    """Sum of the actual rows of every plan node (PostgreSQL only)"""
+    if engine.dialect.name != "postgresql":
+        return None
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}").scalar()
+
+    def visit(node: dict) -> int:
+        own = node.get("Actual Rows", 0) * node.get("Actual Loops", 1)
+        return own + sum(visit(child) for child in node.get("Plans", []))
+
+    return visit(plan[0]["Plan"])
+
+def sqlite_instructions(db: Session, statement) -> int | None:
+    """SQLite virtual machine instructions run by a statement (to the nearest 100)"""
+    if engine.dialect.name != "sqlite":
+        return None
+    connection = db.connection().connection.driver_connection
+    steps = 0
+
+    def count() -> int:
+        nonlocal steps
+        steps += 100
+        return 0
+
+    connection.set_progress_handler(count, 100)
+    try:
+        db.exec(statement).all()
+    finally:
+        connection.set_progress_handler(None, 0)
+    return steps
+
+def timed(db: Session, statement, repeat: int) -> tuple[list, list[float]]:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = db.exec(statement).all()
+        latencies.append(time.perf_counter() - start)
+    return rows, latencies
+
+def compare_country_page(db: Session, country_code: str, page: int, size: int, repeat: int) -> dict:
+    """Former single-phase country statement against the two phases, on one page"""
+    offset = (page - 1) * size
+    order = [column.desc() for column in POLL_SORT_KEY]
+
+    single_phase = (
+        select(Poll, PollOption, User)
+        .join(PollCommunityLink)
+        .join(Community)
+        .join(Country)
+        .join(PollOption)
+        .join(User, Poll.creator_id == User.id)
+        .where(Country.cca2 == country_code)
+        .order_by(*order)
+        .offset(offset)
+        .limit(size)
+    )
+    rows, latencies = timed(db, single_phase, repeat)
+    before = {
+        "statements": 1,
+        "rows_returned": len(rows),
+        "polls_on_page": len({poll.id for poll, _, _ in rows}),
+        "rows_scanned": rows_scanned(db, single_phase),
+        "sqlite_instructions": sqlite_instructions(db, single_phase),
+        **summarize(latencies, sum(latencies)),
+    }
+
+    page_query = (
+        select(Poll.id, Poll.created_at)
+        .distinct()
+        .join(PollCommunityLink)
+        .join(Community)
+        .join(Country)
+        .where(Country.cca2 == country_code)
+        .order_by(*order)
+        .offset(offset)
+        .limit(size + 1)
+    )
+    ids, id_latencies = timed(db, page_query, repeat)
+    ids = [row.id for row in ids[:size]]
+    fetch = (
+        select(Poll, PollOption, User)
+        .outerjoin(PollOption)
+        .join(User, Poll.creator_id == User.id)
+        .where(Poll.id.in_(ids))
+        .order_by(*order, PollOption.id)
+    )
+    rows, fetch_latencies = timed(db, fetch, repeat)
+    scanned = [rows_scanned(db, page_query), rows_scanned(db, fetch)]
+    instructions = [sqlite_instructions(db, page_query), sqlite_instructions(db, fetch)]
+    after = {
+        "statements": 2,
+        "rows_returned": len(ids) + len(rows),
+        "polls_on_page": len({poll.id for poll, _, _ in rows}),
+        "rows_scanned": None if None in scanned else sum(scanned),
+        "sqlite_instructions": None if None in instructions else sum(instructions),
+        **summarize(
+            [a + b for a, b in zip(id_latencies, fetch_latencies)],
+            sum(id_latencies) + sum(fetch_latencies),
+        ),
+    }
+    for result in (before, after):
+        polls = result["polls_on_page"] or 1
+        for key in ("rows_scanned", "sqlite_instructions"):
+            result[f"{key}_per_poll"] = None if result[key] is None else round(result[key] / polls)
+    return {"page": page, "size": size, "single_phase": before, "two_phase": after}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50, help="Timed executions of each statement")
+    parser.add_argument("--output", default="benchmark-results-poll-listing-pages.json")
+    add_size_arguments(parser)
+    parser.set_defaults(polls=5000, options_per_poll=8, votes_per_poll=0, reactions_per_poll=0, comments_per_poll=0,
+                        debates=0, projects=0, issues=0, organizations=0)
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    size = size_from_arguments(args)
+    reset_database(engine)
+    generate(engine, size, seed=args.seed)
+
+    with Session(engine) as db:
+        listings = load_listings(db)
+        country_code = listings["country"].split("=")[1]
+        polls_in_country = db.exec(
+            select(func.count(func.distinct(PollCommunityLink.poll_id)))
+            .join(Community)
+            .join(Country)
+            .where(Country.cca2 == country_code)
+        ).one()
+        deep_page = max(1, polls_in_country // args.page_size // 2)
+        comparison = compare_country_page(db, country_code, deep_page, args.page_size, args.repeat)
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "dataset": asdict(size),
+        "listings": listings,
+        "country_page": comparison,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    for phase in ("single_phase", "two_phase"):
+        result = comparison[phase]
+        print(
+            f"{phase:12} polls on page {result['polls_on_page']}/{args.page_size} "
+            f"rows returned {result['rows_returned']} rows scanned {result['rows_scanned']} "
+            f"sqlite instructions {result['sqlite_instructions']} (per poll {result['sqlite_instructions_per_poll']}) "
+            f"p50 {result['p50_ms']}ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+RANKING and SCALE tally benchmark.
+
+- Incremental tallies: --voters voters submit --rounds ballots each (some
+  empty, some repeated) on a RANKING and a SCALE poll through create_vote.
+  The running tallies (option votes and scores, ballots per position or
+  value, RANKING ballots per ranking) are then compared with tallies
+  recomputed from the stored ballots, and the instant-runoff count from the
+  running tallies with the one from the ballots. Any difference fails the
+  run.
+- Instant runoff: --ballots random rankings are counted twice, grouped by
+  ranking (as stored in PollRankingBallot) and one entry per ballot; both
+  counts must agree.
+
+Usage:
+    python -m benchmarks.ranked_tallies [--voters 300] [--rounds 3] [--ballots 1000000] [--options 8]
+"""
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+from collections import Counter
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlmodel import Session, select
+from api.database import engine
+from api.models import User
+from api.public.poll.crud import create_vote, get_instant_runoff
+from api.public.poll.models import Poll, PollOption, PollVote, PollType, PollOptionTally, PollRankingBallot
+from api.public.poll.tally import RankedBallots, instant_runoff, parse_ranking
+from benchmarks.common import summarize
+from benchmarks.dataset import DatasetSize, generate, reset_database
+
+SCALE = (1, 5)
+
+def prepare(voters: int, options: int, seed: int) -> tuple[dict[PollType, int], dict[int, list[int]], list[int]]:
+    """Generates a dataset without votes, with a RANKING and a SCALE poll"""
+    reset_database(engine)
+    generate(engine, DatasetSize(
+        users=voters, polls=5, options_per_poll=options,
+        votes_per_poll=0, reactions_per_poll=0, comments_per_poll=0,
+        debates=0, projects=0, issues=0, organizations=0,
+    ), seed=seed)
+    with Session(engine) as db:
+        first, second = db.exec(select(Poll).order_by(Poll.id).limit(2)).all()
+        first.type = PollType.RANKING
+        second.type, second.scale_min, second.scale_max = PollType.SCALE, *SCALE
+        db.add_all([first, second])
+        db.commit()
+        polls = {PollType.RANKING: first.id, PollType.SCALE: second.id}
+        option_ids = {
+            poll_id: list(db.exec(select(PollOption.id).where(PollOption.poll_id == poll_id).order_by(PollOption.id)).all())
+            for poll_id in polls.values()
+        }
+        user_ids = list(db.exec(select(User.id).order_by(User.id).limit(voters)).all())
+    return polls, option_ids, user_ids
+
+def plan_ballot(rng: random.Random, poll_type: PollType, option_ids: list[int], previous) -> tuple[list[int], list[int] | None]:
+    roll = rng.random()
+    if roll < 0.1:
+        return [], [] if poll_type == PollType.SCALE else None
+    if roll < 0.2 and previous:
+        return previous
+    chosen = rng.sample(option_ids, rng.randint(1, len(option_ids)))
+    if poll_type == PollType.SCALE:
+        return chosen, [rng.randint(*SCALE) for _ in chosen]
+    return chosen, None
+
+def cast_ballots(polls: dict, option_ids: dict, user_ids: list[int], rounds: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    for poll_type, poll_id in polls.items():
+        for user_id in user_ids:
+            previous = None
+            for _ in range(rounds):
+                ballot = plan_ballot(rng, poll_type, option_ids[poll_id], previous)
+                began = time.perf_counter()
+                with Session(engine) as db:
+                    create_vote(db, poll_id, ballot[0], user_id, values=ballot[1])
+                latencies.append(time.perf_counter() - began)
+                previous = ballot
+    return summarize(latencies, time.perf_counter() - start)
+
+def recount(db: Session, poll: Poll, option_ids: list[int]) -> dict:
+    """Tallies recomputed from the stored ballots, in the shape of the running ones"""
+    column = PollVote.rank if poll.type == PollType.RANKING else PollVote.value
+    rows = db.exec(select(PollVote.user_id, PollVote.option_id, column).where(PollVote.poll_id == poll.id)).all()
+    options = {option_id: [0, 0] for option_id in option_ids}
+    buckets, rankings = Counter(), Counter()
+    by_user: dict[int, list[tuple[int, int]]] = {}
+    for user_id, option_id, bucket in rows:
+        points = len(option_ids) - bucket if poll.type == PollType.RANKING else bucket
+        options[option_id][0] += 1
+        options[option_id][1] += points
+        buckets[(option_id, bucket)] += 1
+        by_user.setdefault(user_id, []).append((bucket, option_id))
+    if poll.type == PollType.RANKING:
+        for ballot in by_user.values():
+            rankings[tuple(option_id for _, option_id in sorted(ballot))] += 1
+    return {"options": options, "buckets": dict(buckets), "rankings": dict(rankings)}
+
+def stored(db: Session, poll: Poll) -> dict:
+    options = {
+        option_id: [votes, score]
+        for option_id, votes, score in db.exec(
+            select(PollOption.id, PollOption.votes, PollOption.score).where(PollOption.poll_id == poll.id)
+        ).all()
+    }
+    buckets = {
+        (option_id, bucket): ballots
+        for option_id, bucket, ballots in db.exec(
+            select(PollOptionTally.option_id, PollOptionTally.bucket, PollOptionTally.ballots)
+            .where(PollOptionTally.poll_id == poll.id, PollOptionTally.ballots != 0)
+        ).all()
+    }
+    rankings = {
+        tuple(parse_ranking(ranking)): ballots
+        for ranking, ballots in db.exec(
+            select(PollRankingBallot.ranking, PollRankingBallot.ballots)
+            .where(PollRankingBallot.poll_id == poll.id, PollRankingBallot.ballots != 0)
+        ).all()
+    }
+    return {"options": options, "buckets": buckets, "rankings": rankings}
+
+def check(polls: dict, option_ids: dict) -> dict:
+    report = {}
+    with Session(engine) as db:
+        for poll_type, poll_id in polls.items():
+            poll = db.get(Poll, poll_id)
+            expected, actual = recount(db, poll, option_ids[poll_id]), stored(db, poll)
+            result = {
+                name: expected[name] == actual[name]
+                for name in ("options", "buckets", "rankings")
+            }
+            result["total_votes"] = poll.total_votes == sum(votes for votes, _ in expected["options"].values())
+            if poll_type == PollType.RANKING:
+                ballots = RankedBallots(option_ids[poll_id])
+                for ranking, count in expected["rankings"].items():
+                    ballots.add(ranking, count)
+                count = get_instant_runoff(db, poll)
+                result["instant_runoff"] = instant_runoff(ballots)["rounds"] == count["rounds"]
+                result["winner"] = count["winner"]
+            report[poll_type.value] = result
+    return report
+
+def time_instant_runoff(ballots: int, options: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    candidates = list(range(1, options + 1))
+    # Rankings with a popularity skew, so the count takes several rounds
+    weights = [options - index for index in range(options)]
+    rankings = Counter()
+    for _ in range(ballots):
+        length = rng.randint(1, options)
+        ranking = []
+        while len(ranking) < length:
+            choice = rng.choices(candidates, weights)[0]
+            if choice not in ranking:
+                ranking.append(choice)
+        rankings[tuple(ranking)] += 1
+
+    start = time.perf_counter()
+    grouped = RankedBallots(candidates)
+    for ranking, count in rankings.items():
+        grouped.add(ranking, count)
+    built = time.perf_counter()
+    grouped_count = instant_runoff(grouped)
+    counted = time.perf_counter()
+
+    single = RankedBallots(candidates)
+    for ranking, count in rankings.items():
+        for _ in range(count):
+            single.add(ranking)
+    single_start = time.perf_counter()
+    single_count = instant_runoff(single)
+    single_seconds = time.perf_counter() - single_start
+
+    return {
+        "ballots": ballots,
+        "options": options,
+        "rankings": len(rankings),
+        "rounds": len(grouped_count["rounds"]),
+        "winner": grouped_count["winner"],
+        "grouped_build_ms": round((built - start) * 1000, 2),
+        "grouped_count_ms": round((counted - built) * 1000, 2),
+        "per_ballot_count_ms": round(single_seconds * 1000, 2),
+        "array_bytes": sum(
+            values.itemsize * len(values) for values in (single.choices, single.starts, single.weights)
+        ),
+        "same_result": grouped_count == single_count,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3, help="Ballots submitted by each voter, one after another")
+    parser.add_argument("--options", type=int, default=8)
+    parser.add_argument("--ballots", type=int, default=1_000_000, help="Ballots of the instant-runoff timing")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-ranked-tallies.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    polls, option_ids, user_ids = prepare(args.voters, args.options, args.seed)
+    votes = cast_ballots(polls, option_ids, user_ids, args.rounds, args.seed)
+    tallies = check(polls, option_ids)
+    runoff = time_instant_runoff(args.ballots, args.options, args.seed)
+    exact = runoff["same_result"] and all(
+        value for result in tallies.values() for name, value in result.items() if name != "winner"
+    )
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "voters": args.voters,
+        "rounds": args.rounds,
+        "votes": votes,
+        "tallies": tallies,
+        "instant_runoff": runoff,
+        "exact": exact,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps({key: report[key] for key in ("votes", "tallies", "instant_runoff", "exact")}))
+    if not exact:
+        raise SystemExit("Running tallies do not match the ballots")
+
+if __name__ == "__main__":
+    main()
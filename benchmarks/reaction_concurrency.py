@@ -0,0 +1,150 @@
+"""
+Reaction concurrency stress test.
+
+- Toggles: one user reacts LIKE, LIKE, DISLIKE, DISLIKE one request after
+  another and must end with, in turn, a like, nothing, a dislike, nothing.
+- Races: every reactor fires --burst POST /polls/{id}/react requests at
+  once, mixing LIKE and DISLIKE. The order they are applied in is unknown,
+  but once all requests are done every reactor must have at most one
+  PollReaction row, and the poll's likes_count / dislikes_count must match
+  the rows; a lost or doubled increment fails the run.
+
+Run it against PostgreSQL for meaningful numbers; SQLite serializes writers
+and rejects some of them as "database is locked", which only shows up as
+non-200 statuses (failed requests are rolled back).
+
+Usage:
+    python -m benchmarks.reaction_concurrency [--reactors 500] [--burst 4] [--concurrency 50]
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform
+from collections import Counter
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from sqlmodel import Session, select, func
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.public.poll.models import Poll, PollReaction
+from benchmarks.common import make_token, summarize
+from benchmarks.dataset import DatasetSize, email_for, generate, reset_database
+
+def prepare(reactors: int, seed: int) -> int:
+    """Generates a dataset without reactions and returns the target poll"""
+    reset_database(engine)
+    generate(engine, DatasetSize(
+        users=reactors, polls=5,
+        votes_per_poll=0, reactions_per_poll=0, comments_per_poll=0,
+        debates=0, projects=0, issues=0, organizations=0,
+    ), seed=seed)
+    with Session(engine) as db:
+        # Every generated user belongs to the global community
+        return db.exec(select(Poll.id).where(Poll.scope == "GLOBAL").order_by(Poll.id)).first()
+
+def state(poll_id: int) -> dict:
+    with Session(engine) as db:
+        poll = db.get(Poll, poll_id)
+        rows = Counter(db.exec(select(PollReaction.reaction).where(PollReaction.poll_id == poll_id)).all())
+        duplicates = db.exec(
+            select(func.count()).select_from(
+                select(PollReaction.user_id)
+                .where(PollReaction.poll_id == poll_id)
+                .group_by(PollReaction.user_id)
+                .having(func.count() > 1)
+                .subquery()
+            )
+        ).one()
+        return {
+            "rows": {reaction.value: count for reaction, count in rows.items()},
+            "counters": {"LIKE": poll.likes_count, "DISLIKE": poll.dislikes_count},
+            "duplicate_reactors": duplicates,
+        }
+
+async def run(poll_id: int, tokens: list[str], burst: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    app = create_app(settings)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def react(token: str, reaction: str) -> dict:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    f"/api/v1/polls/{poll_id}/react",
+                    json={"reaction": reaction},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+                latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+            return response.json()["reactions"] if response.status_code == 200 else None
+
+        # Toggles of the first reactor, one after another
+        toggles = []
+        for reaction in ("LIKE", "LIKE", "DISLIKE", "DISLIKE"):
+            toggles.append(await react(tokens[0], reaction))
+        toggled = toggles == [
+            {"LIKE": 1, "DISLIKE": 0}, {"LIKE": 0, "DISLIKE": 0},
+            {"LIKE": 0, "DISLIKE": 1}, {"LIKE": 0, "DISLIKE": 0},
+        ]
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            react(token, rng.choice(("LIKE", "DISLIKE")))
+            for token in tokens for _ in range(burst)
+        ))
+        elapsed = time.perf_counter() - start
+
+    return {"toggled": toggled, "statuses": dict(statuses), **summarize(latencies, elapsed)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reactors", type=int, default=500)
+    parser.add_argument("--burst", type=int, default=4, help="Concurrent reactions of each reactor")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-reactions.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    poll_id = prepare(args.reactors, args.seed)
+    tokens = [make_token(email_for(i)) for i in range(args.reactors)]
+    results = asyncio.run(run(poll_id, tokens, args.burst, args.concurrency, args.seed))
+    final = state(poll_id)
+    exact = (
+        results["toggled"]
+        and not final["duplicate_reactors"]
+        and all(final["rows"].get(reaction, 0) == count for reaction, count in final["counters"].items())
+    )
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "reactors": args.reactors,
+        "burst": args.burst,
+        "concurrency": args.concurrency,
+        **results,
+        **final,
+        "exact": exact,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps({key: report[key] for key in ("statuses", "p50_ms", "p99_ms", "toggled", "rows", "counters", "exact")}))
+    if not exact:
+        raise SystemExit("Reaction counters do not match the reactions")
+
+if __name__ == "__main__":
+    main()
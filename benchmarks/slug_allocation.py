@@ -0,0 +1,122 @@
+"""
+Slug allocation benchmark.
+
+Creates --rows debates with the same title, one after another, and compares
+the former probe loop (one SELECT per slug tried: base, base-1, base-2, ...)
+with allocate_slug (one `LIKE 'base%'` SELECT). Both must choose the same
+slugs; statements and latency per allocation are reported for the first and
+the last allocations of the burst.
+
+Usage:
+    python -m benchmarks.slug_allocation [--rows 1000]
+"""
+import os
+import json
+import time
+import logging
+import argparse
+import platform
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlmodel import Session, select
+from api.database import engine
+from api.models import User
+from api.public.debate.models import Debate, DebateType
+from api.utils.query_counter import count_queries
+from api.utils.slug import add_with_unique_slug, allocate_slug, create_slug
+from benchmarks.common import summarize
+from benchmarks.dataset import reset_database
+
+TITLE = "Should the city build a new bridge?"
+
+def probe_loop(db: Session, base_slug: str) -> str:
+    """The former allocation: one query per slug tried"""
+    slug, counter = base_slug, 1
+    while db.exec(select(Debate).where(Debate.slug == slug)).first() is not None:
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    return slug
+
+def measure(allocate, rows: int, creator_id: int) -> dict:
+    reset_debates()
+    base_slug = create_slug(TITLE)
+    slugs, statements, latencies = [], [], []
+    for _ in range(rows):
+        with Session(engine) as db:
+            with count_queries() as counter:
+                start = time.perf_counter()
+                slug = allocate(db, base_slug)
+                latencies.append(time.perf_counter() - start)
+            statements.append(counter.statements)
+            debate = Debate(title=TITLE, description="Benchmark", type=DebateType.GLOBAL, creator_id=creator_id)
+            debate.slug = slug
+            db.add(debate)
+            db.commit()
+            slugs.append(slug)
+    tail = max(1, rows // 10)
+    return {
+        "slugs": slugs,
+        "statements_first": statements[0],
+        "statements_last": statements[-1],
+        "statements_total": sum(statements),
+        "first_10pct": summarize(latencies[:tail], sum(latencies[:tail])),
+        "last_10pct": summarize(latencies[-tail:], sum(latencies[-tail:])),
+    }
+
+def reset_debates() -> None:
+    with Session(engine) as db:
+        for debate in db.exec(select(Debate)).all():
+            db.delete(debate)
+        db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Debates created with the same title")
+    parser.add_argument("--output", default="benchmark-results-slug-allocation.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    reset_database(engine)
+    with Session(engine) as db:
+        user = User(email="slugs@example.com", username="slugs", name="Slugs")
+        db.add(user)
+        db.commit()
+        creator_id = user.id
+
+    before = measure(probe_loop, args.rows, creator_id)
+    after = measure(lambda db, base_slug: allocate_slug(db, Debate, base_slug), args.rows, creator_id)
+    same = before.pop("slugs") == after.pop("slugs")
+
+    # The helper used by the create endpoints, on top of the last burst
+    with Session(engine) as db:
+        debate = Debate(title=TITLE, description="Benchmark", type=DebateType.GLOBAL, creator_id=creator_id)
+        add_with_unique_slug(db, debate, create_slug(TITLE))
+        db.commit()
+        next_slug = debate.slug
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "rows": args.rows,
+        "probe_loop": before,
+        "allocate_slug": after,
+        "same_slugs": same,
+        "next_slug": next_slug,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    for name in ("probe_loop", "allocate_slug"):
+        result = report[name]
+        print(
+            f"{name:14} statements first {result['statements_first']} last {result['statements_last']} "
+            f"total {result['statements_total']} p50 last 10% {result['last_10pct']['p50_ms']}ms"
+        )
+    if not same or next_slug != f"{create_slug(TITLE)}-{args.rows}":
+        raise SystemExit("allocate_slug did not choose the expected slugs")
+
+if __name__ == "__main__":
+    main()
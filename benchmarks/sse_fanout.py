@@ -0,0 +1,231 @@
+"""
+Live poll results (SSE) fan-out benchmark.
+
+Opens --subscribers simulated clients on GET /api/v1/polls/{id}/stream,
+driving the ASGI app directly (one task per connection, as a server would),
+then casts votes on the poll and measures:
+
+- connect: time to open every connection and results loads it took, which
+  should be at most 1 (new subscribers start from the topic's payload)
+- memory per connection: Python heap allocated while the connections were
+  opened (tracemalloc) divided by their number, plus the process RSS growth
+- fan-out latency: time from the vote's commit until every subscriber got
+  the updated results (includes the coalescing interval)
+- pushes: results reloads per vote, which should be 1 whatever the number
+  of subscribers or votes within an interval
+
+All connections are then closed and the broker must be left without
+subscribers. Run it with LIVE_UPDATES_BROADCASTER=postgres against a
+local PostgreSQL to go through LISTEN/NOTIFY.
+
+Usage:
+    python -m benchmarks.sse_fanout [--subscribers 5000] [--votes 5] [--interval 0.5]
+"""
+import os
+import gc
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import resource
+import tracemalloc
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from anyio import to_thread
+from sqlmodel import Session, select
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.models import User
+from api.public.poll.crud import create_vote, poll_updates, poll_broadcaster
+from api.public.poll.models import Poll, PollOption
+from benchmarks.common import percentile
+from benchmarks.dataset import DatasetSize, generate, reset_database
+
+def prepare(seed: int) -> tuple[int, list[int], list[int]]:
+    """Generates a small dataset and returns a poll, its options and some voters"""
+    reset_database(engine)
+    generate(engine, DatasetSize(
+        users=50, polls=5, options_per_poll=4,
+        votes_per_poll=0, reactions_per_poll=0, comments_per_poll=0,
+        debates=0, projects=0, issues=0, organizations=0,
+    ), seed=seed)
+    with Session(engine) as db:
+        poll_id = db.exec(select(Poll.id).order_by(Poll.id)).first()
+        option_ids = db.exec(select(PollOption.id).where(PollOption.poll_id == poll_id).order_by(PollOption.id)).all()
+        user_ids = db.exec(select(User.id).order_by(User.id)).all()
+    return poll_id, list(option_ids), list(user_ids)
+
+def rss_kb() -> int:
+    """Peak resident set size of the process, in KB (Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class Subscriber:
+    """One simulated SSE client; records when each results version arrives"""
+
+    __slots__ = ("versions", "disconnected", "connected")
+
+    def __init__(self, disconnected: asyncio.Event, connected: asyncio.Event):
+        self.versions: dict[int, float] = {}
+        self.disconnected = disconnected
+        self.connected = connected
+
+    async def run(self, app, path: str, state: dict) -> None:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self.disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] != "http.response.body":
+                return
+            for line in message.get("body", b"").decode().splitlines():
+                if line.startswith("id: "):
+                    version = int(line[4:])
+                    if version not in self.versions:
+                        self.versions[version] = time.perf_counter()
+                        state["received"][version] = state["received"].get(version, 0) + 1
+                        if len(self.versions) == 1:
+                            state["connected"] += 1
+                            if state["connected"] == state["subscribers"]:
+                                self.connected.set()
+                        elif state["received"][version] == state["subscribers"]:
+                            state["all_received"].set()
+
+        await app(scope, receive, send)
+
+async def run(poll_id: int, option_ids: list[int], user_ids: list[int], subscribers: int, votes: int, interval: float) -> dict:
+    app = create_app(settings)
+    path = f"/api/v1/polls/{poll_id}/stream"
+    await poll_broadcaster.start()
+    pusher = asyncio.create_task(poll_updates.run(interval))
+
+    # Warm-up connection, so one-time costs (mapper configuration, statement
+    # caches, imports) are not attributed to the measured connections
+    warmup_disconnected, warmup_connected = asyncio.Event(), asyncio.Event()
+    warmup_state = {"subscribers": 1, "connected": 0, "received": {}, "all_received": asyncio.Event()}
+    warmup = asyncio.create_task(Subscriber(warmup_disconnected, warmup_connected).run(app, path, warmup_state))
+    await warmup_connected.wait()
+    warmup_disconnected.set()
+    await warmup
+
+    disconnected, connected = asyncio.Event(), asyncio.Event()
+    state = {"subscribers": subscribers, "connected": 0, "received": {}, "all_received": asyncio.Event()}
+
+    gc.collect()
+    rss_before = rss_kb()
+    tracemalloc.start()
+    heap_before, _ = tracemalloc.get_traced_memory()
+
+    # Count results loads on connect
+    connect_loads = 0
+    original_load = poll_updates.load
+
+    async def counting_load(key):
+        nonlocal connect_loads
+        connect_loads += 1
+        return await original_load(key)
+    poll_updates.load = counting_load
+
+    start = time.perf_counter()
+    clients = [Subscriber(disconnected, connected) for _ in range(subscribers)]
+    tasks = [asyncio.create_task(client.run(app, path, state)) for client in clients]
+    await connected.wait()
+    connect_seconds = time.perf_counter() - start
+    poll_updates.load = original_load
+
+    gc.collect()
+    heap_after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = rss_kb()
+
+    # Count results reloads triggered by the votes
+    loads = 0
+    original_tick = poll_updates.tick
+
+    async def counting_tick():
+        nonlocal loads
+        pushed = await original_tick()
+        loads += pushed
+        return pushed
+    poll_updates.tick = counting_tick
+
+    fanout = []
+    for vote in range(votes):
+        state["all_received"] = asyncio.Event()
+
+        def cast():
+            with Session(engine) as db:
+                create_vote(db, poll_id, [option_ids[vote % len(option_ids)]], user_ids[vote])
+        await to_thread.run_sync(cast)
+        committed = time.perf_counter()
+        await asyncio.wait_for(state["all_received"].wait(), timeout=60 + interval * 2)
+        version = max(state["received"])
+        fanout.append(max(client.versions[version] for client in clients) - committed)
+
+    poll_updates.tick = original_tick
+    disconnected.set()
+    await asyncio.gather(*tasks)
+    pusher.cancel()
+    await poll_broadcaster.stop()
+
+    return {
+        "subscribers": subscribers,
+        "connect_seconds": round(connect_seconds, 2),
+        "connect_loads": connect_loads,
+        "heap_bytes_per_connection": round((heap_after - heap_before) / subscribers),
+        "rss_kb_growth": rss_after - rss_before,
+        "rss_bytes_per_connection": round((rss_after - rss_before) * 1024 / subscribers),
+        "votes": votes,
+        "results_loads": loads,
+        "fanout_p50_ms": round(percentile(fanout, 50) * 1000, 2),
+        "fanout_max_ms": round(max(fanout) * 1000, 2),
+        "subscribers_left": poll_updates.subscribers(poll_id),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--votes", type=int, default=5, help="Votes cast one after another, each fanned out")
+    parser.add_argument("--interval", type=float, default=settings.LIVE_UPDATES_INTERVAL,
+                        help="Seconds between pushes of a poll (LIVE_UPDATES_INTERVAL)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-sse-fanout.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    poll_id, option_ids, user_ids = prepare(args.seed)
+    results = asyncio.run(run(poll_id, option_ids, user_ids, args.subscribers, args.votes, args.interval))
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "broadcaster": settings.LIVE_UPDATES_BROADCASTER,
+        "interval": args.interval,
+        **results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps(report))
+    if results["subscribers_left"]:
+        raise SystemExit("Closed connections were left subscribed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Tag resolution benchmark.
+
+Resolves --batches lists of --tags-per-batch tag names (a mix of existing
+and new names, like a creation payload) with the former per-name loop
+(get_tag_by_name, then create_tag and its commit for a new name) and with
+get_or_create_tags, reporting statements and latency per list. Then
+--threads threads resolve the same new names at once: every thread must
+get the same IDs and each name must exist exactly once.
+
+Usage:
+    python -m benchmarks.tag_upsert [--batches 500] [--tags-per-batch 5] [--threads 8]
+"""
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import threading
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlmodel import Session, select, func
+from api.database import engine
+from api.models import Tag
+from api.public.tag.crud import tag_ids, get_or_create_tags
+from api.utils.query_counter import count_queries
+from benchmarks.common import summarize
+from benchmarks.dataset import reset_database
+
+def per_name_loop(db: Session, names: list[str]) -> dict[str, int]:
+    """The former resolution: one SELECT per name, one INSERT and commit per new name"""
+    found = {}
+    for name in names:
+        tag = db.exec(select(Tag).where(Tag.name == name)).first()
+        if not tag:
+            tag = Tag(name=name)
+            db.add(tag)
+            db.commit()
+            db.refresh(tag)
+        found[name] = tag.id
+    return found
+
+def batches(prefix: str, count: int, size: int, seed: int) -> list[list[str]]:
+    """Payload tag lists: popular names reused across lists, plus a few new ones"""
+    rng = random.Random(seed)
+    popular = [f"{prefix}-popular-{index}" for index in range(50)]
+    return [
+        list(dict.fromkeys(
+            rng.choice(popular) if rng.random() < 0.8 else f"{prefix}-rare-{rng.randint(0, count * size)}"
+            for _ in range(size)
+        ))
+        for _ in range(count)
+    ]
+
+def measure(resolve, lists: list[list[str]]) -> dict:
+    statements, latencies = [], []
+    start = time.perf_counter()
+    for names in lists:
+        with Session(engine) as db:
+            with count_queries() as counter:
+                began = time.perf_counter()
+                resolve(db, names)
+                db.commit()
+                latencies.append(time.perf_counter() - began)
+            statements.append(counter.statements)
+    report = summarize(latencies, time.perf_counter() - start)
+    report["statements_total"] = sum(statements)
+    report["statements_per_list"] = round(sum(statements) / len(statements), 2)
+    return report
+
+def race(threads: int, names: list[str]) -> dict:
+    tag_ids.clear()
+    barrier = threading.Barrier(threads)
+    results, errors = [], []
+
+    def worker():
+        try:
+            with Session(engine) as db:
+                barrier.wait()
+                results.append(get_or_create_tags(db, names))
+                db.commit()
+        except Exception as error:
+            errors.append(repr(error))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    with Session(engine) as db:
+        rows = dict(db.exec(select(Tag.name, func.count()).where(Tag.name.in_(names)).group_by(Tag.name)).all())
+        stored = dict(db.exec(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+    return {
+        "errors": errors,
+        "one_row_per_name": all(rows.get(name) == 1 for name in names),
+        "same_ids": bool(results) and all(result == stored for result in results),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batches", type=int, default=500, help="Tag lists resolved")
+    parser.add_argument("--tags-per-batch", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8, help="Threads resolving the same new names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-tag-upsert.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    reset_database(engine)
+    before = measure(per_name_loop, batches("loop", args.batches, args.tags_per_batch, args.seed))
+    tag_ids.clear()
+    after = measure(get_or_create_tags, batches("upsert", args.batches, args.tags_per_batch, args.seed))
+    concurrent = race(args.threads, [f"race-{index}" for index in range(args.tags_per_batch)])
+    exact = not concurrent["errors"] and concurrent["one_row_per_name"] and concurrent["same_ids"]
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "batches": args.batches,
+        "tags_per_batch": args.tags_per_batch,
+        "per_name_loop": before,
+        "get_or_create_tags": after,
+        "race": concurrent,
+        "exact": exact,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    for name in ("per_name_loop", "get_or_create_tags"):
+        result = report[name]
+        print(f"{name:18} statements/list {result['statements_per_list']} p50 {result['p50_ms']}ms")
+    print(json.dumps({"race": concurrent, "exact": exact}))
+    if not exact:
+        raise SystemExit("Concurrent tag creation did not converge on one row per name")
+
+if __name__ == "__main__":
+    main()
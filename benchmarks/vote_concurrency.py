@@ -0,0 +1,205 @@
+"""
+Vote concurrency stress test.
+
+Fires thousands of parallel POST /polls/{id}/vote requests at a single poll:
+every voter changes its vote several times (sometimes removing it or
+repeating the same choice), double-submits its first vote, and races two
+submissions with different options against each other. Once all requests
+are done, every voter's PollVote rows must be the options of one of its
+last successful submissions (either one of a race may win, never both),
+and the option tallies and the poll's total_votes must match the rows; any
+difference (a lost or doubled increment, a doubled vote) fails the run.
+
+Run it against PostgreSQL for meaningful numbers; SQLite serializes writers
+and rejects some of them as "database is locked", which only shows up as
+non-200 statuses (failed requests are rolled back and left out of the
+expected tallies).
+
+Usage:
+    python -m benchmarks.vote_concurrency [--voters 1000] [--rounds 4] [--concurrency 50] [--multiple-choice]
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform
+from collections import Counter
+
+os.environ.setdefault("AUTHJS_SECRET", "benchmark-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from sqlmodel import Session, select, func
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from api.models import User
+from api.public.poll.models import Poll, PollOption, PollVote, PollType
+from benchmarks.common import make_token, summarize
+from benchmarks.dataset import DatasetSize, email_for, generate, reset_database
+
+def prepare(voters: int, options: int, multiple_choice: bool, seed: int) -> tuple[int, list[int]]:
+    """Generates a dataset without votes and returns the target poll and its options"""
+    reset_database(engine)
+    generate(engine, DatasetSize(
+        users=voters, polls=5, options_per_poll=options,
+        votes_per_poll=0, reactions_per_poll=0, comments_per_poll=0,
+        debates=0, projects=0, issues=0, organizations=0,
+    ), seed=seed)
+    with Session(engine) as db:
+        # Every generated user belongs to the global community
+        poll = db.exec(select(Poll).where(Poll.scope == "GLOBAL").order_by(Poll.id)).first()
+        poll.type = PollType.MULTIPLE_CHOICE if multiple_choice else PollType.SINGLE_CHOICE
+        db.add(poll)
+        db.commit()
+        option_ids = db.exec(select(PollOption.id).where(PollOption.poll_id == poll.id).order_by(PollOption.id)).all()
+        return poll.id, list(option_ids)
+
+def plan_votes(rng: random.Random, option_ids: list[int], rounds: int, multiple_choice: bool) -> list[list[int]]:
+    """Sequence of option lists one voter submits"""
+    choices = []
+    for _ in range(rounds):
+        roll = rng.random()
+        if roll < 0.1:
+            choices.append([])
+        elif roll < 0.25 and choices:
+            choices.append(list(choices[-1]))
+        elif multiple_choice:
+            choices.append(rng.sample(option_ids, rng.randint(1, min(3, len(option_ids)))))
+        else:
+            choices.append([rng.choice(option_ids)])
+    return choices
+
+def plan_rival(rng: random.Random, option_ids: list[int], choice: list[int], multiple_choice: bool) -> list[int]:
+    """Options raced against `choice`: a different, non-empty selection"""
+    others = [option_id for option_id in option_ids if option_id not in choice] or option_ids
+    if multiple_choice:
+        return rng.sample(others, rng.randint(1, min(3, len(others))))
+    return [rng.choice(others)]
+
+async def run(poll_id: int, plans: list[list[list[int]]], rivals: list[list[int]], tokens: list[str], concurrency: int) -> dict:
+    app = create_app(settings)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    # Option lists each voter may have ended with: its last successful
+    # submission, or either successful side of a race; voters start without votes
+    final: list[list[list[int]]] = [[[]] for _ in plans]
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def vote(voter: int, option_ids: list[int]) -> bool:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    f"/api/v1/polls/{poll_id}/vote",
+                    json={"option_ids": option_ids},
+                    headers={"Authorization": f"Bearer {tokens[voter]}"},
+                )
+                latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+            return response.status_code == 200
+
+        async def voter_session(voter: int):
+            for round_number, option_ids in enumerate(plans[voter]):
+                if round_number == 0:
+                    # Double submit: both requests carry the same options
+                    succeeded = any(await asyncio.gather(vote(voter, option_ids), vote(voter, option_ids)))
+                    if succeeded:
+                        final[voter] = [option_ids]
+                elif round_number == 1:
+                    # Race: two submissions with different options at once
+                    rival = rivals[voter]
+                    results = await asyncio.gather(vote(voter, rival), vote(voter, option_ids))
+                    winners = [choice for choice, ok in zip((rival, option_ids), results) if ok]
+                    if winners:
+                        final[voter] = winners
+                elif await vote(voter, option_ids):
+                    final[voter] = [option_ids]
+
+        start = time.perf_counter()
+        await asyncio.gather(*(voter_session(voter) for voter in range(len(plans))))
+        elapsed = time.perf_counter() - start
+
+    return {"statuses": dict(statuses), "final": final, **summarize(latencies, elapsed)}
+
+def check(poll_id: int, option_ids: list[int], user_ids: list[int], final: list[list[list[int]]]) -> dict:
+    with Session(engine) as db:
+        tallies = dict(db.exec(select(PollOption.id, PollOption.votes).where(PollOption.poll_id == poll_id)).all())
+        votes_by_user: dict[int, set[int]] = {}
+        for user_id, option_id in db.exec(
+            select(PollVote.user_id, PollVote.option_id).where(PollVote.poll_id == poll_id)
+        ).all():
+            votes_by_user.setdefault(user_id, set()).add(option_id)
+        total_votes = db.get(Poll, poll_id).total_votes
+
+    # Each voter's rows must be one of the option lists it may have ended with
+    unexpected = [
+        voter for voter, candidates in enumerate(final)
+        if votes_by_user.get(user_ids[voter], set()) not in [set(choice) for choice in candidates]
+    ]
+    rows = Counter(option_id for votes in votes_by_user.values() for option_id in votes)
+
+    options = {
+        option_id: {"tally": tallies.get(option_id), "rows": rows.get(option_id, 0)}
+        for option_id in option_ids
+    }
+    exact = (
+        not unexpected
+        and all(option["tally"] == option["rows"] for option in options.values())
+        and total_votes == sum(rows.values())
+    )
+    return {
+        "exact": exact,
+        "unexpected_voters": len(unexpected),
+        "options": options,
+        "total_votes": {"rows": sum(rows.values()), "counter": total_votes},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=4, help="Votes submitted by each voter, one after another (the second one races a rival)")
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight")
+    parser.add_argument("--multiple-choice", action="store_true", help="Vote on a MULTIPLE_CHOICE poll")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results-votes.json")
+    args = parser.parse_args()
+
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+
+    poll_id, option_ids = prepare(args.voters, args.options, args.multiple_choice, args.seed)
+    rng = random.Random(args.seed)
+    plans = [plan_votes(rng, option_ids, args.rounds, args.multiple_choice) for _ in range(args.voters)]
+    rivals = [plan_rival(rng, option_ids, plan[1] if len(plan) > 1 else [], args.multiple_choice) for plan in plans]
+    tokens = [make_token(email_for(i)) for i in range(args.voters)]
+    with Session(engine) as db:
+        user_ids_by_email = dict(db.exec(select(User.email, User.id)).all())
+    user_ids = [user_ids_by_email[email_for(i)] for i in range(args.voters)]
+
+    results = asyncio.run(run(poll_id, plans, rivals, tokens, args.concurrency))
+    verification = check(poll_id, option_ids, user_ids, results.pop("final"))
+
+    report = {
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "voters": args.voters,
+        "rounds": args.rounds,
+        "concurrency": args.concurrency,
+        "multiple_choice": args.multiple_choice,
+        **results,
+        **verification,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps({key: report[key] for key in ("statuses", "p50_ms", "p99_ms", "throughput_rps", "total_votes", "exact")}))
+    if not verification["exact"]:
+        raise SystemExit("Vote tallies do not match the votes cast")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Fixtures shared by the tests: an application on a throwaway SQLite database
+filled with a small generated dataset (see benchmarks.dataset).
+"""
+import os
+import tempfile
+
+os.environ.setdefault("AUTHJS_SECRET", "test-secret")
+os.environ.setdefault("AUTHJS_SALT", "authjs.session-token")
+# The dataset fixture drops every table: never run against DATABASE_URL
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from api.app import create_app
+from api.config import settings
+from api.database import engine
+from benchmarks.common import make_token
+from benchmarks.dataset import DatasetSize, email_for, generate, reset_database
+
+pytest_plugins = ["api.pytest_plugin"]
+
+# Fixed dataset, so the statement counts of the query budgets are stable;
+# enough polls for the region and subregion listings to span several pages
+DATASET = DatasetSize(
+    users=50, polls=200, votes_per_poll=10, reactions_per_poll=5, comments_per_poll=3,
+    debates=20, projects=20, issues=20, organizations=3,
+)
+
+@pytest.fixture(scope="session")
+def dataset():
+    # Budgets are asserted, not logged
+    logging.getLogger("query_counter").setLevel(logging.ERROR)
+    reset_database(engine)
+    generate(engine, DATASET, seed=42)
+    return DATASET
+
+@pytest.fixture(scope="session")
+def client(dataset):
+    with TestClient(create_app(settings)) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="session")
+def auth_headers(dataset):
+    return {"Authorization": f"Bearer {make_token(email_for(1))}"}
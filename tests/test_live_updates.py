@@ -0,0 +1,32 @@
+"""
+New subscribers of a live results topic start from its latest payload: the
+first ones share a single load, later ones reuse the pushed payload.
+"""
+import asyncio
+from api.utils.live_updates import Broker
+
+def test_subscribers_share_the_latest_payload():
+    loads = []
+
+    def loader(keys: list[int]) -> dict[int, dict]:
+        loads.append(keys)
+        return {key: {"version": len(loads)} for key in keys}
+
+    async def scenario():
+        broker = Broker(loader)
+        subscriptions = [broker.subscribe(1) for _ in range(50)]
+        first = await asyncio.gather(*(broker.latest(1) for _ in subscriptions))
+
+        broker.push(1, {"version": 7})
+        later = broker.subscribe(1)
+        pushed = await broker.latest(1)
+
+        for subscription in subscriptions + [later]:
+            subscription.close()
+        return first, pushed, broker.subscribers(1)
+
+    first, pushed, left = asyncio.run(scenario())
+    assert first == [{"version": 1}] * 50
+    assert pushed == {"version": 7}
+    assert loads == [[1]]
+    assert left == 0
@@ -0,0 +1,23 @@
+"""
+Request metrics are labelled by the full route template, router prefixes
+included, so endpoints of different routers never share a series.
+"""
+import re
+from sqlmodel import Session, select
+from api.database import engine
+from api.public.poll.models import Poll
+
+def route_labels(client) -> set[str]:
+    metrics = client.get("/metrics").text
+    return set(re.findall(r'^http_requests_total\{method="GET",route="([^"]*)"', metrics, re.MULTILINE))
+
+def test_routes_are_labelled_with_their_mounted_template(client):
+    with Session(engine) as db:
+        poll_id = db.exec(select(Poll.id).order_by(Poll.id)).first()
+
+    for url in ("/api/v1/polls/", "/api/v1/debates/", f"/api/v1/polls/{poll_id}/comments"):
+        assert client.get(url).status_code == 200
+
+    labels = route_labels(client)
+    assert {"/api/v1/polls/", "/api/v1/debates/", "/api/v1/polls/{poll_id}/comments"} <= labels
+    assert "/" not in labels
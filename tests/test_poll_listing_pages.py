@@ -0,0 +1,56 @@
+"""
+Page sizes of the community-based poll listings (country, region, community
+and subregion), which page through distinct poll IDs before fetching the
+options of that page. Every listing is walked by offset and by cursor: each
+page but the last holds exactly PAGE_SIZE polls, the last one the remainder,
+and no poll is repeated or missing.
+"""
+import pytest
+from sqlmodel import Session
+from api.database import engine
+from benchmarks.poll_listing_pages import load_listings
+
+# Every listing of the test dataset spans several pages and ends on a partial one
+PAGE_SIZE = 2
+
+@pytest.fixture(scope="module")
+def listings(dataset):
+    with Session(engine) as db:
+        return load_listings(db)
+
+def get_page(client, query: str, paging: str) -> dict:
+    response = client.get(f"/api/v1/polls/?{query}&size={PAGE_SIZE}&{paging}")
+    assert response.status_code == 200
+    return response.json()
+
+def expected_sizes(total: int) -> list[int]:
+    full, rest = divmod(total, PAGE_SIZE)
+    return [PAGE_SIZE] * full + ([rest] if rest else [])
+
+def walk_offset(client, query: str) -> tuple[int, list[list[int]]]:
+    first = get_page(client, query, "page=1")
+    assert first["pages"] == len(expected_sizes(first["total"]))
+    pages = [first] + [get_page(client, query, f"page={page}") for page in range(2, first["pages"] + 1)]
+    return first["total"], [[item["id"] for item in page["items"]] for page in pages]
+
+def walk_cursor(client, query: str) -> tuple[int, list[list[int]]]:
+    body = get_page(client, query, "page=1")
+    total, pages = body["total"], [[item["id"] for item in body["items"]]]
+    while body["next_cursor"]:
+        body = get_page(client, query, f"cursor={body['next_cursor']}")
+        pages.append([item["id"] for item in body["items"]])
+    return total, pages
+
+@pytest.mark.parametrize("listing", ["country", "region", "community", "subregion"])
+@pytest.mark.parametrize("walk", [walk_offset, walk_cursor], ids=["offset", "cursor"])
+def test_listing_page_sizes(client, listings, listing, walk):
+    total, pages = walk(client, listings[listing])
+    ids = [poll_id for page in pages for poll_id in page]
+
+    assert total > PAGE_SIZE and total % PAGE_SIZE
+    assert [len(page) for page in pages] == expected_sizes(total)
+    assert len(set(ids)) == len(ids) == total
+
+@pytest.mark.parametrize("listing", ["country", "region", "community", "subregion"])
+def test_offset_and_cursor_pages_match(client, listings, listing):
+    assert walk_offset(client, listings[listing]) == walk_cursor(client, listings[listing])
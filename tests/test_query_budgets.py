@@ -0,0 +1,57 @@
+"""
+SQL statement budgets of the main listing and detail endpoints.
+
+Each endpoint is requested once beforehand (except the anonymous poll
+listing, which is budgeted cold), so the budget covers the warm path
+(token, user and results caches) whatever order the tests run in. The
+budgets are the current counts on the fixed dataset of conftest.py: a
+query added inside a loop over the page's rows raises the count and fails
+the test. Debate detail, projects and issues still load some relations
+row by row; their max_repeats pin that down so it cannot grow.
+"""
+import pytest
+from sqlmodel import Session, select
+from api.database import engine
+from api.public.debate.models import Debate
+from api.utils.query_counter import max_queries
+
+@pytest.fixture(scope="module")
+def debate_slug(dataset):
+    with Session(engine) as db:
+        return db.exec(select(Debate.slug).order_by(Debate.id)).first()
+
+def get(client, url, headers=None):
+    response = client.get(url, headers=headers or {})
+    assert response.status_code == 200
+    return response
+
+@pytest.fixture
+def warm(client):
+    """Requests an endpoint once, outside of any budget"""
+    return get
+
+@max_queries(6, max_repeats=1)
+def test_list_polls_anonymous(client):
+    # Cold: the decorator counts the whole test, including the page total
+    get(client, "/api/v1/polls/")
+
+def test_list_polls_authenticated(client, auth_headers, warm, query_budget):
+    warm(client, "/api/v1/polls/", auth_headers)
+    # Votes and reactions of the user on the page are one query each
+    with query_budget(max_statements=6, max_repeats=1):
+        get(client, "/api/v1/polls/", auth_headers)
+
+def test_debate_detail(client, auth_headers, debate_slug, warm, query_budget):
+    warm(client, f"/api/v1/debates/{debate_slug}", auth_headers)
+    with query_budget(max_statements=39, max_repeats=14):
+        get(client, f"/api/v1/debates/{debate_slug}", auth_headers)
+
+def test_list_projects(client, auth_headers, warm, query_budget):
+    warm(client, "/api/v1/projects/", auth_headers)
+    with query_budget(max_statements=61, max_repeats=10):
+        get(client, "/api/v1/projects/", auth_headers)
+
+def test_list_issues(client, auth_headers, warm, query_budget):
+    warm(client, "/api/v1/issues/", auth_headers)
+    with query_budget(max_statements=81, max_repeats=10):
+        get(client, "/api/v1/issues/", auth_headers)
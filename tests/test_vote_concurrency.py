@@ -0,0 +1,87 @@
+"""
+Concurrent votes on one poll (a smaller run of benchmarks/vote_concurrency.py):
+every voter double-submits a vote, then races two different choices. Once
+all requests are done, the poll's total_votes and each option's votes must
+match the PollVote rows, and no voter may hold more than one vote.
+
+SQLite serializes writers and may reject some requests as "database is
+locked"; those are rolled back, so the counters must match either way.
+"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlmodel import Session, select, func
+from api.database import engine
+from api.public.poll.models import Poll, PollOption, PollStatus, PollVote
+from benchmarks.common import make_token
+from benchmarks.dataset import email_for
+
+VOTERS = 30
+CONCURRENCY = 8
+
+@pytest.fixture(scope="module")
+def poll(dataset):
+    with Session(engine) as db:
+        # Every generated user belongs to the global community
+        poll = db.exec(
+            select(Poll)
+            .where(Poll.scope == "GLOBAL", Poll.status == PollStatus.PUBLISHED, Poll.ends_at.is_(None))
+            .order_by(Poll.id)
+        ).first()
+        option_ids = db.exec(select(PollOption.id).where(PollOption.poll_id == poll.id).order_by(PollOption.id)).all()
+        return poll.id, list(option_ids)
+
+def counters(poll_id: int) -> dict:
+    with Session(engine) as db:
+        return {
+            "total_votes": db.get(Poll, poll_id).total_votes,
+            "options": dict(db.exec(select(PollOption.id, PollOption.votes).where(PollOption.poll_id == poll_id)).all()),
+        }
+
+def rows(poll_id: int) -> dict:
+    with Session(engine) as db:
+        return {
+            "total_votes": db.exec(select(func.count()).select_from(PollVote).where(PollVote.poll_id == poll_id)).one(),
+            "options": dict(db.exec(
+                select(PollOption.id, func.count(PollVote.id))
+                .outerjoin(PollVote, PollVote.option_id == PollOption.id)
+                .where(PollOption.poll_id == poll_id)
+                .group_by(PollOption.id)
+            ).all()),
+            "voters_with_several_votes": db.exec(
+                select(func.count()).select_from(
+                    select(PollVote.user_id)
+                    .where(PollVote.poll_id == poll_id)
+                    .group_by(PollVote.user_id)
+                    .having(func.count() > 1)
+                    .subquery()
+                )
+            ).one(),
+        }
+
+def test_counters_match_votes_under_concurrency(client, poll):
+    poll_id, option_ids = poll
+    rng = random.Random(42)
+    tokens = [make_token(email_for(i)) for i in range(VOTERS)]
+
+    def vote(token: str, choice: list[int]) -> int:
+        return client.post(
+            f"/api/v1/polls/{poll_id}/vote",
+            json={"option_ids": choice},
+            headers={"Authorization": f"Bearer {token}"},
+        ).status_code
+
+    submissions = []
+    for token in tokens:
+        first, rival = rng.sample(option_ids, 2)
+        # Double submit, then a race between two different choices
+        submissions += [(token, [first]), (token, [first]), (token, [rival]), (token, [first])]
+    rng.shuffle(submissions)
+
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        statuses = list(executor.map(lambda submission: vote(*submission), submissions))
+
+    assert statuses.count(200) > 0
+    votes = rows(poll_id)
+    assert votes.pop("voters_with_several_votes") == 0
+    assert counters(poll_id) == votes